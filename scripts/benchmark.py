@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import generate_analysis as analysis
+from generate_analysis import CACHE_DIR, DATA_DICTIONARY, PartialAggregates, RunMetrics, stage
+
+BENCH_DIR = CACHE_DIR / "benchmarks"
+RESULTS_PATH = BENCH_DIR / "results.jsonl"
+DEFAULT_ROWS = [1_000_000, 10_000_000, 50_000_000]
+GENERATE_BLOCK_ROWS = 500_000
+SEED = 20150101
+
+# Synthetic vocabulary. Makes and states follow a Zipf-like skew so a few groups dominate
+# like FORD/CHEVROLET and FL/CA do in the real file; dirty labels mirror the raw data.
+MAKES = [
+    "Ford", "Chevrolet", "Nissan", "Toyota", "Dodge", "Honda", "Hyundai", "BMW", "Kia", "Chrysler",
+    "Mercedes-Benz", "Jeep", "Infiniti", "Volkswagen", "Lexus", "GMC", "Mazda", "Cadillac", "Acura",
+    "Audi", "Lincoln", "Buick", "Subaru", "Ram", "Pontiac", "Mitsubishi", "Volvo", "MINI", "Saturn",
+    "Mercury", "Land Rover", "Jaguar", "Porsche", "Scion", "Suzuki", "FIAT", "Saab", "HUMMER",
+    "Oldsmobile", "Isuzu", "smart", "Maserati", "Bentley", "Aston Martin", "Tesla", "Ferrari",
+    "Lamborghini", "Rolls-Royce", "Airstream", "Lotus",
+]
+DIRTY_MAKES = {
+    "VW": "Volkswagen",
+    "LANDROVER": "Land Rover",
+    "MERCEDES": "Mercedes-Benz",
+    "ford truck": "Ford",
+    "dodge tk": "Dodge",
+    "chev truck": "Chevrolet",
+}
+DIRTY_MAKE_SHARE = 0.002
+MISSING_MAKE_SHARE = 0.018
+BODIES = ["Sedan", "SUV", "Hatchback", "Minivan", "Coupe", "Crew Cab", "Wagon", "Convertible", "SuperCrew", "G Sedan"]
+STATES = [
+    "fl", "ca", "pa", "tx", "ga", "nj", "il", "nc", "oh", "tn", "mo", "mi", "nv", "va", "md", "wi",
+    "mn", "az", "co", "wa", "ma", "ny", "in", "sc", "ne", "on", "pr", "la", "ut", "ms", "hi", "qc",
+]
+TRANSMISSIONS = ["automatic", "manual"]
+COLORS = ["black", "white", "silver", "gray", "blue", "red", "gold", "green", "burgundy", "beige", "—"]
+SELLERS = [f"seller {i:04d}" for i in range(2_000)]
+TRIMS = ["Base", "SE", "LX", "EX", "LT", "LS", "S", "SV", "Limited", "Sport", "Touring", "XLT"]
+MODELS_PER_MAKE = 30
+TIMEZONES = [("-0800", "PST"), ("-0700", "PDT"), ("-0500", "EST"), ("-0400", "EDT"), ("-0600", "CST")]
+SALEDATE_POOL_SIZE = 50_000
+INVALID_SALEDATE_SHARE = 0.0001
+ONE_DOLLAR_SHARE = 0.0005
+HIGH_PRICE_SHARE = 0.0001
+MISSING_PRICE_SHARE = 0.0001
+DUPLICATE_VIN_SHARE = 0.02
+MISSING_VIN_SHARE = 0.00002
+
+
+def zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def saledate_pool(rng: np.random.Generator) -> np.ndarray:
+    # Mostly early 2015 with a thin late-2014 tail, rendered in the raw "... GMT-0800 (PST)" layout
+    days = np.where(rng.random(SALEDATE_POOL_SIZE) < 0.1, rng.integers(0, 365, SALEDATE_POOL_SIZE), rng.integers(365, 545, SALEDATE_POOL_SIZE))
+    seconds = rng.integers(8 * 3600, 18 * 3600, SALEDATE_POOL_SIZE)
+    stamps = pd.Timestamp("2014-01-01") + pd.to_timedelta(days, unit="D") + pd.to_timedelta(seconds, unit="s")
+    zones = rng.integers(0, len(TIMEZONES), SALEDATE_POOL_SIZE)
+    offsets = np.array([f"GMT{offset} ({abbrev})" for offset, abbrev in TIMEZONES], dtype=object)[zones]
+    return pd.Series(stamps.strftime("%a %b %d %Y %H:%M:%S ")).to_numpy(dtype=object) + offsets
+
+
+def synthetic_block(rng: np.random.Generator, start: int, rows: int, dates: np.ndarray) -> pd.DataFrame:
+    make_idx = rng.choice(len(MAKES), size=rows, p=zipf_weights(len(MAKES), 1.2))
+    make = np.array(MAKES, dtype=object)[make_idx]
+    dirty = rng.random(rows) < DIRTY_MAKE_SHARE
+    dirty_labels = np.array(list(DIRTY_MAKES), dtype=object)
+    make[dirty] = dirty_labels[rng.integers(0, len(dirty_labels), int(dirty.sum()))]
+    make[rng.random(rows) < MISSING_MAKE_SHARE] = None
+
+    model_idx = rng.choice(MODELS_PER_MAKE, size=rows, p=zipf_weights(MODELS_PER_MAKE, 1.0))
+    model = pd.Series(make_idx * MODELS_PER_MAKE + model_idx).map(lambda code: f"Model {code:04d}").to_numpy()
+
+    year = 2015 - np.minimum(rng.geometric(0.25, rows) - 1, 25)
+    mmr = np.round(np.exp(rng.normal(9.4, 0.6, rows)) / 25) * 25
+    sellingprice = np.round(mmr * rng.normal(0.98, 0.12, rows) / 100) * 100
+    sellingprice[rng.random(rows) < ONE_DOLLAR_SHARE] = 1
+    high = rng.random(rows) < HIGH_PRICE_SHARE
+    sellingprice[high] = rng.integers(200_001, 250_000, int(high.sum()))
+    sellingprice[rng.random(rows) < MISSING_PRICE_SHARE] = np.nan
+
+    # Relisted vehicles reuse an earlier VIN from the same block
+    serial = np.arange(start, start + rows)
+    relisted = rng.random(rows) < DUPLICATE_VIN_SHARE
+    relisted[0] = False
+    serial[relisted] = start + (rng.random(int(relisted.sum())) * np.flatnonzero(relisted)).astype(np.int64)
+    vin = pd.Series(serial).map(lambda value: f"1SYN{value:013d}").to_numpy(dtype=object)
+    vin[rng.random(rows) < MISSING_VIN_SHARE] = None
+
+    saledate = dates[rng.integers(0, len(dates), rows)]
+    saledate[rng.random(rows) < INVALID_SALEDATE_SHARE] = "16"
+
+    columns = {
+        "year": year,
+        "make": make,
+        "model": model,
+        "trim": np.array(TRIMS, dtype=object)[rng.integers(0, len(TRIMS), rows)],
+        "body": np.array(BODIES, dtype=object)[rng.choice(len(BODIES), size=rows, p=zipf_weights(len(BODIES), 1.3))],
+        "transmission": np.where(rng.random(rows) < 0.12, None, np.array(TRANSMISSIONS, dtype=object)[(rng.random(rows) < 0.04).astype(int)]),
+        "vin": vin,
+        "state": np.array(STATES, dtype=object)[rng.choice(len(STATES), size=rows, p=zipf_weights(len(STATES), 1.1))],
+        "condition": np.round(rng.uniform(1.0, 5.0, rows), 1),
+        "odometer": np.round(rng.gamma(2.0, 35_000.0, rows)),
+        "color": np.array(COLORS, dtype=object)[rng.integers(0, len(COLORS), rows)],
+        "interior": np.array(COLORS, dtype=object)[rng.integers(0, len(COLORS), rows)],
+        "seller": np.array(SELLERS, dtype=object)[rng.choice(len(SELLERS), size=rows, p=zipf_weights(len(SELLERS), 1.0))],
+        "mmr": mmr,
+        "sellingprice": sellingprice,
+        "saledate": saledate,
+    }
+    return pd.DataFrame(columns, columns=[field["name"] for field in DATA_DICTIONARY])
+
+
+def generate_csv(path: Path, rows: int, seed: int = SEED) -> Path:
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    dates = saledate_pool(rng)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", newline="") as handle:
+        for start in range(0, rows, GENERATE_BLOCK_ROWS):
+            block = synthetic_block(rng, start, min(GENERATE_BLOCK_ROWS, rows - start), dates)
+            block.to_csv(handle, header=start == 0, index=False)
+    tmp_path.replace(path)
+    return path
+
+
+def redirect_outputs(root: Path) -> None:
+    # Point the pipeline's writers at a scratch tree so benchmarks never touch committed outputs
+    analysis.OUT_DIR = root / "outputs"
+    analysis.TABLES_DIR = analysis.OUT_DIR / "tables"
+    analysis.REPORT_DIR = root / "report"
+    analysis.WEBSITE_DATA_DIR = root / "website" / "data"
+    analysis.DASHBOARD_DIR = analysis.WEBSITE_DATA_DIR / "dashboard"
+    analysis.PREVIEW_PATH = analysis.WEBSITE_DATA_DIR / "car_prices_preview.csv"
+    analysis.VIN_SPILL_DIR = root / "vin_partitions"
+    for directory in (analysis.TABLES_DIR, analysis.REPORT_DIR, analysis.DASHBOARD_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
+
+
+def run_pipeline(csv_path: Path, chunksize: int | None = None, sketches: bool = False) -> dict:
+    metrics = analysis.RUN_METRICS = RunMetrics()
+    with tempfile.TemporaryDirectory(prefix="wheelwise-bench-") as scratch:
+        redirect_outputs(Path(scratch))
+        original_column_count = analysis.csv_column_count(csv_path)
+        if chunksize is None:
+            with stage("load"):
+                raw = analysis.read_sales_csv(csv_path)
+            with stage("clean", rows_in=len(raw)):
+                df = analysis.clean_frame(raw)
+            del raw
+            with stage("aggregate", rows_in=len(df)):
+                state = PartialAggregates.from_frame(df, original_column_count, sketches)
+            del df
+        else:
+            state = PartialAggregates()
+            reader = iter(analysis.read_sales_csv(csv_path, chunksize))
+            while True:
+                with stage("load"):
+                    chunk = next(reader, None)
+                if chunk is None:
+                    break
+                with stage("clean", rows_in=len(chunk)):
+                    df = analysis.clean_frame(chunk)
+                with stage("aggregate", rows_in=len(df)):
+                    state.merge(PartialAggregates.from_frame(df, original_column_count, sketches))
+        with stage("aggregate"):
+            tables, stats = state.finalize()
+        with stage("quality"):
+            summary, notes = analysis.build_summary(tables, stats)
+        with stage("tables"):
+            analysis.write_tables(tables)
+        with stage("preview"):
+            preview = analysis.sample_preview(csv_path)
+            analysis.write_preview(preview)
+        with stage("json"):
+            analysis.write_dashboard(tables, summary, notes, preview)
+        with stage("report"):
+            analysis.write_reports(tables, summary, notes)
+
+    return {"rows": stats["rows"], **metrics.summary()}
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": analysis.pyarrow is not None,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on synthetic car_prices-shaped data.")
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=DEFAULT_ROWS,
+        help="Synthetic dataset sizes to benchmark (default: 1M 10M 50M).",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Benchmark the streaming path with this many rows per chunk instead of one in-memory frame.",
+    )
+    parser.add_argument("--sketches", action="store_true", help="Include the approximate-statistics sketches.")
+    parser.add_argument("--data-dir", type=Path, default=BENCH_DIR, help="Where generated CSVs are kept between runs.")
+    parser.add_argument("--results", type=Path, default=RESULTS_PATH, help="JSON Lines file each result is appended to.")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--generate-only", action="store_true", help="Only write the synthetic CSVs.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    for rows in args.rows:
+        csv_path = generate_csv(args.data_dir / f"car_prices_synthetic_{rows}_{args.seed}.csv", rows, args.seed)
+        if args.generate_only:
+            print(f"{csv_path} ({csv_path.stat().st_size / 1e6:,.1f} MB)")
+            continue
+        # A fresh process per size so peak RSS is not inherited from the previous run
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(run_pipeline, csv_path, args.chunksize, args.sketches).result()
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "dataset_rows": rows,
+            "seed": args.seed,
+            "mode": f"chunked:{args.chunksize}" if args.chunksize else "in-memory",
+            "sketches": args.sketches,
+            **result,
+            "environment": environment(),
+        }
+        with args.results.open("a") as handle:
+            handle.write(json.dumps(record) + "\n")
+        stages = ", ".join(
+            f"{name} {stage['seconds']:.2f}s" for name, stage in result["stages"].items() if "/" not in name
+        )
+        print(f"{rows:,} rows: {result['wall_seconds']:.2f}s, peak RSS {result['peak_rss_mb']:,.0f} MB ({stages})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from generate_analysis import CUBE_KEYS, CUBE_MEASURES, CUBE_PATH, TIME_KEYS
+
+
+@lru_cache(maxsize=None)
+def load_cube(path: Path = CUBE_PATH) -> pd.DataFrame:
+    if not path.exists():
+        raise SystemExit(f"No OLAP cube at {path}; run scripts/generate_analysis.py first.")
+    return pd.read_csv(path, dtype={key: "category" for key in CUBE_KEYS if key not in TIME_KEYS})
+
+
+def query_cube(
+    by: list[str],
+    where: dict[str, object] | None = None,
+    measures: list[str] | None = None,
+    cube: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Group the pre-aggregated cube by ``by`` after filtering on ``where``.
+
+    ``where`` maps a dimension to one value or a list of accepted values. Returns the
+    transaction count and the mean of each requested measure per group.
+    """
+    cube = load_cube() if cube is None else cube
+    where = where or {}
+    measures = list(CUBE_MEASURES if measures is None else measures)
+    unknown = [key for key in [*by, *where] if key not in CUBE_KEYS]
+    unknown += [measure for measure in measures if measure not in CUBE_MEASURES]
+    if unknown:
+        raise ValueError(f"Unknown cube dimension or measure: {', '.join(unknown)}")
+
+    mask = pd.Series(True, index=cube.index)
+    for key, value in where.items():
+        accepted = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        mask &= cube[key].isin(accepted)
+    scoped = cube[mask]
+
+    columns = ["transactions"] + [f"{measure}_{part}" for measure in measures for part in ("count", "sum")]
+    if by:
+        grouped = scoped.dropna(subset=by).groupby(by, observed=True, as_index=False)[columns].sum()
+    else:
+        totals = scoped[columns].sum()
+        grouped = pd.DataFrame([totals]).astype({col: "int64" for col in columns if not col.endswith("_sum")})
+    for measure in measures:
+        grouped[f"avg_{measure}"] = grouped[f"{measure}_sum"] / grouped[f"{measure}_count"].where(
+            grouped[f"{measure}_count"] > 0
+        )
+    return grouped[by + ["transactions"] + [f"avg_{measure}" for measure in measures]]
+
+
+def parse_where(conditions: list[str]) -> dict[str, list]:
+    where = {}
+    for condition in conditions:
+        key, _, raw = condition.partition("=")
+        values = raw.split(",")
+        where[key] = [float(value) for value in values] if key in TIME_KEYS else values
+    return where
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Slice the pre-aggregated OLAP cube without reading car_prices.csv.")
+    parser.add_argument("--by", nargs="*", default=[], choices=CUBE_KEYS, help="Dimensions to group by.")
+    parser.add_argument(
+        "--where",
+        nargs="*",
+        default=[],
+        metavar="DIM=VALUE[,VALUE]",
+        help="Filters, e.g. make=FORD,KIA sale_year=2015.",
+    )
+    parser.add_argument("--measures", nargs="*", default=None, choices=CUBE_MEASURES, help="Measures to average.")
+    parser.add_argument("--csv", action="store_true", help="Print CSV instead of an aligned table.")
+    args = parser.parse_args()
+
+    result = query_cube(args.by, parse_where(args.where), args.measures)
+    if args.csv:
+        result.to_csv(sys.stdout, index=False)
+    else:
+        print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,322 +1,2303 @@
 from __future__ import annotations
 
+import argparse
+import cProfile
+import csv
+import gzip
+import hashlib
+import html
+import inspect
+import io
 import json
+import os
+import pstats
+import shutil
+import sqlite3
+import struct
+import sys
+import time
+import tracemalloc
+import types
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from decimal import ROUND_FLOOR, Decimal
+from functools import partial
 from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator, TextIO
 
 import numpy as np
 import pandas as pd
 
-BASE = Path(__file__).resolve().parent.parent
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # optional: enables the Feather cleaned-data cache
+    pyarrow = None
+
+try:
+    import brotli
+except ImportError:  # optional: adds .br siblings next to the .gz dashboard shards
+    brotli = None
+
+try:
+    import resource
+except ImportError:  # not available on Windows: run metrics then leave out peak RSS
+    resource = None
+
+import report_template
+from report_template import DATA_DICTIONARY, QUALITY_TABLES, REPORT_HTML_STYLE, SERIES_TABLES
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+BASE = SCRIPTS_DIR.parent
 CSV_PATH = BASE / "car_prices.csv"
 OUT_DIR = BASE / "outputs"
 TABLES_DIR = OUT_DIR / "tables"
 REPORT_DIR = BASE / "report"
 WEBSITE_DATA_DIR = BASE / "website" / "data"
-
-DATA_DICTIONARY = [
-    {"name": "year", "description": "Model year of the vehicle", "type": "int", "example": "2015", "notes": "Ranges from ~1990 to 2015 in this dataset"},
-    {"name": "make", "description": "Manufacturer / brand of the vehicle", "type": "string", "example": "FORD", "notes": "Uppercased during cleaning; 50+ unique makes"},
-    {"name": "model", "description": "Specific model name within the make", "type": "string", "example": "F-150", "notes": "Over 1,000 unique model values"},
-    {"name": "trim", "description": "Trim level or package variant", "type": "string", "example": "SE", "notes": "Indicates feature/equipment tier; may be missing"},
-    {"name": "body", "description": "Body style classification of the vehicle", "type": "string", "example": "SEDAN", "notes": "Uppercased; common values: SEDAN, SUV, CREW CAB"},
-    {"name": "transmission", "description": "Transmission type", "type": "string", "example": "automatic", "notes": "Typically 'automatic' or 'manual'"},
-    {"name": "vin", "description": "Vehicle Identification Number (unique 17-char ID)", "type": "string", "example": "1FAHP3F2...", "notes": "Unique per vehicle; serves as a natural key"},
-    {"name": "state", "description": "U.S. state where the sale occurred", "type": "string", "example": "FL", "notes": "Uppercased two-letter abbreviation"},
-    {"name": "condition", "description": "Numeric condition rating of the vehicle", "type": "float", "example": "3.3", "notes": "Scale approximately 1.0 (poor) to 5.0 (excellent)"},
-    {"name": "odometer", "description": "Mileage reading at time of sale", "type": "float", "example": "36368.0", "notes": "Measured in miles; higher values indicate more use"},
-    {"name": "color", "description": "Exterior color of the vehicle", "type": "string", "example": "black", "notes": "Free-text; some missing values"},
-    {"name": "interior", "description": "Interior color of the vehicle", "type": "string", "example": "gray", "notes": "Free-text; some missing values"},
-    {"name": "seller", "description": "Name of the selling entity", "type": "string", "example": "hertz auto sales", "notes": "Dealer or auction house name"},
-    {"name": "mmr", "description": "Manheim Market Report value (independent market estimate)", "type": "float", "example": "14525.0", "notes": "Benchmark price used to evaluate deal quality"},
-    {"name": "sellingprice", "description": "Actual transaction price the vehicle sold for", "type": "float", "example": "13500.0", "notes": "Primary metric for pricing analysis"},
-    {"name": "saledate", "description": "Full timestamp of the sale event", "type": "string", "example": "Tue Dec 16 2014 12:30:00 GMT-0800", "notes": "Parsed into sale_year, sale_month during cleaning"},
+DASHBOARD_DIR = WEBSITE_DATA_DIR / "dashboard"
+CACHE_DIR = BASE / ".cache"
+STATE_PATH = CACHE_DIR / "aggregate_state.pkl"
+# Bump whenever the PartialAggregates layout (cube keys/measures, saved fields) changes
+AGGREGATE_STATE_VERSION = "8"
+# Per-VIN records spilled to disk by hash prefix, one directory per spilling run (see VinLedger)
+VIN_SPILL_DIR = CACHE_DIR / "vin_partitions"
+CUBE_PATH = OUT_DIR / "olap_cube.csv.gz"
+# Optional SQLite store (--store): the cleaned rows as a `sales` fact table for ad-hoc SQL (see
+# scripts/store_query.py). make/body/state are dictionary-encoded in dim_* tables and joined back by
+# the sales_v view. SQLite has no materialized views, so each OLAP roll-up is kept as a table of the
+# same name and rebuilt after every load.
+STORE_PATH = OUT_DIR / "car_prices.sqlite"
+# Bump whenever the store schema changes; appending to an older store is refused
+STORE_VERSION = "1"
+STORE_DIMENSIONS = ["make", "body", "state"]
+STORE_COLUMNS = {
+    "make_id": "INTEGER",
+    "body_id": "INTEGER",
+    "state_id": "INTEGER",
+    "model": "TEXT",
+    "trim": "TEXT",
+    "transmission": "TEXT",
+    "seller": "TEXT",
+    "vin": "TEXT",
+    "year": "INTEGER",
+    "condition": "REAL",
+    "odometer": "REAL",
+    "mmr": "REAL",
+    "sellingprice": "REAL",
+    "price_vs_mmr": "REAL",
+    "sale_datetime": "TEXT",
+    "sale_date": "TEXT",
+    "sale_year": "INTEGER",
+    "sale_month": "INTEGER",
+}
+STORE_INDEXES = {
+    "sales_make_year_month": ["make_id", "sale_year", "sale_month"],
+    "sales_state": ["state_id"],
+    "sales_vin": ["vin"],
+}
+STORE_INSERT_BATCH_ROWS = 50_000
+# Checksums of the last published output generation, and the threads its files are written on
+MANIFEST_PATH = OUT_DIR / "manifest.json"
+OUTPUT_WRITE_WORKERS = min(8, os.cpu_count() or 1)
+# Content-hash keys of the last run's pipeline stages, and the pickled results later stages reuse
+STAGE_CACHE_DIR = CACHE_DIR / "stages"
+STAGE_KEYS_PATH = STAGE_CACHE_DIR / "keys.json"
+# --profile output; the top functions by cumulative time are also printed
+PROFILE_PATH = CACHE_DIR / "pipeline.pstats"
+PROFILE_TOP_FUNCTIONS = 25
+# Upper bound on the CSV bytes one parallel worker parses at a time
+PARTITION_BYTES = 64 * 1024 * 1024
+# Dashboard payload shards (website/data/dashboard/<shard>.json), each fetched by the view that needs it
+DASHBOARD_SHARDS = {
+    "core": [
+        "summary",
+        "data_dictionary",
+        "top_makes",
+        "top_bodies",
+        "top_states",
+        "data_quality_notes",
+        "code_showcase",
+        "sample_head",
+    ],
+    "trends": ["transactions_by_year", "transactions_by_month", "transactions_by_make_year", "lookup"],
+    "make_month": ["transactions_by_make_month"],
+    "pricing": [
+        "avg_price_by_make",
+        "avg_price_by_make_year",
+        "avg_price_by_year",
+        "price_vs_mmr_by_make",
+        "price_vs_mmr_by_make_year",
+        "price_vs_mmr_by_year",
+    ],
+    # Fetched once a make is selected
+    "drilldown": ["top_models_by_make", "top_trims_by_make", "top_sellers_by_state"],
+    # Dense day arrays for the daily volume chart, fetched after the first render
+    "timeseries": ["daily_series"],
+    # Only filled by --sketches runs; written empty otherwise so a stale shard never outlives its run
+    "sketches": [
+        "percentiles_by_make",
+        "percentiles_by_year",
+        "percentiles_by_make_year",
+        "distinct_vins_by_make",
+        "distinct_vins_by_state",
+    ],
+}
+DASHBOARD_DICTIONARY_COLUMNS = ["make"]
+# Series scopes the daily volume chart can show; state series and weekly series stay in the CSV tables
+DASHBOARD_SERIES_SCOPES = ["All", "make"]
+# Dashboard lookup index: make-sorted tables get per-make row offsets, make-ranked tables a row
+# position per make id, and every metric a top-N make ranking per sale year (plus "All")
+DASHBOARD_MAKE_SORTED = [
+    "transactions_by_make_year",
+    "transactions_by_make_month",
+    "avg_price_by_make_year",
+    "price_vs_mmr_by_make_year",
+    "top_models_by_make",
+    "top_trims_by_make",
 ]
+DASHBOARD_MAKE_RANKED = ["avg_price_by_make", "price_vs_mmr_by_make"]
+DASHBOARD_RANKING_LIMIT = 15
+# Dotted map: source grid per country, and the pruned, pre-projected points the page draws.
+# The view, bounds and radius must match US_MAP_VIEW, CONTIGUOUS_US_BOUNDS, US_DENSE_SOURCE_RADIUS_DEGREES,
+# MAP_VISIBLE_COUNTRIES and the #map-svg viewBox in website/app.js and index.html.
+MAP_SOURCE_PATH = BASE / "data" / "dotted_map_data.json"
+MAP_POINTS_PATH = WEBSITE_DATA_DIR / "map_points.bin"
+MAP_VISIBLE_COUNTRIES = ["US"]
+MAP_VIEW = {"center_lon": -96.0, "center_lat": 37.5, "scale_factor": 0.8, "width": 1100, "height": 600}
+CONTIGUOUS_US_BOUNDS = {"min_lon": -125, "max_lon": -66, "min_lat": 24, "max_lat": 50}
+US_DENSE_SOURCE_RADIUS_DEGREES = 2.15
+# Projected coordinates are stored as uint16 in 1/50 px steps
+MAP_POINT_STEPS = 50
+MAP_POINTS_MAGIC = b"WWMP"
+MAP_POINTS_VERSION = 1
+# Dataset preview: raw rows sampled from car_prices.csv for the website's preview table
+PREVIEW_PATH = WEBSITE_DATA_DIR / "car_prices_preview.csv"
+PREVIEW_ROWS = 240
+PREVIEW_HEAD_ROWS = 24
+# Candidate lines read per preview row before stratifying by make/state
+PREVIEW_OVERSAMPLE = 4
+PREVIEW_SEED = 20150101
+# Below this many data bytes the whole file is scanned instead of seeking to random offsets
+PREVIEW_FULL_SCAN_BYTES = 4 * 1024 * 1024
+# Rows formatted per block when streaming a table to a report file
+RENDER_BLOCK_ROWS = 10_000
+
+# Ingest schema: only the columns the pipeline reads. Label columns load as categoricals so
+# strip/upper normalization runs once per distinct value; vin stays a plain string column.
+CSV_DTYPES = {
+    "make": "category",
+    "model": "category",
+    "trim": "category",
+    "body": "category",
+    "transmission": "category",
+    "state": "category",
+    "seller": "category",
+    "vin": "string",
+    "saledate": "category",
+}
+# Numeric columns are coerced after parsing so malformed cells become NaN instead of failing the read.
+NUMERIC_DTYPES = {
+    "year": "float32",
+    "condition": "float32",
+    "odometer": "float32",
+    "mmr": "float32",
+    "sellingprice": "float32",
+}
+INGEST_COLUMNS = list(CSV_DTYPES) + list(NUMERIC_DTYPES)
+UPPERCASE_COLUMNS = ["make", "body", "state"]
+SALEDATE_FORMAT = "%a %b %d %Y %H:%M:%S GMT%z"
+
+LOW_PRICE_THRESHOLD = 100
+HIGH_PRICE_THRESHOLD = 200000
+EXTREME_GAP_THRESHOLD = 50000
+# Canonical labels, looked up by the uppercased label once the column's tag pattern is stripped, so
+# "chev truck" becomes CHEV and then CHEVROLET. Both are resolved per distinct label, not per row.
+LABEL_TAG_PATTERNS = {"make": r"\s+(?:TRUCK|TK)$"}
+LABEL_ALIASES = {
+    "make": {
+        "CHEV": "CHEVROLET",
+        "LANDROVER": "LAND ROVER",
+        "MERCEDES": "MERCEDES-BENZ",
+        "MERCEDES-B": "MERCEDES-BENZ",
+        "VW": "VOLKSWAGEN",
+    },
+    "body": {
+        "BEETLE CONVERTIBLE": "CONVERTIBLE",
+        "CTS COUPE": "COUPE",
+        "CTS WAGON": "WAGON",
+        "CTS-V COUPE": "COUPE",
+        "CTS-V WAGON": "WAGON",
+        "ELANTRA COUPE": "COUPE",
+        "G CONVERTIBLE": "CONVERTIBLE",
+        "G COUPE": "COUPE",
+        "G SEDAN": "SEDAN",
+        "G37 CONVERTIBLE": "CONVERTIBLE",
+        "G37 COUPE": "COUPE",
+        "GENESIS COUPE": "COUPE",
+        "GRANTURISMO CONVERTIBLE": "CONVERTIBLE",
+        "KOUP": "COUPE",
+        "Q60 CONVERTIBLE": "CONVERTIBLE",
+        "Q60 COUPE": "COUPE",
+        "REGULAR-CAB": "REGULAR CAB",
+        "TSX SPORT WAGON": "WAGON",
+    },
+    # Truck-tagged makes carry lowercase, unhyphenated model names
+    "model": {
+        "E150": "E-Series Van",
+        "E250": "E-Series Van",
+        "E350": "E-Series Van",
+        "F150": "F-150",
+        "F250": "F-250 Super Duty",
+        "F350": "F-350 Super Duty",
+        "RAM": "Ram Pickup 1500",
+        "RAM 1500": "Ram Pickup 1500",
+        "SIERRA 1500": "Sierra 1500",
+        "SILVERADO 1500": "Silverado 1500",
+    },
+}
+
+
+def json_ready(values: pd.Series) -> list:
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def columnar_table(df: pd.DataFrame, dictionaries: dict[str, list[str]]) -> dict:
+    columns = {}
+    for col in df.columns:
+        if col in dictionaries:
+            codes = pd.Categorical(df[col], categories=dictionaries[col]).codes
+            columns[col] = [int(code) if code >= 0 else None for code in codes]
+        else:
+            columns[col] = json_ready(df[col])
+    return {"length": len(df), "columns": columns}
+
+
+def dashboard_dictionaries(payload: dict) -> dict[str, list[str]]:
+    # One dictionary per column across all shards, so an encoded id means the same label in every shard
+    dictionaries = {}
+    for col in DASHBOARD_DICTIONARY_COLUMNS:
+        labels = set()
+        for table in payload.values():
+            if isinstance(table, pd.DataFrame) and col in table.columns:
+                labels.update(table[col].dropna().astype(str))
+        dictionaries[col] = sorted(labels)
+    return dictionaries
+
+
+def encode_dashboard_shard(entries: dict, dictionaries: dict[str, list[str]]) -> dict:
+    tables = {key: value for key, value in entries.items() if isinstance(value, pd.DataFrame)}
+    # Each shard carries the dictionaries its tables use so it can be decoded without the others
+    used = {
+        col: labels
+        for col, labels in dictionaries.items()
+        if any(col in table.columns for table in tables.values())
+    }
+    return {
+        "dictionaries": used,
+        "tables": {key: columnar_table(table, used) for key, table in tables.items()},
+        "data": {key: value for key, value in entries.items() if key not in tables},
+    }
 
 
-def to_records(df: pd.DataFrame, max_rows: int | None = None) -> list[dict]:
-    data = df if max_rows is None else df.head(max_rows)
-    return data.replace({np.nan: None}).to_dict(orient="records")
+def dense_series_payload(table: pd.DataFrame, period: str, step_days: int, scopes: list[str]) -> dict:
+    # Each scope's series become rows of dense arrays over one shared period axis
+    length = int(table[period].nunique())
+    table = table[table["scope"].isin(scopes)]
+    series = {}
+    for scope, rows in table.groupby("scope", sort=False):
+        entry = {"keys": rows["key"].iloc[::length].tolist()}
+        for column in rows.columns[rows.columns.get_loc("transactions") :]:
+            values = rows[column]
+            entry[column] = [json_ready(values.iloc[offset : offset + length]) for offset in range(0, len(values), length)]
+        series[scope] = entry
+    start = table[period].iloc[0] if length else None
+    return {"start": start, "length": length, "step_days": step_days, "scopes": series}
+
+
+def make_ids(values: pd.Series, makes: list[str]) -> np.ndarray:
+    return pd.Categorical(values, categories=makes).codes
+
+
+def make_ranking(table: pd.DataFrame, value: str, makes: list[str]) -> dict:
+    top = table.head(DASHBOARD_RANKING_LIMIT)
+    return {"make": make_ids(top["make"], makes).tolist(), value: json_ready(top[value])}
+
+
+def dashboard_lookup(payload: dict, makes: list[str]) -> dict:
+    tx_by_make_year = payload["transactions_by_make_year"]
+    tx_by_make_month = payload["transactions_by_make_month"]
+    years = sorted(int(year) for year in tx_by_make_year["sale_year"].unique())
+
+    make_offsets = {}
+    for key in DASHBOARD_MAKE_SORTED:
+        if key not in payload:
+            continue
+        ids = make_ids(payload[key]["make"], makes)
+        make_offsets[key] = np.searchsorted(ids, np.arange(len(makes) + 1)).tolist()
+    make_rows = {}
+    for key in DASHBOARD_MAKE_RANKED:
+        rows = np.full(len(makes), -1)
+        rows[make_ids(payload[key]["make"], makes)] = np.arange(len(payload[key]))
+        make_rows[key] = rows.tolist()
+
+    # Rankings mirror the dashboard's own ordering: descending value, ties kept in make order
+    by_make = tx_by_make_year.groupby("make", as_index=False)["transactions"].sum()
+    rankings = {
+        "transactions": {"All": by_make.sort_values("transactions", ascending=False, kind="stable")},
+        "avg_sellingprice": {"All": payload["avg_price_by_make"]},
+        "avg_price_vs_mmr": {"All": payload["price_vs_mmr_by_make"]},
+    }
+    year_transactions = {}
+    year_monthly = {}
+    for year in years:
+        for metric, key in [
+            ("transactions", "transactions_by_make_year"),
+            ("avg_sellingprice", "avg_price_by_make_year"),
+            ("avg_price_vs_mmr", "price_vs_mmr_by_make_year"),
+        ]:
+            scoped = payload[key][payload[key]["sale_year"] == year]
+            rankings[metric][str(year)] = scoped.sort_values(metric, ascending=False, kind="stable")
+        year_transactions[str(year)] = int(tx_by_make_year.loc[tx_by_make_year["sale_year"] == year, "transactions"].sum())
+        monthly = tx_by_make_month[tx_by_make_month["sale_year"] == year].groupby("year_month")["transactions"].sum()
+        year_monthly[str(year)] = {"year_month": monthly.index.tolist(), "transactions": monthly.astype(int).tolist()}
+
+    return {
+        "makes": makes,
+        "years": years,
+        "make_offsets": make_offsets,
+        "make_rows": make_rows,
+        "rankings": {
+            metric: {year: make_ranking(table, metric, makes) for year, table in by_year.items()}
+            for metric, by_year in rankings.items()
+        },
+        "year_transactions": year_transactions,
+        "year_monthly": year_monthly,
+    }
 
 
-def markdown_table(df: pd.DataFrame, n: int = 10) -> str:
-    sample = df.head(n).copy()
-    cols = list(sample.columns)
-    header = "| " + " | ".join(str(c) for c in cols) + " |"
-    sep = "| " + " | ".join(["---"] * len(cols)) + " |"
-    rows = []
-    for _, row in sample.iterrows():
-        values = []
-        for c in cols:
-            v = row[c]
-            if pd.isna(v):
-                values.append("")
-            elif isinstance(v, (float, np.floating)):
-                values.append(f"{v:.2f}")
+def write_temporary(path: Path, render: Callable[[IO], object], mode: str = "w", **kwargs) -> tuple[Path, str, int]:
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with tmp_path.open(mode, **kwargs) as handle:
+            render(handle)
+        digest = file_sha256(tmp_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path, digest, tmp_path.stat().st_size
+
+
+def manifest_key(path: Path) -> str:
+    path = path.resolve()
+    return path.relative_to(BASE).as_posix() if path.is_relative_to(BASE) else str(path)
+
+
+class OutputGeneration:
+    """Every output file of one run, rendered concurrently to temporary siblings and published together.
+
+    Nothing replaces a published file until every render has succeeded, so a failed run leaves the
+    previous generation in place. Files whose SHA-256 is unchanged are not replaced at all (their
+    mtime stays put), and the manifest with every file's checksum is written last.
+    """
+
+    def __init__(self, workers: int = OUTPUT_WRITE_WORKERS) -> None:
+        self.previous = json.loads(MANIFEST_PATH.read_text()) if MANIFEST_PATH.exists() else {"generation": 0, "files": {}}
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="output")
+        self.jobs: dict[Path, Future] = {}
+
+    def submit(self, path: Path, render: Callable[[IO], object], mode: str = "w", **kwargs) -> None:
+        if path in self.jobs:
+            raise ValueError(f"{path} is written twice in one output generation")
+        self.jobs[path] = self.pool.submit(write_temporary, path, render, mode, **kwargs)
+
+    def unchanged(self, path: Path, digest: str, size: int) -> bool:
+        if not path.exists():
+            return False
+        stat = path.stat()
+        recorded = self.previous["files"].get(manifest_key(path))
+        if recorded is not None and (recorded["bytes"], recorded["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return recorded["sha256"] == digest
+        return stat.st_size == size and file_sha256(path) == digest
+
+    def publish(self) -> dict:
+        try:
+            rendered = {path: future.result() for path, future in self.jobs.items()}
+        except BaseException:
+            for future in self.jobs.values():
+                if future.done() and future.exception() is None:
+                    future.result()[0].unlink(missing_ok=True)
+            raise
+        finally:
+            self.pool.shutdown(wait=True)
+
+        # Files of skipped stages keep their entries from the previous generation
+        files = {key: entry for key, entry in self.previous["files"].items() if (BASE / key).exists()}
+        written = []
+        for path, (tmp_path, digest, size) in rendered.items():
+            if self.unchanged(path, digest, size):
+                tmp_path.unlink()
             else:
-                values.append(str(v))
-        rows.append("| " + " | ".join(values) + " |")
-    return "\n".join([header, sep] + rows)
+                os.replace(tmp_path, path)
+                written.append(manifest_key(path))
+            files[manifest_key(path)] = {"sha256": digest, "bytes": size, "mtime_ns": path.stat().st_mtime_ns}
+
+        manifest = {
+            "generation": self.previous["generation"] + (1 if written else 0),
+            "written": sorted(written),
+            "files": dict(sorted(files.items())),
+        }
+        MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = MANIFEST_PATH.with_name(MANIFEST_PATH.name + ".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp_path, MANIFEST_PATH)
+        return manifest
+
+
+# The generation outputs are published in; without one (benchmarks, imports) each file is replaced
+# as soon as it is written
+OUTPUT_GENERATION: OutputGeneration | None = None
+
+
+def render_output(path: Path, render: Callable[[IO], object], mode: str = "w", **kwargs) -> None:
+    if OUTPUT_GENERATION is not None:
+        OUTPUT_GENERATION.submit(path, render, mode, **kwargs)
+        return
+    tmp_path, digest, size = write_temporary(path, render, mode, **kwargs)
+    if path.exists() and path.stat().st_size == size and file_sha256(path) == digest:
+        tmp_path.unlink()
+    else:
+        os.replace(tmp_path, path)
+
+
+def write_output(path: Path, body: str | bytes) -> None:
+    render_output(path, lambda handle: handle.write(body), "wb" if isinstance(body, bytes) else "w")
+
+
+def write_precompressed(path: Path, body: bytes) -> None:
+    # Compression runs on the output threads along with the writes
+    write_output(path, body)
+    render_output(
+        path.with_name(path.name + ".gz"), lambda handle: handle.write(gzip.compress(body, compresslevel=9, mtime=0)), "wb"
+    )
+    if brotli is not None:
+        render_output(path.with_name(path.name + ".br"), lambda handle: handle.write(brotli.compress(body, quality=11)), "wb")
+
+
+def write_dashboard_shards(payload: dict) -> None:
+    DASHBOARD_DIR.mkdir(parents=True, exist_ok=True)
+    dictionaries = dashboard_dictionaries(payload)
+    payload = {**payload, "lookup": dashboard_lookup(payload, dictionaries["make"])}
+    for shard, keys in DASHBOARD_SHARDS.items():
+        encoded = encode_dashboard_shard({key: payload[key] for key in keys if key in payload}, dictionaries)
+        body = json.dumps(encoded, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        write_precompressed(DASHBOARD_DIR / f"{shard}.json", body)
+
+
+def js_fixed(value: float, digits: int) -> float:
+    # Number(value.toFixed(digits)) from JavaScript: exact half-way cases round toward +infinity
+    scaled = (Decimal(value).scaleb(digits) + Decimal("0.5")).to_integral_value(rounding=ROUND_FLOOR)
+    return float(scaled.scaleb(-digits))
+
+
+def in_contiguous_us(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    bounds = CONTIGUOUS_US_BOUNDS
+    return (lon >= bounds["min_lon"]) & (lon <= bounds["max_lon"]) & (lat >= bounds["min_lat"]) & (lat <= bounds["max_lat"])
+
+
+def dense_axis(values: Iterable[float]) -> list[float]:
+    # Fill gaps between neighbouring grid lines (0.8-5 degrees apart) with two extra lines
+    axis = sorted({js_fixed(value, 5) for value in values})
+    dense = []
+    for current, following in zip(axis, axis[1:] + [None]):
+        dense.append(current)
+        if following is not None and 0.8 < following - current <= 5:
+            gap = following - current
+            dense.extend([js_fixed(current + gap / 3, 5), js_fixed(current + gap * 2 / 3, 5)])
+    return dense
+
+
+def dense_us_points(cities: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    lon = np.array([city["lon"] for city in cities], dtype="float64")
+    lat = np.array([city["lat"] for city in cities], dtype="float64")
+    keep = in_contiguous_us(lon, lat)
+    lon, lat = lon[keep], lat[keep]
+    if len(lon) == 0:
+        return lon, lat
+    # Latitude-major grid, matching the order the page used to assign dot ranks
+    grid_lat, grid_lon = (axis.ravel() for axis in np.meshgrid(dense_axis(lat), dense_axis(lon), indexing="ij"))
+    inside = in_contiguous_us(grid_lon, grid_lat)
+    grid_lon, grid_lat = grid_lon[inside], grid_lat[inside]
+    lon_diff = grid_lon[:, None] - lon[None, :]
+    lat_diff = grid_lat[:, None] - lat[None, :]
+    nearest = (lon_diff * lon_diff + lat_diff * lat_diff).min(axis=1)
+    near = nearest <= US_DENSE_SOURCE_RADIUS_DEGREES * US_DENSE_SOURCE_RADIUS_DEGREES
+    return grid_lon[near], grid_lat[near]
+
+
+def project_mercator(lon: np.ndarray, lat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    view = MAP_VIEW
+    scale = view["width"] * view["scale_factor"]
+    phi0 = np.radians(view["center_lat"])
+    x = view["width"] / 2 + scale * (np.radians(lon) - np.radians(view["center_lon"]))
+    y = view["height"] / 2 - scale * (np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) - np.log(np.tan(np.pi / 4 + phi0 / 2)))
+    return x, y
+
+
+def map_points(source: dict[str, list[dict]]) -> dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    countries = {}
+    for code in MAP_VISIBLE_COUNTRIES:
+        cities = source.get(code, [])
+        if code == "US":
+            lon, lat = dense_us_points(cities)
+            rank = np.arange(len(lon))
+        else:
+            lon = np.array([city["lon"] for city in cities], dtype="float64")
+            lat = np.array([city["lat"] for city in cities], dtype="float64")
+            rank = np.array([city["cityDistanceRank"] for city in cities], dtype="int64")
+        # Only the contiguous-U.S. frame is drawn, so anything outside it is dropped here
+        keep = in_contiguous_us(lon, lat)
+        x, y = project_mercator(lon[keep], lat[keep])
+        rank = rank[keep]
+        visible = (x >= 0) & (x <= MAP_VIEW["width"]) & (y >= 0) & (y <= MAP_VIEW["height"])
+        countries[code] = (x[visible], y[visible], rank[visible])
+    return countries
+
+
+def encode_map_points(countries: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]]) -> bytes:
+    # Little-endian layout: 16-byte header, one 8-byte record (code, point count) per country, then
+    # per country the uint16 x, y and dot-rank arrays. x and y are SVG pixels times MAP_POINT_STEPS.
+    header = struct.pack(
+        "<4sHHHHHH",
+        MAP_POINTS_MAGIC,
+        MAP_POINTS_VERSION,
+        MAP_POINT_STEPS,
+        MAP_VIEW["width"],
+        MAP_VIEW["height"],
+        len(countries),
+        0,
+    )
+    records = b"".join(struct.pack("<2sHI", code.encode("ascii"), 0, len(x)) for code, (x, _, _) in countries.items())
+    arrays = b"".join(
+        np.concatenate([np.rint(x * MAP_POINT_STEPS), np.rint(y * MAP_POINT_STEPS), rank]).astype("<u2").tobytes()
+        for x, y, rank in countries.values()
+    )
+    return header + records + arrays
 
 
-def html_table(df: pd.DataFrame, n: int = 10) -> str:
-    sample = df.head(n).copy()
-    cols = list(sample.columns)
-    head = "".join(f"<th>{c}</th>" for c in cols)
-    rows = []
-    for _, row in sample.iterrows():
-        tds = []
-        for c in cols:
-            v = row[c]
-            if pd.isna(v):
-                tds.append("<td></td>")
-            elif isinstance(v, (float, np.floating)):
-                tds.append(f"<td>{v:.2f}</td>")
-            else:
-                tds.append(f"<td>{v}</td>")
-        rows.append("<tr>" + "".join(tds) + "</tr>")
-    return "<table><thead><tr>" + head + "</tr></thead><tbody>" + "".join(rows) + "</tbody></table>"
-
-
-def data_dictionary_md_table() -> str:
-    header = "| Column | Description | Type | Example | Notes |"
-    sep = "| --- | --- | --- | --- | --- |"
-    rows = []
-    for col in DATA_DICTIONARY:
-        rows.append(
-            f"| `{col['name']}` | {col['description']} | {col['type']} | `{col['example']}` | {col['notes']} |"
-        )
-    return "\n".join([header, sep] + rows)
+def write_map_points() -> None:
+    source = json.loads(MAP_SOURCE_PATH.read_text())
+    write_precompressed(MAP_POINTS_PATH, encode_map_points(map_points(source)))
 
 
-def data_dictionary_html_table() -> str:
-    head = "<th>Column</th><th>Description</th><th>Type</th><th>Example</th><th>Notes</th>"
-    rows = []
-    for col in DATA_DICTIONARY:
-        rows.append(
-            f"<tr><td><code>{col['name']}</code></td><td>{col['description']}</td>"
-            f"<td>{col['type']}</td><td><code>{col['example']}</code></td><td>{col['notes']}</td></tr>"
-        )
-    return "<table><thead><tr>" + head + "</tr></thead><tbody>" + "".join(rows) + "</tbody></table>"
+def format_cells(df: pd.DataFrame, escape: bool = False) -> list[np.ndarray]:
+    # Format whole columns at once: floats to 2 decimals, other values once per distinct
+    # value via str (and HTML escaping), missing values as blank cells
+    cells = []
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_float_dtype(values.dtype):
+            text = np.char.mod("%.2f", values.to_numpy(dtype="float64", na_value=np.nan)).astype(object)
+            cells.append(np.where(values.isna().to_numpy(), "", text))
+            continue
+        codes, uniques = pd.factorize(values)
+        labels = [str(value) for value in uniques]
+        if escape:
+            labels = [html.escape(label) for label in labels]
+        cells.append(np.array(labels + [""], dtype=object)[codes])
+    return cells
 
 
-def main() -> None:
-    TABLES_DIR.mkdir(parents=True, exist_ok=True)
-    REPORT_DIR.mkdir(parents=True, exist_ok=True)
-    WEBSITE_DATA_DIR.mkdir(parents=True, exist_ok=True)
+def join_cells(cells: list[np.ndarray], sep: str) -> np.ndarray:
+    joined = cells[0]
+    for column in cells[1:]:
+        joined = joined + sep + column
+    return joined
+
 
-    df = pd.read_csv(CSV_PATH)
-    original_column_count = len(df.columns)
-
-    # Cleaning and type handling
-    for col in ["make", "model", "trim", "body", "state", "seller", "color", "interior", "transmission"]:
-        if col in df.columns:
-            df[col] = df[col].astype("string").str.strip()
-    df["make"] = df["make"].str.upper()
-    df["body"] = df["body"].str.upper()
-    df["state"] = df["state"].str.upper()
-
-    df["sellingprice"] = pd.to_numeric(df["sellingprice"], errors="coerce")
-    df["mmr"] = pd.to_numeric(df["mmr"], errors="coerce")
-    df["odometer"] = pd.to_numeric(df["odometer"], errors="coerce")
-    df["condition"] = pd.to_numeric(df["condition"], errors="coerce")
-
-    cleaned_saledate = (
-        df["saledate"]
-        .astype("string")
-        .str.replace(r" \([A-Z]+\)$", "", regex=True)
-    )
-    df["sale_datetime"] = pd.to_datetime(
-        cleaned_saledate,
-        format="%a %b %d %Y %H:%M:%S GMT%z",
-        errors="coerce",
-        utc=True,
+def write_markdown_table(handle: TextIO, df: pd.DataFrame, n: int | None = 10) -> None:
+    sample = df if n is None else df.head(n)
+    cols = list(sample.columns)
+    handle.write("| " + " | ".join(str(c) for c in cols) + " |\n")
+    handle.write("| " + " | ".join(["---"] * len(cols)) + " |")
+    for start in range(0, len(sample), RENDER_BLOCK_ROWS):
+        cells = format_cells(sample.iloc[start : start + RENDER_BLOCK_ROWS])
+        rows = "| " + join_cells(cells, " | ") + " |"
+        handle.write("\n" + "\n".join(rows))
+
+
+def write_html_table(handle: TextIO, df: pd.DataFrame, n: int | None = 10) -> None:
+    sample = df if n is None else df.head(n)
+    head = "".join(f"<th>{html.escape(str(c))}</th>" for c in sample.columns)
+    handle.write("<table><thead><tr>" + head + "</tr></thead><tbody>")
+    for start in range(0, len(sample), RENDER_BLOCK_ROWS):
+        cells = format_cells(sample.iloc[start : start + RENDER_BLOCK_ROWS], escape=True)
+        rows = "<tr><td>" + join_cells(cells, "</td><td>") + "</td></tr>"
+        handle.write("".join(rows))
+    handle.write("</tbody></table>")
+
+
+class FrameTables:
+    """The in-memory tables behind report_template's sections and appendix."""
+
+    def __init__(self, tables: dict[str, pd.DataFrame]) -> None:
+        self.tables = tables
+
+    def frame(self, name: str, columns: list[str] | None) -> pd.DataFrame:
+        table = self.tables[name]
+        return table if columns is None else table[columns]
+
+    def values(self, name: str, column: str) -> list:
+        return self.tables[name][column].tolist()
+
+    def write_markdown(self, handle: TextIO, name: str, columns: list[str] | None = None, n: int | None = 10) -> None:
+        write_markdown_table(handle, self.frame(name, columns), n)
+
+    def write_html(self, handle: TextIO, name: str, columns: list[str] | None = None, n: int | None = 10) -> None:
+        write_html_table(handle, self.frame(name, columns), n)
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> float | None:
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except OSError:  # no procfs (macOS, Windows)
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _round_mb(value: float | None) -> float | None:
+    return None if value is None else round(value, 1)
+
+
+class RunMetrics:
+    """Wall time, memory and row counts per named pipeline stage, plus Chrome trace events.
+
+    Stages nest (recorded as ``parent/child``) and accumulate when entered more than once, e.g. once
+    per chunk. ``profiled_stages`` limits cProfile to those stage names; by default every top-level
+    stage is profiled.
+    """
+
+    def __init__(
+        self,
+        trace_memory: bool = False,
+        profiler: cProfile.Profile | None = None,
+        profiled_stages: list[str] | None = None,
+    ) -> None:
+        self.started = time.perf_counter()
+        self.stages: dict[str, dict] = {}
+        self.events: list[dict] = []
+        self.path: list[str] = []
+        self.trace_memory = trace_memory
+        self.memory_peaks: list[int] = []
+        self.profiler = profiler
+        self.profiled_stages = profiled_stages
+        self.profiling = False
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int | None = None) -> Iterator[dict]:
+        counts = {"rows_in": rows_in, "rows_out": None}
+        self.path.append(name)
+        key = "/".join(self.path)
+        profile = (
+            self.profiler is not None
+            and not self.profiling
+            and (name in self.profiled_stages if self.profiled_stages else len(self.path) == 1)
+        )
+        if profile:
+            self.profiling = True
+            self.profiler.enable()
+        if self.trace_memory:
+            # tracemalloc has one peak, so fold it into the enclosing stage before resetting it
+            if self.memory_peaks:
+                self.memory_peaks[-1] = max(self.memory_peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self.memory_peaks.append(0)
+        stage = self.stages.setdefault(key, {"seconds": 0.0, "calls": 0, "rows_in": None, "rows_out": None})
+        started = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            elapsed = time.perf_counter() - started
+            if profile:
+                self.profiler.disable()
+                self.profiling = False
+            self.path.pop()
+
+            stage["seconds"] += elapsed
+            stage["calls"] += 1
+            for field, value in counts.items():
+                if value is not None:
+                    stage[field] = (stage[field] or 0) + int(value)
+            rss = current_rss_mb()
+            if rss is not None:
+                stage["rss_mb"] = max(stage.get("rss_mb", 0.0), rss)
+            stage["peak_rss_mb"] = peak_rss_mb()
+            if self.trace_memory:
+                peak = max(self.memory_peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if self.memory_peaks:
+                    self.memory_peaks[-1] = max(self.memory_peaks[-1], peak)
+                stage["traced_peak_mb"] = max(stage.get("traced_peak_mb", 0.0), peak / (1024 * 1024))
+
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": key,
+                    "ph": "X",
+                    "ts": round((started - self.started) * 1e6),
+                    "dur": round(elapsed * 1e6),
+                    "pid": os.getpid(),
+                    "tid": 0,
+                    "args": {field: int(value) for field, value in counts.items() if value is not None},
+                }
+            )
+
+    def summary(self) -> dict:
+        stages = {}
+        for key, stage in self.stages.items():
+            stages[key] = {
+                **stage,
+                "seconds": round(stage["seconds"], 3),
+                **{field: _round_mb(stage.get(field)) for field in ("rss_mb", "peak_rss_mb", "traced_peak_mb") if field in stage},
+            }
+        return {
+            "wall_seconds": round(time.perf_counter() - self.started, 3),
+            "peak_rss_mb": _round_mb(peak_rss_mb()),
+            "stages": stages,
+        }
+
+    def write_trace(self, path: Path) -> None:
+        # Chrome trace event format: open in chrome://tracing or https://ui.perfetto.dev
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": self.events, "displayTimeUnit": "ms"}))
+
+
+# The run being recorded; stage() is a no-op without one (imports, worker processes, benchmarks that
+# do not record)
+RUN_METRICS: RunMetrics | None = None
+
+
+def stage(name: str, rows_in: int | None = None):
+    if RUN_METRICS is None:
+        return nullcontext({"rows_in": rows_in, "rows_out": None})
+    return RUN_METRICS.stage(name, rows_in)
+
+
+def code_objects(code: types.CodeType) -> Iterator[types.CodeType]:
+    yield code
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            yield from code_objects(const)
+
+
+def local_source(obj: object) -> str | None:
+    # Source file of a function or class defined in scripts/, None for anything else
+    try:
+        path = inspect.getsourcefile(obj)
+    except TypeError:
+        return None
+    return path if path is not None and Path(path).resolve().parent == SCRIPTS_DIR else None
+
+
+def stage_code(roots: list) -> list:
+    """Every function and class in scripts/ that ``roots`` reach by name, in a stable order.
+
+    Names are resolved against each function's module globals (and attributes of local modules, such
+    as ``report_template.report_renders``). A method pulls in its class, and a class all its methods.
+    """
+    found: dict[int, object] = {}
+    pending = list(roots)
+    while pending:
+        obj = pending.pop()
+        if id(obj) in found or local_source(obj) is None:
+            continue
+        found[id(obj)] = obj
+        if inspect.isclass(obj):
+            members = [vars(obj)[name] for name in vars(obj)]
+            functions = [getattr(member, "__func__", getattr(member, "fget", member)) for member in members]
+            functions = [func for func in functions if inspect.isfunction(func)]
+        else:
+            functions = [obj]
+            owner = obj.__globals__.get(obj.__qualname__.split(".")[0])
+            if owner is not obj and inspect.isclass(owner):
+                pending.append(owner)
+        for func in functions:
+            for code in code_objects(func.__code__):
+                for name in code.co_names:
+                    value = func.__globals__.get(name)
+                    if inspect.ismodule(value) and Path(getattr(value, "__file__", "")).resolve().parent == SCRIPTS_DIR:
+                        pending += [getattr(value, attr) for attr in code.co_names if hasattr(value, attr)]
+                    elif inspect.isfunction(value) or inspect.isclass(value):
+                        pending.append(value)
+    return sorted(found.values(), key=lambda obj: (Path(local_source(obj)).name, obj.__qualname__))
+
+
+class StageGraph:
+    """Content-hash memoization over the pipeline DAG in ``PIPELINE_STAGES``.
+
+    A stage's key hashes its parameters, the source of the code it runs and the keys of its upstream
+    stages, so a change reaches exactly the stages downstream of it. A stage whose key matches the
+    last run is skipped: its pickled result is reloaded, and its output files are left untouched.
+    Stages that wrote into ``generation`` are only recorded by ``commit`` once it is published.
+    """
+
+    def __init__(self, use_cache: bool = True, generation: OutputGeneration | None = None) -> None:
+        recorded = json.loads(STAGE_KEYS_PATH.read_text()) if use_cache and STAGE_KEYS_PATH.exists() else {}
+        self.recorded: dict[str, str] = recorded.get("stages", {})
+        self.inputs: dict[str, dict] = recorded.get("inputs", {})
+        self.keys: dict[str, str] = {}
+        self.skipped: list[str] = []
+        self.generation = generation
+        self.unpublished: dict[str, str] = {}
+
+    def fingerprint(self, path: Path) -> dict:
+        self.inputs[path.name] = source_fingerprint(path, self.inputs.get(path.name))
+        return self.inputs[path.name]
+
+    def key(self, name: str, params: object = None) -> str:
+        upstream, code = PIPELINE_STAGES[name]
+        digest = hashlib.sha256(name.encode())
+        for dependency in upstream:
+            digest.update(self.keys[dependency].encode())
+        for obj in stage_code(code):
+            digest.update(inspect.getsource(obj).encode())
+        digest.update(repr(params).encode())
+        self.keys[name] = digest.hexdigest()
+        return self.keys[name]
+
+    def run(
+        self,
+        name: str,
+        compute: Callable,
+        params: object = None,
+        outputs: Iterable[Path] = (),
+        cache: bool = False,
+        force: bool = False,
+    ):
+        key = self.key(name, params)
+        cache_path = STAGE_CACHE_DIR / f"{name}-{key[:16]}.pkl"
+        outputs = [*outputs, cache_path] if cache else list(outputs)
+        if not force and self.recorded.get(name) == key and all(path.exists() for path in outputs):
+            self.skipped.append(name)
+            return pd.read_pickle(cache_path) if cache else None
+
+        # Forget the old key first, so outputs left half-written by a failed run are never trusted
+        self.recorded.pop(name, None)
+        self.save()
+        submitted = len(self.generation.jobs) if self.generation is not None else 0
+        with stage(name):
+            result = compute()
+        if cache:
+            for stale in STAGE_CACHE_DIR.glob(f"{name}-*.pkl"):
+                stale.unlink()
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            pd.to_pickle(result, tmp_path)
+            os.replace(tmp_path, cache_path)
+        if self.generation is not None and len(self.generation.jobs) > submitted:
+            self.unpublished[name] = key
+        else:
+            self.recorded[name] = key
+            self.save()
+        return result
+
+    def commit(self) -> None:
+        self.recorded.update(self.unpublished)
+        self.unpublished = {}
+        self.save()
+
+    def save(self) -> None:
+        STAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = STAGE_KEYS_PATH.with_name(STAGE_KEYS_PATH.name + ".tmp")
+        tmp_path.write_text(json.dumps({"stages": self.recorded, "inputs": self.inputs}, indent=2))
+        os.replace(tmp_path, STAGE_KEYS_PATH)
+
+
+def read_sales_csv(csv_path: Path, chunksize: int | None = None):
+    return pd.read_csv(csv_path, usecols=INGEST_COLUMNS, dtype=CSV_DTYPES, chunksize=chunksize)
+
+
+def csv_column_count(csv_path: Path) -> int:
+    return len(pd.read_csv(csv_path, nrows=0).columns)
+
+
+def normalize_labels(values: pd.Series, upper: bool = False) -> pd.Series:
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype("category")
+    labels = values.cat.categories.astype("string").str.strip()
+    if upper:
+        labels = labels.str.upper()
+    # Labels that collapse to the same normalized value share one category code
+    label_codes, normalized = pd.factorize(labels, sort=True)
+    codes = np.append(label_codes, -1)[values.cat.codes.to_numpy()]
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=normalized),
+        index=values.index,
+        name=values.name,
     )
+
+
+def canonicalize_labels(values: pd.Series, column: str) -> tuple[pd.Series, pd.DataFrame]:
+    """Fold tagged and aliased labels into their canonical label; also returns the rows relabeled per label."""
+    labels = pd.Series(values.cat.categories, dtype="string")
+    canonical = labels
+    if column in LABEL_TAG_PATTERNS:
+        canonical = canonical.str.replace(LABEL_TAG_PATTERNS[column], "", regex=True)
+    canonical = canonical.str.upper().map(LABEL_ALIASES.get(column, {})).fillna(canonical).astype("string")
+
+    codes = values.cat.codes.to_numpy()
+    rows = np.bincount(codes[codes >= 0], minlength=len(labels))
+    changed = ((canonical != labels) & (rows > 0)).to_numpy()
+    relabeled = pd.DataFrame(
+        {
+            "column": column,
+            "label": labels[changed].to_numpy(dtype=object),
+            "canonical": canonical[changed].to_numpy(dtype=object),
+            "rows": rows[changed].astype("int64"),
+        },
+        columns=RELABEL_COLUMNS,
+    )
+    if not changed.any():
+        return values, relabeled
+
+    label_codes, merged = pd.factorize(canonical, sort=True)
+    canonical_codes = np.append(label_codes, -1)[codes]
+    return (
+        pd.Series(pd.Categorical.from_codes(canonical_codes, categories=merged), index=values.index, name=values.name),
+        relabeled,
+    )
+
+
+def parse_saledate(raw: pd.Series) -> pd.Series:
+    if not isinstance(raw.dtype, pd.CategoricalDtype):
+        raw = raw.astype("category")
+    # Strip the timezone abbreviation suffix and parse each distinct saledate string once
+    labels = raw.cat.categories.astype("string").str.replace(r" \([A-Z]+\)$", "", regex=True)
+    parsed = pd.DatetimeIndex(pd.to_datetime(labels, format=SALEDATE_FORMAT, errors="coerce", utc=True))
+    return pd.Series(parsed.take(raw.cat.codes.to_numpy(), allow_fill=True), index=raw.index)
+
+
+def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    with stage("normalize_labels", rows_in=len(df)):
+        for col, dtype in CSV_DTYPES.items():
+            if dtype == "category" and col != "saledate" and col in df.columns:
+                df[col] = normalize_labels(df[col], upper=col in UPPERCASE_COLUMNS)
+    with stage("canonicalize_labels", rows_in=len(df)):
+        relabeled = []
+        for col in LABEL_ALIASES:
+            df[col], counts = canonicalize_labels(df[col], col)
+            relabeled.append(counts)
+        # Carried as records so the cleaned-data cache can keep them in its JSON metadata
+        df.attrs["relabeled_labels"] = pd.concat(relabeled, ignore_index=True).to_dict("records")
+    with stage("to_numeric", rows_in=len(df)):
+        for col, dtype in NUMERIC_DTYPES.items():
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+
+    with stage("parse_saledate", rows_in=len(df)):
+        df["sale_datetime"] = parse_saledate(df["saledate"])
     df["sale_year"] = df["sale_datetime"].dt.year
     df["sale_month"] = df["sale_datetime"].dt.month
-    df["sale_month_name"] = df["sale_datetime"].dt.month_name()
 
     df["price_vs_mmr"] = df["sellingprice"] - df["mmr"]
-    df["car_age_at_sale"] = df["sale_year"] - pd.to_numeric(df["year"], errors="coerce")
+    df["car_age_at_sale"] = df["sale_year"] - df["year"]
+    return df
 
-    # OLAP summaries required by rubric
-    tx_by_make = (
-        df.dropna(subset=["make"])
-        .groupby("make", as_index=False)
-        .size()
-        .rename(columns={"size": "transactions"})
-        .sort_values("transactions", ascending=False)
-    )
 
-    tx_by_body = (
-        df.dropna(subset=["body"])
-        .groupby("body", as_index=False)
-        .size()
-        .rename(columns={"size": "transactions"})
-        .sort_values("transactions", ascending=False)
-    )
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-    tx_by_year = (
-        df.dropna(subset=["sale_year"])
-        .groupby("sale_year", as_index=False)
-        .size()
-        .rename(columns={"size": "transactions"})
-        .sort_values("sale_year")
-    )
-    tx_by_year["sale_year"] = tx_by_year["sale_year"].astype(int)
 
-    tx_by_month = (
-        df.dropna(subset=["sale_year", "sale_month"])
-        .groupby(["sale_year", "sale_month"], as_index=False)
-        .size()
-        .rename(columns={"size": "transactions"})
-        .sort_values(["sale_year", "sale_month"])
-    )
-    tx_by_month["year_month"] = (
-        tx_by_month["sale_year"].astype(int).astype(str)
-        + "-"
-        + tx_by_month["sale_month"].astype(int).astype(str).str.zfill(2)
-    )
+def source_fingerprint(csv_path: Path, previous: dict | None = None) -> dict:
+    stat = csv_path.stat()
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    # Only rehash when size or mtime moved; a touched-but-identical file still hits the cache
+    if previous and all(previous.get(key) == value for key, value in fingerprint.items()):
+        fingerprint["sha256"] = previous["sha256"]
+    else:
+        fingerprint["sha256"] = file_sha256(csv_path)
+    return fingerprint
 
-    tx_by_make_year = (
-        df.dropna(subset=["make", "sale_year"])
-        .groupby(["make", "sale_year"], as_index=False)
-        .size()
-        .rename(columns={"size": "transactions"})
-        .sort_values(["make", "sale_year"])
-    )
 
-    tx_by_make_month = (
-        df.dropna(subset=["make", "sale_year", "sale_month"])
-        .groupby(["make", "sale_year", "sale_month"], as_index=False)
-        .size()
-        .rename(columns={"size": "transactions"})
-        .sort_values(["make", "sale_year", "sale_month"])
+def config_hash(value: object) -> str:
+    # Same repr-based hashing StageGraph.key applies to stage parameters
+    return hashlib.sha256(repr(value).encode()).hexdigest()
+
+
+def cleaning_key() -> str:
+    """Hash of everything that decides the cleaned rows: the ingest schema, the label tables and the
+    source of the read and clean code (see stage_code).
+
+    The cleaned-data cache, the aggregate state and the store record it, so none of them is reused
+    with rows cleaned under other rules.
+    """
+    code = [inspect.getsource(obj) for obj in stage_code([read_sales_csv, clean_frame])]
+    return config_hash(
+        [CSV_DTYPES, NUMERIC_DTYPES, UPPERCASE_COLUMNS, SALEDATE_FORMAT, LABEL_TAG_PATTERNS, LABEL_ALIASES, code]
     )
-    tx_by_make_month["year_month"] = (
-        tx_by_make_month["sale_year"].astype(int).astype(str)
+
+
+def clean_cache_paths(csv_path: Path) -> tuple[Path, Path]:
+    suffix = ".feather" if pyarrow is not None else ".pkl"
+    return CACHE_DIR / f"{csv_path.stem}.clean{suffix}", CACHE_DIR / f"{csv_path.stem}.clean.json"
+
+
+def load_clean_frame(csv_path: Path, use_cache: bool = True) -> tuple[pd.DataFrame, int]:
+    data_path, meta_path = clean_cache_paths(csv_path)
+    cleaning = cleaning_key()
+    meta = json.loads(meta_path.read_text()) if use_cache and meta_path.exists() else None
+    with stage("fingerprint"):
+        fingerprint = source_fingerprint(csv_path, meta["source"] if meta else None)
+
+    if (
+        meta is not None
+        and data_path.exists()
+        and meta.get("cleaning") == cleaning
+        and meta["source"]["size"] == fingerprint["size"]
+        and meta["source"]["sha256"] == fingerprint["sha256"]
+    ):
+        with stage("load_cache") as counts:
+            df = pd.read_feather(data_path) if pyarrow is not None else pd.read_pickle(data_path)
+            df.attrs["relabeled_labels"] = meta["relabeled_labels"]
+            counts["rows_out"] = len(df)
+        if meta["source"] != fingerprint:
+            meta["source"] = fingerprint
+            meta_path.write_text(json.dumps(meta, indent=2))
+        return df, meta["columns"]
+
+    with stage("read_csv") as counts:
+        raw = read_sales_csv(csv_path)
+        counts["rows_out"] = len(raw)
+    with stage("clean", rows_in=len(raw)) as counts:
+        df = clean_frame(raw)
+        counts["rows_out"] = len(df)
+    original_column_count = csv_column_count(csv_path)
+    if use_cache:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = data_path.with_name(data_path.name + ".tmp")
+        with stage("write_cache", rows_in=len(df)):
+            if pyarrow is not None:
+                df.to_feather(tmp_path)
+            else:
+                df.to_pickle(tmp_path)
+        os.replace(tmp_path, data_path)
+        meta = {
+            "cleaning": cleaning,
+            "columns": original_column_count,
+            "source": fingerprint,
+            "relabeled_labels": df.attrs["relabeled_labels"],
+        }
+        meta_path.write_text(json.dumps(meta, indent=2))
+    return df, original_column_count
+
+
+def sample_csv_lines(csv_path: Path, count: int, seed: int) -> tuple[str, list[str]]:
+    # Seek to seeded random byte offsets and keep the next complete line after each, so the cost
+    # tracks the sample size rather than the file size. Small files are read whole.
+    with csv_path.open("rb") as handle:
+        header = handle.readline()
+        data_start = handle.tell()
+        size = os.fstat(handle.fileno()).st_size
+        if size - data_start <= PREVIEW_FULL_SCAN_BYTES:
+            lines = list(handle)
+        else:
+            starts = {}
+            for target in np.sort(np.random.default_rng(seed).integers(data_start, size, count)):
+                handle.seek(target - 1)
+                handle.readline()
+                start = handle.tell()
+                line = handle.readline()
+                if line:
+                    starts[start] = line
+            lines = [starts[start] for start in sorted(starts)]
+    return header.decode("utf-8", "replace"), [line.decode("utf-8", "replace") for line in lines]
+
+
+def stratified_positions(records: list[list[str]], columns: list[str], count: int) -> list[int]:
+    # Share rows between makes in proportion to their candidate counts (largest remainder), then fill
+    # each make's share round-robin across its states so no single state takes a make's whole quota
+    if len(records) <= count:
+        return list(range(len(records)))
+    make_at, state_at = columns.index("make"), columns.index("state")
+    strata: dict[str, dict[str, list[int]]] = {}
+    for position, record in enumerate(records):
+        make = record[make_at].strip().upper() if make_at < len(record) else ""
+        state = record[state_at].strip().upper() if state_at < len(record) else ""
+        strata.setdefault(make, {}).setdefault(state, []).append(position)
+
+    sizes = {make: sum(len(rows) for rows in states.values()) for make, states in strata.items()}
+    exact = {make: count * size / len(records) for make, size in sizes.items()}
+    quotas = {make: int(share) for make, share in exact.items()}
+    by_remainder = sorted(exact, key=lambda make: (-(exact[make] - quotas[make]), -sizes[make], make))
+    for make in by_remainder[: count - sum(quotas.values())]:
+        quotas[make] += 1
+
+    chosen = []
+    for make, states in strata.items():
+        queues = [states[state] for state in sorted(states, key=lambda state: (-len(states[state]), state))]
+        taken = 0
+        for depth in range(max(len(queue) for queue in queues)):
+            for queue in queues:
+                if taken < quotas[make] and depth < len(queue):
+                    chosen.append(queue[depth])
+                    taken += 1
+    return sorted(chosen)
+
+
+def sample_preview(csv_path: Path, rows: int = PREVIEW_ROWS, seed: int = PREVIEW_SEED) -> list[str]:
+    """Return the CSV header plus up to ``rows`` raw lines sampled across makes and states, in file order."""
+    header, candidates = sample_csv_lines(csv_path, rows * PREVIEW_OVERSAMPLE, seed)
+    columns = next(csv.reader([header]))
+    records = list(csv.reader(candidates))
+    lines = [header] + [candidates[position] for position in stratified_positions(records, columns, rows)]
+    return [line if line.endswith("\n") else line + "\n" for line in lines]
+
+
+def append_preview(
+    previous: list[str], deltas: list[tuple[Path, int]], previous_rows: int, rows: int = PREVIEW_ROWS
+) -> list[str]:
+    """Fold sampled lines of appended files into a saved preview, in proportion to the rows each adds.
+
+    ``deltas`` pairs each newly appended file with its row count. The saved preview keeps a
+    stratified subset of its own rows, and each file's lines follow it, as if appended to the CSV.
+    """
+    if not deltas:
+        return previous
+    total = max(previous_rows + sum(count for _, count in deltas), 1)
+    header = previous[0] if previous else None
+    added, cumulative = [], previous_rows
+    for path, count in deltas:
+        quota = round(rows * (cumulative + count) / total) - round(rows * cumulative / total)
+        cumulative += count
+        delta_header, candidates = sample_csv_lines(path, quota * PREVIEW_OVERSAMPLE, PREVIEW_SEED)
+        header = header or delta_header
+        columns = next(csv.reader([delta_header]))
+        records = list(csv.reader(candidates))
+        chosen = stratified_positions(records, columns, quota) if quota else []
+        if delta_header.strip() == header.strip():
+            added += [candidates[position] for position in chosen]
+            continue
+        # Columns in another order are rewritten in the preview's order
+        buffer = io.StringIO()
+        order = [columns.index(name) if name in columns else None for name in next(csv.reader([header]))]
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows([records[position][at] if at is not None else "" for at in order] for position in chosen)
+        added += buffer.getvalue().splitlines(keepends=True)
+
+    kept = []
+    if previous:
+        columns = next(csv.reader([previous[0]]))
+        records = list(csv.reader(previous[1:]))
+        kept = [previous[1 + position] for position in stratified_positions(records, columns, rows - len(added))]
+    lines = [header] + kept + added
+    return [line if line.endswith("\n") else line + "\n" for line in lines]
+
+
+def preview_head(lines: list[str], rows: int = PREVIEW_HEAD_ROWS) -> dict:
+    reader = csv.reader(lines[: rows + 1])
+    columns = next(reader)
+    records = list(reader)
+    return {
+        "length": len(records),
+        "columns": {name: [record[at] if at < len(record) else "" for record in records] for at, name in enumerate(columns)},
+    }
+
+
+def write_preview(lines: list[str]) -> None:
+    render_output(PREVIEW_PATH, lambda handle: handle.writelines(lines), newline="")
+
+
+def vehicle_labels(df: pd.DataFrame) -> pd.Series:
+    # "MAKE Model 2013" for every row at once; a missing year is left out
+    make = df["make"].astype("string").fillna("Unknown make")
+    model = df["model"].astype("string").fillna("Unknown model")
+    year = (" " + df["year"].astype("Int64").astype("string")).fillna("")
+    return (make + " " + model + year).astype(object)
+
+
+def add_year_month(df: pd.DataFrame) -> pd.DataFrame:
+    df["year_month"] = (
+        df["sale_year"].astype(int).astype(str)
         + "-"
-        + tx_by_make_month["sale_month"].astype(int).astype(str).str.zfill(2)
+        + df["sale_month"].astype(int).astype(str).str.zfill(2)
     )
+    return df
+
+
+# Every OLAP table is rolled up from one cube at make x body x state x transmission x sale_year x
+# sale_month grain holding transaction counts plus per-measure non-null counts and sums. The same
+# cube is written to outputs/olap_cube.csv.gz for ad-hoc slicing (see scripts/cube_query.py).
+# table name -> (group keys, averaged measure or None for transaction counts)
+CUBE_KEYS = ["make", "body", "state", "transmission", "sale_year", "sale_month"]
+CUBE_MEASURES = ["sellingprice", "mmr", "price_vs_mmr", "odometer", "condition"]
+TIME_KEYS = ["sale_year", "sale_month"]
+OLAP_ROLLUPS = {
+    "transactions_by_make": (["make"], None),
+    "transactions_by_body": (["body"], None),
+    "transactions_by_year": (["sale_year"], None),
+    "transactions_by_month": (["sale_year", "sale_month"], None),
+    "transactions_by_make_year": (["make", "sale_year"], None),
+    "transactions_by_make_month": (["make", "sale_year", "sale_month"], None),
+    "transactions_by_state": (["state"], None),
+    "average_sellingprice_by_make": (["make"], "sellingprice"),
+    "average_sellingprice_by_make_year": (["make", "sale_year"], "sellingprice"),
+    "average_sellingprice_by_year": (["sale_year"], "sellingprice"),
+    "average_price_vs_mmr_by_make": (["make"], "price_vs_mmr"),
+    "average_price_vs_mmr_by_make_year": (["make", "sale_year"], "price_vs_mmr"),
+    "average_price_vs_mmr_by_year": (["sale_year"], "price_vs_mmr"),
+}
+# Approximate statistics (--sketches). Percentiles come from log-bucketed quantile sketches at
+# make x sale_year grain: every value within QUANTILE_RELATIVE_ACCURACY of a bucket boundary shares
+# a bucket, so a group holds at most a few hundred buckets per measure whatever its row count.
+# Distinct VINs come from HyperLogLog registers at make x state grain. Bucket counts merge by sum and
+# registers by max, so both fold across chunks, workers and appends like the cube.
+SKETCH_KEYS = ["make", "sale_year"]
+SKETCH_MEASURES = ["sellingprice", "price_vs_mmr", "odometer"]
+SKETCH_PERCENTILES = [10, 25, 50, 75, 90]
+QUANTILE_RELATIVE_ACCURACY = 0.01
+QUANTILE_GAMMA = (1 + QUANTILE_RELATIVE_ACCURACY) / (1 - QUANTILE_RELATIVE_ACCURACY)
+HLL_KEYS = ["make", "state"]
+HLL_PRECISION = 12
+SKETCH_ROLLUPS = {
+    "percentiles_by_make": ["make"],
+    "percentiles_by_year": ["sale_year"],
+    "percentiles_by_make_year": ["make", "sale_year"],
+}
+DISTINCT_VIN_ROLLUPS = {
+    "distinct_vins_by_make": ["make"],
+    "distinct_vins_by_state": ["state"],
+}
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    # Measures are stored as float32 but summed in float64 to keep large totals exact
+    frame = df[CUBE_KEYS].assign(**{measure: df[measure].astype("float64") for measure in CUBE_MEASURES})
+    aggs = {"transactions": ("make", "size")}
+    for measure in CUBE_MEASURES:
+        aggs[f"{measure}_count"] = (measure, "count")
+        aggs[f"{measure}_sum"] = (measure, "sum")
+    cube = frame.groupby(CUBE_KEYS, dropna=False, observed=True, as_index=False).agg(**aggs)
+    return cube.astype({key: "string" for key in CUBE_KEYS if isinstance(cube[key].dtype, pd.CategoricalDtype)})
+
+
+def rollup(cube: pd.DataFrame, keys: list[str], measure: str | None = None) -> pd.DataFrame:
+    scoped = cube.dropna(subset=keys)
+    if measure is None:
+        value = "transactions"
+        table = scoped.groupby(keys, as_index=False)[value].sum()
+    else:
+        value = f"avg_{measure}"
+        table = scoped.groupby(keys, as_index=False)[[f"{measure}_sum", f"{measure}_count"]].sum()
+        table = table[table[f"{measure}_count"] > 0].reset_index(drop=True)
+        table[value] = table[f"{measure}_sum"] / table[f"{measure}_count"]
+        table = table[keys + [value]]
+
+    # Single-category roll-ups are rankings; time roll-ups keep chronological order
+    if len(keys) == 1 and keys[0] not in TIME_KEYS:
+        return table.sort_values(value, ascending=False)
+    table = table.sort_values(keys)
+    if "sale_month" in keys:
+        table = add_year_month(table)
+    return table
+
+
+# Daily and ISO-week volume for auction staffing, overall and per make and state. The state keeps
+# (key, sale_day) transaction counts, which merge by sum. They are laid out at finalize as dense
+# series x day grids from the first to the last sale day. Rolling means come from running sums, and
+# year-over-year deltas compare with the same weekday (364 days) or ISO week (52 weeks) a year back.
+SERIES_KEYS = ["make", "state"]
+DAILY_ROLLING_DAYS = [7, 28]
+WEEKLY_ROLLING_WEEKS = [4]
+DAILY_YOY_LAG = 364
+WEEKLY_YOY_LAG = 52
+
+
+def sale_days(raw: pd.Series) -> pd.Series:
+    # The auction's local calendar day as days since 1970-01-01, read from the saledate text
+    # ("Tue Dec 16 2014 ..."), so a late Pacific sale is not moved to the next UTC day
+    if not isinstance(raw.dtype, pd.CategoricalDtype):
+        raw = raw.astype("category")
+    labels = raw.cat.categories.astype("string").str.slice(0, 15)
+    days = pd.to_datetime(labels, format="%a %b %d %Y", errors="coerce")
+    epoch_days = pd.array((days - pd.Timestamp(0)).days, dtype="Int32")
+    return pd.Series(epoch_days.take(raw.cat.codes.to_numpy(), allow_fill=True), index=raw.index)
+
+
+def build_daily_counts(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    days = sale_days(df["saledate"])
+    scoped = df[SERIES_KEYS].assign(sale_day=days)[days.notna() & df["sale_datetime"].notna()]
+    counts = {}
+    for key in SERIES_KEYS:
+        table = scoped.groupby([key, "sale_day"], dropna=False, observed=True).size().reset_index(name="transactions")
+        counts[key] = table.astype({key: "string"} if isinstance(table[key].dtype, pd.CategoricalDtype) else {})
+    return counts
+
+
+def dense_counts(counts: pd.DataFrame, codes: np.ndarray, series: int, start: int, length: int) -> np.ndarray:
+    cells = codes * length + (counts["sale_day"].to_numpy("int64") - start)
+    grid = np.bincount(cells, weights=counts["transactions"].to_numpy("float64"), minlength=series * length)
+    return grid.reshape(series, length).astype("int64")
+
+
+def rolling_mean(grid: np.ndarray, window: int) -> np.ndarray:
+    # Trailing mean from a running sum; NaN until a full window is available
+    totals = np.pad(np.cumsum(grid, axis=1), ((0, 0), (1, 0)))
+    means = np.full(grid.shape, np.nan)
+    if window <= grid.shape[1]:
+        means[:, window - 1 :] = (totals[:, window:] - totals[:, :-window]) / window
+    return means
+
+
+def yoy_delta(grid: np.ndarray, lag: int) -> np.ndarray:
+    delta = np.full(grid.shape, np.nan)
+    if lag < grid.shape[1]:
+        delta[:, lag:] = grid[:, lag:] - grid[:, :-lag]
+    return delta
+
+
+def series_table(
+    scopes: list[str], keys: list[str], periods: pd.DataFrame, grid: np.ndarray, windows: list[int], lag: int, unit: str
+) -> pd.DataFrame:
+    # Long, dense layout: every series has a row for every period, in period order
+    length = len(periods)
+    table = pd.DataFrame({"scope": np.repeat(scopes, length), "key": np.repeat(keys, length)})
+    table = pd.concat([table, periods.iloc[np.tile(np.arange(length), len(keys))].reset_index(drop=True)], axis=1)
+    table["transactions"] = grid.ravel()
+    for window in windows:
+        table[f"rolling_{window}{unit}"] = rolling_mean(grid, window).ravel().round(2)
+    table["yoy_delta"] = yoy_delta(grid, lag).ravel()
+    return table.astype({"yoy_delta": "Int64"})
+
+
+def time_series_tables(daily_counts: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    days = pd.concat([counts["sale_day"] for counts in daily_counts.values()])
+    start, end = (int(days.min()), int(days.max())) if len(days) else (0, -1)
+    length = end - start + 1
+    overall = daily_counts[SERIES_KEYS[0]]
+    scopes, keys, grids = ["All"], ["All"], [dense_counts(overall, np.zeros(len(overall), "int64"), 1, start, length)]
+    for key in SERIES_KEYS:
+        counts = daily_counts[key].dropna(subset=[key])
+        codes, labels = pd.factorize(counts[key], sort=True)
+        scopes += [key] * len(labels)
+        keys += list(labels)
+        grids.append(dense_counts(counts, codes, len(labels), start, length))
+    daily = np.vstack(grids)
+
+    dates = pd.date_range(pd.Timestamp(0) + pd.Timedelta(days=start), periods=length, freq="D")
+    # ISO weeks start on Monday; 1970-01-01 was a Thursday, so day d falls in week (d + 3) // 7
+    lead = (start + 3) % 7
+    weeks = -(-(lead + length) // 7)
+    padded = np.pad(daily, ((0, 0), (lead, weeks * 7 - lead - length)))
+    weekly = padded.reshape(len(keys), weeks, 7).sum(axis=2)
+    week_starts = pd.date_range(dates[0] - pd.Timedelta(days=lead), periods=weeks, freq="7D") if length else dates
+    iso = week_starts.isocalendar()
+
+    return {
+        "daily_transactions": series_table(
+            scopes, keys, pd.DataFrame({"sale_date": dates.strftime("%Y-%m-%d")}), daily, DAILY_ROLLING_DAYS, DAILY_YOY_LAG, "d"
+        ),
+        "weekly_transactions": series_table(
+            scopes,
+            keys,
+            pd.DataFrame(
+                {
+                    "week_start": week_starts.strftime("%Y-%m-%d"),
+                    "iso_year": iso["year"].to_numpy("int64"),
+                    "iso_week": iso["week"].to_numpy("int64"),
+                }
+            ),
+            weekly,
+            WEEKLY_ROLLING_WEEKS,
+            WEEKLY_YOY_LAG,
+            "w",
+        ),
+    }
+
+
+def quantile_buckets(values: pd.Series) -> np.ndarray:
+    # |value| in (gamma^(k-1), gamma^k] maps to bucket +-(k + 1); |value| < 1 maps to bucket 0
+    values = values.to_numpy("float64")
+    magnitude = np.abs(values)
+    keys = np.ceil(np.log(np.maximum(magnitude, 1)) / np.log(QUANTILE_GAMMA)) + 1
+    return (np.sign(values) * np.where(magnitude >= 1, keys, 0)).astype("int16")
+
 
-    tx_by_state = (
-        df.dropna(subset=["state"])
-        .groupby("state", as_index=False)
+def bucket_values(buckets: pd.Series) -> np.ndarray:
+    buckets = buckets.to_numpy("float64")
+    midpoints = 2 * QUANTILE_GAMMA ** (np.abs(buckets) - 1) / (QUANTILE_GAMMA + 1)
+    return np.sign(buckets) * midpoints
+
+
+def build_quantile_sketch(
+    df: pd.DataFrame, keys: list[str] = SKETCH_KEYS, measures: list[str] = SKETCH_MEASURES
+) -> pd.DataFrame:
+    frames = []
+    for measure in measures:
+        scoped = df.loc[df[measure].notna(), keys + [measure]]
+        frames.append(scoped[keys].assign(measure=measure, bucket=quantile_buckets(scoped[measure])))
+    sketch = (
+        pd.concat(frames, ignore_index=True)
+        .groupby(keys + ["measure", "bucket"], dropna=False, observed=True)
         .size()
-        .rename(columns={"size": "transactions"})
-        .sort_values("transactions", ascending=False)
+        .reset_index(name="count")
     )
+    return sketch.astype({key: "string" for key in keys if isinstance(sketch[key].dtype, pd.CategoricalDtype)})
 
-    avg_price_by_make = (
-        df.dropna(subset=["make", "sellingprice"])
-        .groupby("make", as_index=False)["sellingprice"]
-        .mean()
-        .rename(columns={"sellingprice": "avg_sellingprice"})
-        .sort_values("avg_sellingprice", ascending=False)
-    )
 
-    avg_price_by_make_year = (
-        df.dropna(subset=["make", "sale_year", "sellingprice"])
-        .groupby(["make", "sale_year"], as_index=False)["sellingprice"]
-        .mean()
-        .rename(columns={"sellingprice": "avg_sellingprice"})
-        .sort_values(["make", "sale_year"])
-    )
+def bit_length(values: np.ndarray) -> np.ndarray:
+    # frexp's exponent is the bit length of an exactly representable integer, so split the 64-bit words
+    high = np.frexp((values >> np.uint64(32)).astype("float64"))[1]
+    low = np.frexp((values & np.uint64(0xFFFFFFFF)).astype("float64"))[1]
+    return np.where(high > 0, high + 32, low)
 
-    avg_price_by_year = (
-        df.dropna(subset=["sale_year", "sellingprice"])
-        .groupby("sale_year", as_index=False)["sellingprice"]
-        .mean()
-        .rename(columns={"sellingprice": "avg_sellingprice"})
-        .sort_values("sale_year")
-    )
 
-    price_vs_mmr_by_make = (
-        df.dropna(subset=["make", "price_vs_mmr"])
-        .groupby("make", as_index=False)["price_vs_mmr"]
-        .mean()
-        .rename(columns={"price_vs_mmr": "avg_price_vs_mmr"})
-        .sort_values("avg_price_vs_mmr", ascending=False)
+def build_vin_registers(df: pd.DataFrame, vin_series: pd.Series) -> pd.DataFrame:
+    known = vin_series.notna().to_numpy()
+    hashes = pd.util.hash_pandas_object(vin_series[known], index=False).to_numpy()
+    suffix_bits = 64 - HLL_PRECISION
+    suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+    registers = df.loc[known, HLL_KEYS].assign(
+        register=(hashes >> np.uint64(suffix_bits)).astype("uint16"),
+        rank=(suffix_bits + 1 - bit_length(suffix)).astype("uint8"),
     )
-
-    price_vs_mmr_by_make_year = (
-        df.dropna(subset=["make", "sale_year", "price_vs_mmr"])
-        .groupby(["make", "sale_year"], as_index=False)["price_vs_mmr"]
-        .mean()
-        .rename(columns={"price_vs_mmr": "avg_price_vs_mmr"})
-        .sort_values(["make", "sale_year"])
+    registers = registers.groupby(HLL_KEYS + ["register"], dropna=False, observed=True, as_index=False)["rank"].max()
+    return registers.astype({key: "string" for key in HLL_KEYS if isinstance(registers[key].dtype, pd.CategoricalDtype)})
+
+
+def sketch_percentiles(sketch: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    groups = keys + ["measure"]
+    buckets = sketch.dropna(subset=keys).groupby(groups + ["bucket"], as_index=False)["count"].sum()
+    cumulative = buckets.groupby(groups)["count"].cumsum()
+    total = buckets.groupby(groups)["count"].transform("sum")
+    table = buckets.groupby(groups, as_index=False)["count"].sum()
+    for percentile in SKETCH_PERCENTILES:
+        # First bucket whose cumulative count passes the percentile's rank, one per group in group order
+        reached = buckets[cumulative > percentile / 100 * (total - 1)].drop_duplicates(groups)
+        table[f"p{percentile}"] = np.round(bucket_values(reached["bucket"]))
+    return table
+
+
+def distinct_vins(registers: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    union = registers.dropna(subset=keys).groupby(keys + ["register"], as_index=False)["rank"].max()
+    union["inverse"] = np.exp2(-union["rank"].astype("float64"))
+    if keys:
+        table = union.groupby(keys, as_index=False).agg(present=("register", "size"), inverse=("inverse", "sum"))
+    else:
+        table = pd.DataFrame({"present": [len(union)], "inverse": [union["inverse"].sum()]})
+
+    registers_total = 1 << HLL_PRECISION
+    empty = registers_total - table["present"]
+    alpha = 0.7213 / (1 + 1.079 / registers_total)
+    raw = alpha * registers_total**2 / (table["inverse"] + empty)
+    # Linear counting is the better estimate while many registers are still empty
+    linear = registers_total * np.log(registers_total / np.maximum(empty, 1))
+    table["distinct_vins"] = np.round(np.where((raw <= 2.5 * registers_total) & (empty > 0), linear, raw)).astype("int64")
+    table = table[keys + ["distinct_vins"]]
+    return table.sort_values("distinct_vins", ascending=False) if keys else table
+
+
+# Drill-down: the most frequent values of a high-cardinality column within each group, kept as
+# mergeable Space-Saving summaries of at most HEAVY_HITTER_CAPACITY items per group. A monitored
+# item's count overestimates its true count by at most its error; an evicted item's true count is at
+# most its group's floor. Counts are exact (error 0) until a group overflows its capacity; a second
+# pass over the same rows (recount_heavy_hitters) then makes the retained items' counts exact again.
+HEAVY_HITTERS = {
+    "top_models_by_make": (["make"], ["model"]),
+    "top_trims_by_make": (["make"], ["model", "trim"]),
+    "top_sellers_by_state": (["state"], ["seller"]),
+}
+HEAVY_HITTER_CAPACITY = 64
+HEAVY_HITTER_TOP = 10
+
+
+def truncate_heavy_hitters(summary: pd.DataFrame, group: list[str], item: list[str]) -> pd.DataFrame:
+    # Largest counts first, ties broken by item so every merge order keeps the same items
+    summary = summary.sort_values(
+        group + ["count"] + item, ascending=[True] * len(group) + [False] + [True] * len(item), ignore_index=True
     )
-
-    price_vs_mmr_by_year = (
-        df.dropna(subset=["sale_year", "price_vs_mmr"])
-        .groupby("sale_year", as_index=False)["price_vs_mmr"]
-        .mean()
-        .rename(columns={"price_vs_mmr": "avg_price_vs_mmr"})
-        .sort_values("sale_year")
+    rank = summary.groupby(group, sort=False).cumcount()
+    evicted = summary[rank >= HEAVY_HITTER_CAPACITY].groupby(group, as_index=False)["count"].max()
+    kept = summary[rank < HEAVY_HITTER_CAPACITY].reset_index(drop=True)
+    evicted_floor = kept[group].merge(evicted, how="left", on=group)["count"].fillna(0).to_numpy("int64")
+    return kept.assign(floor=np.maximum(kept["floor"].to_numpy("int64"), evicted_floor))
+
+
+def count_items(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    frame = df[keys].assign(price=df["sellingprice"].astype("float64"))
+    return (
+        frame.groupby(keys, observed=True)
+        .agg(count=("price", "size"), price_sum=("price", "sum"), price_count=("price", "count"))
+        .reset_index()
+        .astype({key: "string" for key in keys})
     )
 
-    # Data quality checks for pricing anomalies and label consistency
-    low_price_threshold = 100
-    high_price_threshold = 200000
-    extreme_gap_threshold = 50000
 
-    price_valid = df["sellingprice"].dropna()
-    gap_valid = df["price_vs_mmr"].dropna()
+def build_heavy_hitters(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    return {
+        name: truncate_heavy_hitters(count_items(df, group + item).assign(error=0, floor=0), group, item)
+        for name, (group, item) in HEAVY_HITTERS.items()
+    }
 
-    low_price_count = int((df["sellingprice"] <= low_price_threshold).sum())
-    one_dollar_count = int((df["sellingprice"] == 1).sum())
-    high_price_count = int((df["sellingprice"] > high_price_threshold).sum())
-    extreme_gap_count = int((df["price_vs_mmr"].abs() > extreme_gap_threshold).sum())
-    missing_make_count = int(df["make"].isna().sum())
 
-    vin_series = df["vin"].astype("string").str.strip()
-    duplicate_vin_rows = int(vin_series.duplicated(keep=False).sum())
+def group_floor(rows: pd.DataFrame, summary: pd.DataFrame, group: list[str]) -> pd.Series:
+    # Per row of ``rows``, the most an item ``summary`` does not hold can have been counted there
+    floors = summary.groupby(group, as_index=False)["floor"].first()
+    floor = rows[group].merge(floors, how="left", on=group)["floor"].fillna(0).to_numpy("int64")
+    return pd.Series(floor, index=rows.index)
+
+
+def merge_heavy_hitters(left: pd.DataFrame, right: pd.DataFrame, group: list[str], item: list[str]) -> pd.DataFrame:
+    # An item missing from one side may still have been counted there, up to that side's floor
+    merged = left.merge(right, how="outer", on=group + item, suffixes=("_left", "_right"))
+    for side, summary in (("left", left), ("right", right)):
+        floor = group_floor(merged, summary, group)
+        merged[f"count_{side}"] = merged[f"count_{side}"].fillna(floor)
+        merged[f"error_{side}"] = merged[f"error_{side}"].fillna(floor)
+        merged[f"floor_{side}"] = floor
+    summary = merged[group + item].assign(
+        count=(merged["count_left"] + merged["count_right"]).astype("int64"),
+        price_sum=merged["price_sum_left"].fillna(0) + merged["price_sum_right"].fillna(0),
+        price_count=(merged["price_count_left"].fillna(0) + merged["price_count_right"].fillna(0)).astype("int64"),
+        error=(merged["error_left"] + merged["error_right"]).astype("int64"),
+        floor=merged["floor_left"] + merged["floor_right"],
+    )
+    return truncate_heavy_hitters(summary, group, item)
+
+
+def heavy_hitters_exact(summaries: dict[str, pd.DataFrame] | None) -> bool:
+    return summaries is None or not any(summary["error"].any() for summary in summaries.values())
+
+
+def heavy_hitter_counts(summaries: dict[str, pd.DataFrame], df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Exact counts and price sums in ``df`` of the items ``summaries`` retain."""
+    counts = {}
+    for name, (group, item) in HEAVY_HITTERS.items():
+        keys = group + item
+        counts[name] = count_items(df, keys).merge(summaries[name][keys], on=keys)
+    return counts
+
+
+def recount_heavy_hitters(
+    summaries: dict[str, pd.DataFrame],
+    counts: Iterable[dict[str, pd.DataFrame]],
+    base: dict[str, pd.DataFrame] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Replace the retained items' counts by the exact ``counts`` (heavy_hitter_counts of every row).
+
+    With ``base``, ``counts`` cover only the rows folded in after it: an item ``base`` holds adds its
+    count and error, any other item its group's ``base`` floor (as count and error, with no prices).
+    """
+    counts = list(counts)
+    recounted = {}
+    for name, (group, item) in HEAVY_HITTERS.items():
+        keys = group + item
+        measures = ["count", "price_sum", "price_count"]
+        exact = pd.concat([part[name] for part in counts], ignore_index=True)
+        exact = exact.groupby(keys, as_index=False)[measures].sum()
+        summary = summaries[name][keys + ["floor"]].merge(exact, how="left", on=keys)
+        summary = summary.fillna({measure: 0 for measure in measures})
+        if base is None:
+            prior = summary[keys].assign(count=0, price_sum=0.0, price_count=0, error=0)
+        else:
+            prior = summary[keys].merge(base[name][keys + measures + ["error"]], how="left", on=keys)
+            floor = group_floor(prior, base[name], group)
+            prior = prior.fillna({"price_sum": 0.0, "price_count": 0}).assign(
+                count=prior["count"].fillna(floor), error=prior["error"].fillna(floor)
+            )
+        recounted[name] = truncate_heavy_hitters(
+            summary[keys].assign(
+                count=(summary["count"] + prior["count"]).astype("int64"),
+                price_sum=summary["price_sum"] + prior["price_sum"],
+                price_count=(summary["price_count"] + prior["price_count"]).astype("int64"),
+                error=prior["error"].astype("int64"),
+                floor=summary["floor"],
+            ),
+            group,
+            item,
+        )
+    return recounted
+
+
+def heavy_hitter_table(summary: pd.DataFrame, group: list[str], item: list[str]) -> pd.DataFrame:
+    top = summary.groupby(group, sort=False).head(HEAVY_HITTER_TOP)
+    return top[group + item].assign(
+        transactions=top["count"].astype("int64"),
+        max_overcount=top["error"].astype("int64"),
+        avg_sellingprice=top["price_sum"] / top["price_count"].where(top["price_count"] > 0),
+    ).reset_index(drop=True)
+
+
+# Deal scoring: robust statistics per make x model year x body segment. Each segment's distributions
+# are kept as quantile sketches, so the median and MAD merge across chunks. Within a segment the
+# modified z-score is monotone in the value, so its most extreme rows are among its SEGMENT_OUTLIERS
+# highest and lowest values; only those rows are kept as candidates.
+SEGMENT_KEYS = ["make", "year", "body"]
+SEGMENT_MEASURES = ["sellingprice", "price_vs_mmr"]
+SEGMENT_MIN_ROWS = 30
+SEGMENT_OUTLIERS = 3
+# Iglewicz-Hoaglin modified z-score, 0.6745 * (value - median) / MAD
+MODIFIED_Z_SCALE = 0.6745
+MODIFIED_Z_THRESHOLD = 3.5
+
+
+def select_outlier_candidates(candidates: pd.DataFrame) -> pd.DataFrame:
+    # A stable sort keeps the earliest row on ties, so merging chunk candidates picks the same rows
+    ordered = candidates.sort_values("value", kind="stable")
+    grouped = ordered.groupby(SEGMENT_KEYS + ["measure"], sort=False)
+    keep = grouped.head(SEGMENT_OUTLIERS).index.union(grouped.tail(SEGMENT_OUTLIERS).index)
+    return candidates.loc[keep].reset_index(drop=True)
+
+
+def build_outlier_candidates(df: pd.DataFrame) -> pd.DataFrame:
+    frames = []
+    for measure in SEGMENT_MEASURES:
+        scoped = df.loc[df[measure].notna(), SEGMENT_KEYS].assign(value=df[measure])
+        grouped = scoped.sort_values("value", kind="stable").groupby(SEGMENT_KEYS, observed=True, sort=False)
+        rows = df.loc[grouped.head(SEGMENT_OUTLIERS).index.union(grouped.tail(SEGMENT_OUTLIERS).index)]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "make": rows["make"].astype("string"),
+                    "year": rows["year"].astype("float64"),
+                    "body": rows["body"].astype("string"),
+                    "measure": measure,
+                    "value": rows[measure].astype("float64"),
+                    "vin": rows["vin"].astype("string"),
+                    "vehicle": vehicle_labels(rows),
+                    "state": rows["state"].astype("string"),
+                    "sale_datetime": rows["sale_datetime"],
+                    "sellingprice": rows["sellingprice"].astype("float64"),
+                    "mmr": rows["mmr"].astype("float64"),
+                }
+            )
+        )
+    return select_outlier_candidates(pd.concat(frames, ignore_index=True))
+
+
+def weighted_median(values: np.ndarray, counts: np.ndarray, group: np.ndarray) -> np.ndarray:
+    # Median of ``values`` weighted by ``counts`` for each group id 0..n-1
+    order = np.lexsort((values, group))
+    cumulative = pd.Series(counts[order]).groupby(group[order]).cumsum().to_numpy()
+    total = np.bincount(group, weights=counts)[group[order]]
+    reached = order[cumulative > (total - 1) / 2]
+    first = np.unique(group[reached], return_index=True)[1]
+    return values[reached[first]]
+
+
+def segment_robust_stats(sketch: pd.DataFrame) -> pd.DataFrame:
+    groups = SEGMENT_KEYS + ["measure"]
+    buckets = sketch.dropna(subset=SEGMENT_KEYS).groupby(groups + ["bucket"], as_index=False)["count"].sum()
+    group = buckets.groupby(groups, sort=False).ngroup().to_numpy()
+    counts = buckets["count"].to_numpy("int64")
+    values = bucket_values(buckets["bucket"])
+    stats = buckets.drop_duplicates(groups)[groups].reset_index(drop=True)
+    stats["rows"] = np.bincount(group, weights=counts).astype("int64")
+    median = weighted_median(values, counts, group)
+    deviation = np.abs(values - median[group])
+    mad = weighted_median(deviation, counts, group)
+    stats["median"] = median
+    stats["mad"] = mad
+    # Every row is scored through its bucket, so outlier counts cover all rows, not only the candidates
+    outside = (mad[group] > 0) & (MODIFIED_Z_SCALE * deviation > MODIFIED_Z_THRESHOLD * mad[group])
+    stats["outlier_rows"] = np.bincount(group, weights=np.where(outside, counts, 0)).astype("int64")
+    stats = stats[stats["rows"] >= SEGMENT_MIN_ROWS].reset_index(drop=True)
+    return stats.astype({"year": "Int64"}).round({"median": 2, "mad": 2})
+
+
+def flag_anomalies(candidates: pd.DataFrame, stats: pd.DataFrame) -> pd.DataFrame:
+    groups = SEGMENT_KEYS + ["measure"]
+    scored = candidates.astype({"year": "Int64"}).merge(stats, on=groups)
+    scored = scored[scored["mad"] > 0]
+    scored = scored.assign(robust_z=MODIFIED_Z_SCALE * (scored["value"] - scored["median"]) / scored["mad"])
+    flagged = scored[scored["robust_z"].abs() > MODIFIED_Z_THRESHOLD]
+    flagged = flagged.assign(magnitude=flagged["robust_z"].abs()).sort_values("magnitude", ascending=False, kind="stable")
+    flagged = flagged.groupby(groups, sort=False).head(SEGMENT_OUTLIERS)
+    flagged = flagged.assign(sale_date=flagged["sale_datetime"].dt.strftime("%Y-%m-%d"))
+    columns = groups + ["value", "median", "mad", "robust_z", "vin", "vehicle", "state", "sale_date", "sellingprice", "mmr"]
+    return flagged[columns].round({"robust_z": 2}).reset_index(drop=True)
+
+
+# Duplicate VINs: every non-null VIN is reduced to one fixed-width record holding its 64-bit hash, the
+# VIN bytes, its occurrence count and its earliest/latest sale with price. Records merge by sorting on
+# hash, so finding re-listings never builds a string index over all VINs.
+VIN_WIDTH = 24
+VIN_RECORD_DTYPE = np.dtype(
+    [
+        ("hash", "<u8"),
+        ("vin", f"S{VIN_WIDTH}"),
+        ("occurrences", "<u4"),
+        ("first_sold", "<i8"),
+        ("last_sold", "<i8"),
+        ("first_price", "<f4"),
+        ("last_price", "<f4"),
+    ]
+)
+# Records held in memory before a ledger spills them to VIN_SPILL_DIR (~60 bytes each)
+VIN_MEMORY_RECORDS = 2_000_000
+VIN_PARTITION_BITS = 4
+NAT_NS = np.iinfo("int64").min
+RELABEL_COLUMNS = ["column", "label", "canonical", "rows"]
+
+
+def hash_vins(vins: np.ndarray) -> np.ndarray:
+    # splitmix64 over the fixed-width bytes, one 8-byte word at a time
+    hashes = np.full(len(vins), 0x9E3779B97F4A7C15, dtype="uint64")
+    for word in vins.view("<u8").reshape(len(vins), VIN_WIDTH // 8).T:
+        hashes ^= word
+        hashes ^= hashes >> np.uint64(30)
+        hashes *= np.uint64(0xBF58476D1CE4E5B9)
+        hashes ^= hashes >> np.uint64(27)
+        hashes *= np.uint64(0x94D049BB133111EB)
+        hashes ^= hashes >> np.uint64(31)
+    return hashes
+
+
+def vin_records(vin_series: pd.Series, sold: pd.Series, price: pd.Series) -> np.ndarray:
+    known = vin_series.notna().to_numpy()
+    # Values longer than VIN_WIDTH bytes (never a valid VIN) are compared on their first VIN_WIDTH bytes
+    vins = np.array(vin_series[known].str.encode("utf-8").to_numpy(object), dtype=f"S{VIN_WIDTH}")
+    records = np.empty(len(vins), dtype=VIN_RECORD_DTYPE)
+    records["hash"] = hash_vins(vins)
+    records["vin"] = vins
+    records["occurrences"] = 1
+    records["first_sold"] = records["last_sold"] = sold.to_numpy("datetime64[ns]")[known].view("int64")
+    records["first_price"] = records["last_price"] = price.to_numpy("float32")[known]
+    return reduce_vin_records(records)
+
+
+def reduce_vin_records(records: np.ndarray) -> np.ndarray:
+    """Collapse ``records`` to one per VIN, sorted by hash.
+
+    The first/last sale is the earliest/latest dated record; equal sale times fall back to the
+    lower/higher price, so the result does not depend on how the input was chunked.
+    """
+    if len(records) < 2:
+        return records
+    ordered = records[np.argsort(records["hash"], kind="stable")]
+    same = ordered["hash"][1:] == ordered["hash"][:-1]
+    if (same & (ordered["vin"][1:] != ordered["vin"][:-1])).any():
+        # A 64-bit collision: keep each VIN's records together inside the shared hash
+        ordered = records[np.lexsort((records["vin"], records["hash"]))]
+        same = (ordered["hash"][1:] == ordered["hash"][:-1]) & (ordered["vin"][1:] == ordered["vin"][:-1])
+    starts = np.flatnonzero(np.concatenate([[True], ~same]))
+    sizes = np.diff(np.append(starts, len(ordered)))
+    repeated = np.flatnonzero(sizes > 1)
+    if len(repeated) == 0:
+        return ordered
+
+    # Only VINs seen more than once need their occurrences summed and first/last sale picked
+    reduced = ordered[starts]
+    lengths = sizes[repeated]
+    offsets = np.cumsum(lengths) - lengths
+    rows = np.arange(lengths.sum()) - np.repeat(offsets - starts[repeated], lengths)
+    subset = ordered[rows]
+    group = np.repeat(repeated, lengths)
+    first_sold = np.where(subset["first_sold"] == NAT_NS, np.iinfo("int64").max, subset["first_sold"])
+    first_price = np.where(np.isnan(subset["first_price"]), np.inf, subset["first_price"])
+    first = np.lexsort((first_price, first_sold, group))[offsets]
+    last_price = np.where(np.isnan(subset["last_price"]), -np.inf, subset["last_price"])
+    last = np.lexsort((last_price, subset["last_sold"], group))[offsets + lengths - 1]
+    for field, picked in [("first_sold", first), ("first_price", first), ("last_sold", last), ("last_price", last)]:
+        reduced[field][repeated] = subset[field][picked]
+    reduced["occurrences"][repeated] = np.add.reduceat(subset["occurrences"], offsets)
+    return reduced
+
+
+def split_by_hash_prefix(records: np.ndarray) -> list[np.ndarray]:
+    # ``records`` is sorted by hash, so each prefix partition is one contiguous slice
+    shift = np.uint64(64 - VIN_PARTITION_BITS)
+    bounds = np.searchsorted(records["hash"], np.arange(1, 1 << VIN_PARTITION_BITS, dtype="uint64") << shift)
+    return np.split(records, bounds)
+
+
+def duplicate_vin_table(records: np.ndarray) -> pd.DataFrame:
+    def sale_dates(values: np.ndarray) -> pd.Series:
+        return pd.Series(values.view("datetime64[ns]")).dt.strftime("%Y-%m-%d")
+
+    table = pd.DataFrame(
+        {
+            "vin": np.char.decode(records["vin"], "utf-8", "replace"),
+            "occurrences": records["occurrences"].astype("int64"),
+            "first_sale_date": sale_dates(records["first_sold"]),
+            "last_sale_date": sale_dates(records["last_sold"]),
+            "first_sellingprice": records["first_price"].astype("float64"),
+            "last_sellingprice": records["last_price"].astype("float64"),
+        }
+    )
+    table["price_delta"] = table["last_sellingprice"] - table["first_sellingprice"]
+    return table.sort_values(["occurrences", "vin"], ascending=[False, True], ignore_index=True)
+
+
+class VinLedger:
+    """Per-VIN records, compacted in memory and spilled to disk by hash prefix past VIN_MEMORY_RECORDS.
+
+    ``partitions()`` yields one fully reduced hash-prefix partition at a time, so exact duplicate
+    detection needs at most one partition in memory.
+    """
+
+    def __init__(self, records: np.ndarray | None = None) -> None:
+        self.records = np.empty(0, dtype=VIN_RECORD_DTYPE) if records is None else records
+        self.pending: list[np.ndarray] = []
+        self.spill_dirs: list[Path] = []
+        self.active_dir: Path | None = None
+
+    def __getstate__(self) -> dict:
+        # Spilled partitions are read-only once pickled (saved state, worker results); later spills
+        # go to a fresh directory so a failed append never touches the saved state's files
+        return {**self.__dict__, "active_dir": None}
+
+    def merge(self, other: VinLedger) -> None:
+        self.pending.extend(other.pending)
+        self.pending.append(other.records)
+        self.spill_dirs.extend(other.spill_dirs)
+        if sum(len(records) for records in self.pending) > len(self.records):
+            self.compact()
+        if len(self.records) > VIN_MEMORY_RECORDS:
+            self.spill()
+
+    def compact(self) -> None:
+        if self.pending:
+            self.records = reduce_vin_records(np.concatenate([self.records, *self.pending]))
+            self.pending = []
+
+    def spill(self) -> None:
+        if self.active_dir is None:
+            self.active_dir = VIN_SPILL_DIR / uuid.uuid4().hex
+            self.active_dir.mkdir(parents=True)
+            self.spill_dirs.append(self.active_dir)
+        for partition, records in enumerate(split_by_hash_prefix(self.records)):
+            with (self.active_dir / f"part-{partition:02d}.bin").open("ab") as handle:
+                records.tofile(handle)
+        self.records = np.empty(0, dtype=VIN_RECORD_DTYPE)
+
+    def partitions(self) -> Iterator[np.ndarray]:
+        self.compact()
+        for partition, in_memory in enumerate(split_by_hash_prefix(self.records)):
+            paths = [directory / f"part-{partition:02d}.bin" for directory in self.spill_dirs]
+            spilled = [np.fromfile(path, dtype=VIN_RECORD_DTYPE) for path in paths if path.exists()]
+            yield reduce_vin_records(np.concatenate([*spilled, in_memory]))
+
+
+class PartialAggregates:
+    """Mergeable per-chunk state behind every OLAP table and data-quality counter.
+
+    Everything is kept at group grain (the OLAP cube and per-VIN counts) or as scalar
+    running totals, so memory scales with the number of groups.
+    """
+
+    COUNTERS = [
+        "rows",
+        "valid_date_rows",
+        "age_count",
+        "age_sum",
+        "low_price_count",
+        "one_dollar_count",
+        "high_price_count",
+        "extreme_gap_count",
+        "missing_make_count",
+        "missing_vin_count",
+    ]
 
-    make_value_counts = df["make"].value_counts(dropna=True)
-    make_variant_pairs = {
-        "LANDROVER": "LAND ROVER",
-        "VW": "VOLKSWAGEN",
-        "MERCEDES": "MERCEDES-BENZ",
+    def __init__(self, original_column_count: int = 0) -> None:
+        self.original_column_count = original_column_count
+        self.counters = {name: 0 for name in self.COUNTERS}
+        self.cube: pd.DataFrame | None = None
+        self.vins = VinLedger()
+        self.quantile_sketch: pd.DataFrame | None = None
+        self.vin_registers: pd.DataFrame | None = None
+        self.relabeled: pd.DataFrame | None = None
+        self.heavy_hitters: dict[str, pd.DataFrame] | None = None
+        self.segment_sketch: pd.DataFrame | None = None
+        self.outlier_candidates: pd.DataFrame | None = None
+        self.daily_counts: dict[str, pd.DataFrame] | None = None
+        self.max_price: tuple[float, str] | None = None
+        self.max_gap: tuple[float, str] | None = None
+        self.appended: list[dict] = []
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, original_column_count: int, sketches: bool = False) -> PartialAggregates:
+        part = cls(original_column_count)
+        gap_abs = df["price_vs_mmr"].abs()
+        vin_series = df["vin"].astype("string").str.strip()
+
+        part.counters.update(
+            rows=int(len(df)),
+            valid_date_rows=int(df["sale_datetime"].notna().sum()),
+            age_count=int(df["car_age_at_sale"].notna().sum()),
+            age_sum=float(df["car_age_at_sale"].sum()),
+            low_price_count=int((df["sellingprice"] <= LOW_PRICE_THRESHOLD).sum()),
+            one_dollar_count=int((df["sellingprice"] == 1).sum()),
+            high_price_count=int((df["sellingprice"] > HIGH_PRICE_THRESHOLD).sum()),
+            extreme_gap_count=int((gap_abs > EXTREME_GAP_THRESHOLD).sum()),
+            missing_make_count=int(df["make"].isna().sum()),
+            missing_vin_count=int(vin_series.isna().sum()),
+        )
+        part.cube = build_cube(df)
+        part.relabeled = pd.DataFrame(df.attrs.get("relabeled_labels", []), columns=RELABEL_COLUMNS)
+        part.heavy_hitters = build_heavy_hitters(df)
+        part.segment_sketch = build_quantile_sketch(df, SEGMENT_KEYS, SEGMENT_MEASURES)
+        part.outlier_candidates = build_outlier_candidates(df)
+        part.daily_counts = build_daily_counts(df)
+        part.vins = VinLedger(vin_records(vin_series, df["sale_datetime"], df["sellingprice"]))
+        if sketches:
+            part.quantile_sketch = build_quantile_sketch(df)
+            part.vin_registers = build_vin_registers(df, vin_series)
+
+        if df["sellingprice"].notna().any():
+            row = df.loc[[df["sellingprice"].idxmax()]]
+            part.max_price = (float(row["sellingprice"].iloc[0]), vehicle_labels(row).iloc[0])
+        if gap_abs.notna().any():
+            row = df.loc[[gap_abs.idxmax()]]
+            part.max_gap = (float(abs(row["price_vs_mmr"].iloc[0])), vehicle_labels(row).iloc[0])
+        return part
+
+    def merge(self, other: PartialAggregates) -> PartialAggregates:
+        """Fold ``other`` into this state; ``other`` must cover later rows of the input."""
+        if not self.original_column_count:
+            self.original_column_count = other.original_column_count
+        for name in self.COUNTERS:
+            self.counters[name] += other.counters[name]
+
+        self.cube = _merge_frames(self.cube, other.cube, CUBE_KEYS)
+        self.quantile_sketch = _merge_frames(
+            self.quantile_sketch, other.quantile_sketch, SKETCH_KEYS + ["measure", "bucket"]
+        )
+        self.vin_registers = _merge_frames(self.vin_registers, other.vin_registers, HLL_KEYS + ["register"], "max")
+        self.relabeled = _merge_frames(self.relabeled, other.relabeled, RELABEL_COLUMNS[:-1])
+        self.segment_sketch = _merge_frames(
+            self.segment_sketch, other.segment_sketch, SEGMENT_KEYS + ["measure", "bucket"]
+        )
+        if self.outlier_candidates is None or other.outlier_candidates is None:
+            self.outlier_candidates = other.outlier_candidates if self.outlier_candidates is None else self.outlier_candidates
+        else:
+            self.outlier_candidates = select_outlier_candidates(
+                pd.concat([self.outlier_candidates, other.outlier_candidates], ignore_index=True)
+            )
+        if self.daily_counts is None or other.daily_counts is None:
+            self.daily_counts = self.daily_counts or other.daily_counts
+        else:
+            self.daily_counts = {
+                key: _merge_frames(self.daily_counts[key], other.daily_counts[key], [key, "sale_day"])
+                for key in SERIES_KEYS
+            }
+        if self.heavy_hitters is None or other.heavy_hitters is None:
+            self.heavy_hitters = self.heavy_hitters or other.heavy_hitters
+        else:
+            self.heavy_hitters = {
+                name: merge_heavy_hitters(self.heavy_hitters[name], other.heavy_hitters[name], group, item)
+                for name, (group, item) in HEAVY_HITTERS.items()
+            }
+
+        # VIN records are the only state that grows with the input, so compaction is deferred
+        # until the pending chunks outweigh the merged records, and spills to disk past a bound
+        self.vins.merge(other.vins)
+
+        # Strict comparison keeps the earliest row on ties, matching idxmax.
+        if other.max_price is not None and (self.max_price is None or other.max_price[0] > self.max_price[0]):
+            self.max_price = other.max_price
+        if other.max_gap is not None and (self.max_gap is None or other.max_gap[0] > self.max_gap[0]):
+            self.max_gap = other.max_gap
+        return self
+
+    def save(self, path: Path) -> None:
+        self.vins.compact()
+        payload = {
+            "state_version": AGGREGATE_STATE_VERSION,
+            "cleaning": cleaning_key(),
+            "thresholds": quality_thresholds(),
+            "state": {
+                "original_column_count": self.original_column_count,
+                "counters": self.counters,
+                "cube": self.cube,
+                "vins": self.vins,
+                "quantile_sketch": self.quantile_sketch,
+                "vin_registers": self.vin_registers,
+                "relabeled": self.relabeled,
+                "heavy_hitters": self.heavy_hitters,
+                "segment_sketch": self.segment_sketch,
+                "outlier_candidates": self.outlier_candidates,
+                "daily_counts": self.daily_counts,
+                "max_price": self.max_price,
+                "max_gap": self.max_gap,
+                "appended": self.appended,
+            },
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        pd.to_pickle(payload, tmp_path)
+        os.replace(tmp_path, path)
+        # Spill directories of earlier states are no longer reachable from the saved state
+        if VIN_SPILL_DIR.exists():
+            for directory in VIN_SPILL_DIR.iterdir():
+                if directory not in self.vins.spill_dirs:
+                    shutil.rmtree(directory)
+
+    @classmethod
+    def load(cls, path: Path) -> PartialAggregates:
+        if not path.exists():
+            raise SystemExit(f"No aggregate state at {path}; run a full build before appending.")
+        payload = pd.read_pickle(path)
+        if (
+            payload.get("state_version") != AGGREGATE_STATE_VERSION
+            or payload.get("cleaning") != cleaning_key()
+            or payload["thresholds"] != quality_thresholds()
+        ):
+            raise SystemExit(
+                f"Aggregate state at {path} was built with a different cube layout, cleaning rules or thresholds; "
+                "run a full build before appending."
+            )
+        state = cls()
+        for name, value in payload["state"].items():
+            setattr(state, name, value)
+        return state
+
+    def finalize(self) -> tuple[dict[str, pd.DataFrame], dict]:
+        cube = self.cube
+        tables = {name: rollup(cube, keys, measure) for name, (keys, measure) in OLAP_ROLLUPS.items()}
+        tables["transactions_by_year"]["sale_year"] = tables["transactions_by_year"]["sale_year"].astype(int)
+        for name, (group, item) in HEAVY_HITTERS.items():
+            tables[name] = heavy_hitter_table(self.heavy_hitters[name], group, item)
+        tables.update(time_series_tables(self.daily_counts))
+
+        counters = self.counters
+        price_count = int(cube["sellingprice_count"].sum())
+        gap_count = int(cube["price_vs_mmr_count"].sum())
+        repeated = [records[records["occurrences"] > 1] for records in self.vins.partitions()]
+        tables["duplicate_vins"] = duplicate_vin_table(np.concatenate(repeated))
+        tables["segment_price_stats"] = segment_robust_stats(self.segment_sketch)
+        tables["flagged_anomalies"] = flag_anomalies(self.outlier_candidates, tables["segment_price_stats"])
+        relabeled = pd.DataFrame(columns=RELABEL_COLUMNS) if self.relabeled is None else self.relabeled
+        tables["relabeled_labels"] = relabeled.sort_values(
+            ["column", "rows", "label"], ascending=[True, False, True], ignore_index=True
+        )
+        missing_vins = counters["missing_vin_count"]
+        duplicate_vin_rows = int(tables["duplicate_vins"]["occurrences"].sum())
+        duplicate_vin_rows += missing_vins if missing_vins > 1 else 0
+        make_price = cube.dropna(subset=["make"]).groupby("make")["sellingprice_count"].sum()
+
+        stats = {
+            "rows": counters["rows"],
+            "columns": self.original_column_count,
+            "valid_price_rows": price_count,
+            "valid_date_rows": counters["valid_date_rows"],
+            "average_sellingprice": _safe_mean(cube["sellingprice_sum"].sum(), price_count),
+            "average_price_vs_mmr": _safe_mean(cube["price_vs_mmr_sum"].sum(), gap_count),
+            "average_car_age_at_sale": _safe_mean(counters["age_sum"], counters["age_count"]),
+            "low_price_count": counters["low_price_count"],
+            "one_dollar_count": counters["one_dollar_count"],
+            "high_price_count": counters["high_price_count"],
+            "max_sellingprice": self.max_price[0] if self.max_price else 0.0,
+            "max_sellingprice_example": self.max_price[1] if self.max_price else "Unavailable",
+            "extreme_gap_count": counters["extreme_gap_count"],
+            "max_abs_gap": self.max_gap[0] if self.max_gap else 0.0,
+            "max_abs_gap_example": self.max_gap[1] if self.max_gap else "Unavailable",
+            "missing_make_count": counters["missing_make_count"],
+            "duplicate_vin_rows": duplicate_vin_rows,
+            "segment_outlier_rows": tables["segment_price_stats"].groupby("measure")["outlier_rows"].sum().to_dict(),
+            "make_price_counts": make_price[make_price > 0],
+        }
+
+        if self.quantile_sketch is not None:
+            for name, keys in SKETCH_ROLLUPS.items():
+                tables[name] = sketch_percentiles(self.quantile_sketch, keys)
+            for name, keys in DISTINCT_VIN_ROLLUPS.items():
+                tables[name] = distinct_vins(self.vin_registers, keys)
+            overall = sketch_percentiles(self.quantile_sketch, []).set_index("measure")
+            stats["sketches"] = {
+                "relative_accuracy": QUANTILE_RELATIVE_ACCURACY,
+                "hll_precision": HLL_PRECISION,
+                "percentiles": {
+                    measure: {f"p{percentile}": float(row[f"p{percentile}"]) for percentile in SKETCH_PERCENTILES}
+                    for measure, row in overall.iterrows()
+                },
+                "distinct_vins": int(distinct_vins(self.vin_registers, [])["distinct_vins"].iloc[0]),
+            }
+        return tables, stats
+
+
+def _merge_frames(
+    left: pd.DataFrame | None, right: pd.DataFrame | None, keys: list[str], how: str = "sum"
+) -> pd.DataFrame | None:
+    if left is None or right is None:
+        return right if left is None else left
+    return pd.concat([left, right], ignore_index=True).groupby(keys, dropna=False, as_index=False).agg(how)
+
+
+def _safe_mean(total: float, count: int) -> float:
+    return float(total / count) if count else float("nan")
+
+
+def cleaned_frames(csv_path: Path, chunksize: int | None = None) -> Iterator[pd.DataFrame]:
+    if chunksize is None:
+        yield clean_frame(read_sales_csv(csv_path))
+        return
+    for chunk in read_sales_csv(csv_path, chunksize):
+        yield clean_frame(chunk)
+
+
+def aggregate_csv(csv_path: Path, chunksize: int | None = None, sketches: bool = False) -> PartialAggregates:
+    original_column_count = csv_column_count(csv_path)
+    if chunksize is None:
+        return PartialAggregates.from_frame(clean_frame(read_sales_csv(csv_path)), original_column_count, sketches)
+    state = PartialAggregates()
+    chunks = iter(read_sales_csv(csv_path, chunksize))
+    while True:
+        with stage("read_csv") as counts:
+            chunk = next(chunks, None)
+            counts["rows_out"] = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            break
+        with stage("clean", rows_in=len(chunk)):
+            df = clean_frame(chunk)
+        with stage("build_state", rows_in=len(df)):
+            part = PartialAggregates.from_frame(df, original_column_count, sketches)
+        with stage("merge"):
+            state.merge(part)
+    if not heavy_hitters_exact(state.heavy_hitters):
+        with stage("recount_heavy_hitters"):
+            state.heavy_hitters = recount_heavy_hitters(
+                state.heavy_hitters, [count_csv(csv_path, state.heavy_hitters, chunksize)]
+            )
+    return state
+
+
+def count_csv(
+    csv_path: Path, summaries: dict[str, pd.DataFrame], chunksize: int | None = None
+) -> dict[str, pd.DataFrame]:
+    parts = [heavy_hitter_counts(summaries, df) for df in cleaned_frames(csv_path, chunksize)]
+    return {name: pd.concat([part[name] for part in parts], ignore_index=True) for name in HEAVY_HITTERS}
+
+
+def csv_byte_ranges(csv_path: Path, parts: int) -> list[tuple[int, int]]:
+    # Assumes no quoted field spans a line break, which holds for the auction exports
+    size = csv_path.stat().st_size
+    with csv_path.open("rb") as handle:
+        body_start = len(handle.readline())
+        bounds = [body_start]
+        for part in range(1, parts):
+            target = body_start + (size - body_start) * part // parts
+            if target <= bounds[-1]:
+                continue
+            handle.seek(target)
+            handle.readline()
+            if bounds[-1] < handle.tell() < size:
+                bounds.append(handle.tell())
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def clean_byte_range(csv_path: Path, header: list[str], byte_range: tuple[int, int]) -> pd.DataFrame:
+    start, end = byte_range
+    with csv_path.open("rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    df = pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=INGEST_COLUMNS, dtype=CSV_DTYPES)
+    return clean_frame(df)
+
+
+def aggregate_byte_range(
+    csv_path: Path, header: list[str], original_column_count: int, sketches: bool, byte_range: tuple[int, int]
+) -> PartialAggregates:
+    return PartialAggregates.from_frame(clean_byte_range(csv_path, header, byte_range), original_column_count, sketches)
+
+
+def count_byte_range(
+    csv_path: Path, header: list[str], summaries: dict[str, pd.DataFrame], byte_range: tuple[int, int]
+) -> dict[str, pd.DataFrame]:
+    return heavy_hitter_counts(summaries, clean_byte_range(csv_path, header, byte_range))
+
+
+def map_in_order(func: Callable, tasks: list, workers: int) -> Iterator:
+    if workers <= 1 or len(tasks) <= 1:
+        yield from map(func, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        yield from executor.map(func, tasks)
+
+
+def merge_in_order(parts: Iterable[PartialAggregates]) -> PartialAggregates:
+    # Folding partitions in input order keeps idxmax-style "first row wins" ties exact
+    state = PartialAggregates()
+    for part in parts:
+        state.merge(part)
+    return state
+
+
+def aggregate_csv_parallel(csv_path: Path, workers: int, sketches: bool = False) -> PartialAggregates:
+    header = list(pd.read_csv(csv_path, nrows=0).columns)
+    parts = max(workers, -(-csv_path.stat().st_size // PARTITION_BYTES))
+    byte_ranges = csv_byte_ranges(csv_path, parts)
+    task = partial(aggregate_byte_range, csv_path, header, len(header), sketches)
+    state = merge_in_order(map_in_order(task, byte_ranges, workers))
+    if not heavy_hitters_exact(state.heavy_hitters):
+        with stage("recount_heavy_hitters"):
+            task = partial(count_byte_range, csv_path, header, state.heavy_hitters)
+            state.heavy_hitters = recount_heavy_hitters(state.heavy_hitters, map_in_order(task, byte_ranges, workers))
+    return state
+
+
+def append_deltas(
+    state: PartialAggregates,
+    delta_paths: list[Path],
+    chunksize: int | None = None,
+    workers: int = 1,
+) -> tuple[PartialAggregates, list[dict]]:
+    # Also returns the appended entries (name, sha256, rows) of the files folded in by this call
+    applied = {entry["sha256"] for entry in state.appended}
+    pending: list[tuple[Path, str]] = []
+    for delta_path in delta_paths:
+        digest = file_sha256(delta_path)
+        if digest in applied:
+            print(f"Skipping {delta_path}: already folded into the aggregate state.")
+            continue
+        pending.append((delta_path, digest))
+        applied.add(digest)
+
+    # Delta files are aggregated in parallel and folded back in the order given; they carry sketches
+    # exactly when the saved state does, so every row lands in the same statistics
+    sketches = state.quantile_sketch is not None
+    base = state.heavy_hitters
+    task = partial(aggregate_csv, chunksize=chunksize, sketches=sketches)
+    deltas = map_in_order(task, [path for path, _ in pending], workers)
+    for (delta_path, digest), delta in zip(pending, deltas):
+        state.merge(delta)
+        state.appended.append({"name": delta_path.name, "sha256": digest, "rows": delta.counters["rows"]})
+    # The earlier rows are gone, so only the delta rows are recounted; the saved counts cover the rest
+    if not heavy_hitters_exact(state.heavy_hitters):
+        with stage("recount_heavy_hitters"):
+            task = partial(count_csv, summaries=state.heavy_hitters, chunksize=chunksize)
+            counts = map_in_order(task, [path for path, _ in pending], workers)
+            state.heavy_hitters = recount_heavy_hitters(state.heavy_hitters, counts, base)
+    return state, state.appended[len(state.appended) - len(pending) :]
+
+
+def quality_thresholds() -> dict:
+    return {
+        "low_price_threshold": LOW_PRICE_THRESHOLD,
+        "high_price_threshold": HIGH_PRICE_THRESHOLD,
+        "extreme_gap_threshold": EXTREME_GAP_THRESHOLD,
     }
-    variant_notes: list[str] = []
-    variant_row_count = 0
-    for variant, canonical in make_variant_pairs.items():
-        variant_count = int(make_value_counts.get(variant, 0))
-        if variant_count > 0:
-            variant_notes.append(f"{variant} ({variant_count:,}) vs {canonical}")
-            variant_row_count += variant_count
-
-    truck_tag_count = int(df["make"].str.contains(r"\bTRUCK\b|\b TK\b", na=False).sum())
-    if truck_tag_count > 0:
-        variant_notes.append(f"non-standard '* TRUCK/* TK' labels ({truck_tag_count:,})")
-        variant_row_count += truck_tag_count
-
-    max_price = float(price_valid.max()) if not price_valid.empty else 0.0
-    max_gap = float(gap_valid.abs().max()) if not gap_valid.empty else 0.0
-
-    def compact_vehicle_label(row: pd.Series) -> str:
-        year = int(row["year"]) if pd.notna(row["year"]) else None
-        parts = [
-            str(row["make"]) if pd.notna(row["make"]) else "Unknown make",
-            str(row["model"]) if pd.notna(row["model"]) else "Unknown model",
-            str(year) if year is not None else "",
-        ]
-        return " ".join(p for p in parts if p)
-
-    max_price_example = "Unavailable"
-    if not price_valid.empty:
-        max_price_row = df.loc[df["sellingprice"].idxmax()]
-        max_price_example = compact_vehicle_label(max_price_row)
-
-    max_gap_example = "Unavailable"
-    if not gap_valid.empty:
-        max_gap_row = df.loc[df["price_vs_mmr"].abs().idxmax()]
-        max_gap_example = compact_vehicle_label(max_gap_row)
-
-    make_price_counts = (
-        df.dropna(subset=["make", "sellingprice"])
-        .groupby("make")
-        .size()
-    )
+
+
+def data_quality_summary(tables: dict[str, pd.DataFrame], stats: dict) -> tuple[dict, list[str]]:
+    avg_price_by_make = tables["average_sellingprice_by_make"]
+    price_vs_mmr_by_make = tables["average_price_vs_mmr_by_make"]
+
+    relabeled = tables["relabeled_labels"]
+    relabeled_counts = relabeled.groupby("column")["rows"].sum()
+    relabeled_makes = relabeled[relabeled["column"] == "make"]
+    variant_notes = [f"{row.label} ({row.rows:,}) → {row.canonical}" for row in relabeled_makes.itertuples()]
+    variant_row_count = int(relabeled_counts.get("make", 0))
+
+    make_price_counts = stats["make_price_counts"]
     top_price_small_sample_count = int(
         avg_price_by_make.head(10)["make"].map(make_price_counts).fillna(0).lt(30).sum()
     )
@@ -324,37 +2305,122 @@ def main() -> None:
         price_vs_mmr_by_make.head(10)["make"].map(make_price_counts).fillna(0).lt(30).sum()
     )
 
+    low_price_count = stats["low_price_count"]
+    one_dollar_count = stats["one_dollar_count"]
+    high_price_count = stats["high_price_count"]
+    max_price = stats["max_sellingprice"]
+    max_price_example = stats["max_sellingprice_example"]
+    extreme_gap_count = stats["extreme_gap_count"]
+    max_gap = stats["max_abs_gap"]
+    max_gap_example = stats["max_abs_gap_example"]
+    missing_make_count = stats["missing_make_count"]
+    duplicate_vin_rows = stats["duplicate_vin_rows"]
+    segment_outliers = stats["segment_outlier_rows"]
+
     variant_examples = "; ".join(variant_notes[:3]) if variant_notes else "none detected"
     data_quality_notes = [
-        f"{low_price_count:,} records have selling prices at or below ${low_price_threshold:,}, including {one_dollar_count:,} record(s) at exactly $1.",
-        f"{high_price_count:,} record(s) exceed ${high_price_threshold:,} selling price; the maximum is ${max_price:,.0f} ({max_price_example}).",
-        f"{extreme_gap_count:,} record(s) have absolute price-vs-MMR gaps above ${extreme_gap_threshold:,}; the largest absolute gap is ${max_gap:,.0f} ({max_gap_example}).",
-        f"{missing_make_count:,} rows are missing make values, and {variant_row_count:,} rows use inconsistent/non-standard make labels (e.g., {variant_examples}).",
+        f"{low_price_count:,} records have selling prices at or below ${LOW_PRICE_THRESHOLD:,}, including {one_dollar_count:,} record(s) at exactly $1.",
+        f"{high_price_count:,} record(s) exceed ${HIGH_PRICE_THRESHOLD:,} selling price; the maximum is ${max_price:,.0f} ({max_price_example}).",
+        f"{extreme_gap_count:,} record(s) have absolute price-vs-MMR gaps above ${EXTREME_GAP_THRESHOLD:,}; the largest absolute gap is ${max_gap:,.0f} ({max_gap_example}).",
+        f"{missing_make_count:,} rows are missing make values, and {variant_row_count:,} rows with inconsistent/non-standard make labels were folded into their canonical make (e.g., {variant_examples}).",
         f"{duplicate_vin_rows:,} rows share a VIN with at least one other row; validate whether these are expected re-listings before assuming one row per vehicle.",
+        f"Scored against their own make, model-year and body segment (at least {SEGMENT_MIN_ROWS} sales), {segment_outliers.get('sellingprice', 0):,} selling prices and {segment_outliers.get('price_vs_mmr', 0):,} price-vs-MMR gaps are robust outliers (|modified z| above {MODIFIED_Z_THRESHOLD}); the most extreme sales per segment are listed in flagged_anomalies.",
         f"Small-sample bias exists in make-level rankings: {top_price_small_sample_count:,} of the top 10 average-price makes and {top_vs_mmr_small_sample_count:,} of the top 10 price-vs-MMR makes have fewer than 30 records.",
     ]
 
-    # Save tables
-    tx_by_make.to_csv(TABLES_DIR / "transactions_by_make.csv", index=False)
-    tx_by_body.to_csv(TABLES_DIR / "transactions_by_body.csv", index=False)
-    tx_by_year.to_csv(TABLES_DIR / "transactions_by_year.csv", index=False)
-    tx_by_month.to_csv(TABLES_DIR / "transactions_by_month.csv", index=False)
-    tx_by_make_year.to_csv(TABLES_DIR / "transactions_by_make_year.csv", index=False)
-    tx_by_make_month.to_csv(TABLES_DIR / "transactions_by_make_month.csv", index=False)
-    tx_by_state.to_csv(TABLES_DIR / "transactions_by_state.csv", index=False)
-    avg_price_by_make.to_csv(TABLES_DIR / "average_sellingprice_by_make.csv", index=False)
-    avg_price_by_make_year.to_csv(TABLES_DIR / "average_sellingprice_by_make_year.csv", index=False)
-    avg_price_by_year.to_csv(TABLES_DIR / "average_sellingprice_by_year.csv", index=False)
-    price_vs_mmr_by_make.to_csv(TABLES_DIR / "average_price_vs_mmr_by_make.csv", index=False)
-    price_vs_mmr_by_make_year.to_csv(TABLES_DIR / "average_price_vs_mmr_by_make_year.csv", index=False)
-    price_vs_mmr_by_year.to_csv(TABLES_DIR / "average_price_vs_mmr_by_year.csv", index=False)
-
-    total_transactions = int(len(df))
-    valid_price_rows = int(df["sellingprice"].notna().sum())
-    valid_date_rows = int(df["sale_datetime"].notna().sum())
-    avg_sellingprice = float(df["sellingprice"].mean())
-    avg_price_vs_mmr = float(df["price_vs_mmr"].mean())
-    avg_car_age = float(df["car_age_at_sale"].mean())
+    data_quality = {
+        **quality_thresholds(),
+        "low_price_count": low_price_count,
+        "one_dollar_count": one_dollar_count,
+        "high_price_count": high_price_count,
+        "max_sellingprice": max_price,
+        "max_sellingprice_example": max_price_example,
+        "extreme_gap_count": extreme_gap_count,
+        "max_abs_gap": max_gap,
+        "max_abs_gap_example": max_gap_example,
+        "missing_make_count": missing_make_count,
+        "inconsistent_make_label_count": variant_row_count,
+        "relabeled_body_count": int(relabeled_counts.get("body", 0)),
+        "relabeled_model_count": int(relabeled_counts.get("model", 0)),
+        "duplicate_vin_rows": duplicate_vin_rows,
+        "segment_outlier_price_count": int(segment_outliers.get("sellingprice", 0)),
+        "segment_outlier_gap_count": int(segment_outliers.get("price_vs_mmr", 0)),
+        "top_price_small_sample_count": top_price_small_sample_count,
+        "top_vs_mmr_small_sample_count": top_vs_mmr_small_sample_count,
+    }
+    return data_quality, data_quality_notes
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate OLAP tables, report files, and the website payload.")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream car_prices.csv in chunks of this many rows instead of loading it whole.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-parse car_prices.csv instead of reusing (or writing) the cleaned-data cache in .cache/.",
+    )
+    parser.add_argument(
+        "--append",
+        nargs="+",
+        type=Path,
+        metavar="DELTA_CSV",
+        help="Fold new sales files into the saved aggregate state instead of rebuilding from car_prices.csv.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Clean and aggregate CSV byte ranges (or --append files) in this many processes.",
+    )
+    parser.add_argument(
+        "--sketches",
+        action="store_true",
+        help="Also estimate per-group percentiles and distinct VIN counts with mergeable sketches.",
+    )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help=f"Also load the cleaned rows into an indexed SQLite file ({STORE_PATH.name}); with --append, add the new rows to it.",
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        metavar="TRACE_JSON",
+        help="Also write per-stage timings as a Chrome trace (chrome://tracing, Perfetto).",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record each stage's peak Python/numpy allocations with tracemalloc (slows the run down).",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="*",
+        metavar="STAGE",
+        help=f"Run cProfile over the named stages (default: every top-level stage); stats go to {PROFILE_PATH.name}.",
+    )
+    return parser.parse_args(argv)
+
+
+def build_summary(tables: dict[str, pd.DataFrame], stats: dict) -> tuple[dict, list[str]]:
+    tx_by_make = tables["transactions_by_make"]
+    tx_by_body = tables["transactions_by_body"]
+    tx_by_year = tables["transactions_by_year"]
+    tx_by_month = tables["transactions_by_month"]
+    tx_by_state = tables["transactions_by_state"]
+
+    data_quality, data_quality_notes = data_quality_summary(tables, stats)
+
+    original_column_count = stats["columns"]
+    total_transactions = stats["rows"]
+    avg_sellingprice = stats["average_sellingprice"]
+    avg_price_vs_mmr = stats["average_price_vs_mmr"]
+    avg_car_age = stats["average_car_age_at_sale"]
 
     top_make = tx_by_make.iloc[0]
     top_body = tx_by_body.iloc[0]
@@ -368,8 +2434,8 @@ def main() -> None:
             "name": "car_prices.csv",
             "rows": total_transactions,
             "columns": original_column_count,
-            "valid_price_rows": valid_price_rows,
-            "valid_date_rows": valid_date_rows,
+            "valid_price_rows": stats["valid_price_rows"],
+            "valid_date_rows": stats["valid_date_rows"],
         },
         "kpis": {
             "average_sellingprice": avg_sellingprice,
@@ -386,45 +2452,215 @@ def main() -> None:
             "peak_month": str(monthly_peak["year_month"]),
             "peak_month_transactions": int(monthly_peak["transactions"]),
         },
-        "data_quality": {
-            "low_price_threshold": low_price_threshold,
-            "high_price_threshold": high_price_threshold,
-            "extreme_gap_threshold": extreme_gap_threshold,
-            "low_price_count": low_price_count,
-            "one_dollar_count": one_dollar_count,
-            "high_price_count": high_price_count,
-            "max_sellingprice": max_price,
-            "max_sellingprice_example": max_price_example,
-            "extreme_gap_count": extreme_gap_count,
-            "max_abs_gap": max_gap,
-            "max_abs_gap_example": max_gap_example,
-            "missing_make_count": missing_make_count,
-            "inconsistent_make_label_count": variant_row_count,
-            "duplicate_vin_rows": duplicate_vin_rows,
-            "top_price_small_sample_count": top_price_small_sample_count,
-            "top_vs_mmr_small_sample_count": top_vs_mmr_small_sample_count,
-        },
+        "data_quality": data_quality,
     }
+    if "sketches" in stats:
+        summary["approximate"] = stats["sketches"]
+
+    return summary, data_quality_notes
+
+
+def write_tables(tables: dict[str, pd.DataFrame]) -> None:
+    for name, table in tables.items():
+        render_output(TABLES_DIR / f"{name}.csv", partial(table.to_csv, index=False), newline="")
+
+
+def write_cube(cube: pd.DataFrame) -> None:
+    # A zero gzip mtime keeps an unchanged cube byte-identical, so the rewrite is skipped
+    render_output(CUBE_PATH, partial(cube.to_csv, index=False, compression={"method": "gzip", "mtime": 0}), "wb")
+
 
-    (OUT_DIR / "analysis_summary.json").write_text(json.dumps(summary, indent=2))
+def store_schema() -> str:
+    columns = ", ".join(f"{name} {kind}" for name, kind in STORE_COLUMNS.items())
+    statements = [
+        "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS store_appended (sha256 TEXT PRIMARY KEY, name TEXT, rows INTEGER)",
+        *[f"CREATE TABLE IF NOT EXISTS dim_{name} (id INTEGER PRIMARY KEY, label TEXT NOT NULL UNIQUE)" for name in STORE_DIMENSIONS],
+        f"CREATE TABLE IF NOT EXISTS sales (id INTEGER PRIMARY KEY, {columns})",
+    ]
+    labels = [f"dim_{name}.label AS {name}" for name in STORE_DIMENSIONS]
+    facts = [f"sales.{name}" for name in STORE_COLUMNS if not name.endswith("_id")]
+    joins = " ".join(f"LEFT JOIN dim_{name} ON dim_{name}.id = sales.{name}_id" for name in STORE_DIMENSIONS)
+    statements.append(f"CREATE VIEW IF NOT EXISTS sales_v AS SELECT sales.id, {', '.join(labels + facts)} FROM sales {joins}")
+    return ";\n".join(statements) + ";"
+
+
+def store_rollup_sql(name: str, keys: list[str], measure: str | None) -> str:
+    # Same rows as rollup(): non-null keys, and averages only over groups with a value. Groups are
+    # formed on the fact table's ids, and labels are joined onto the (few) grouped rows afterwards.
+    grouped = [f"{key}_id" if key in STORE_DIMENSIONS else key for key in keys]
+    if measure is None:
+        value, aggregate, having = "transactions", "COUNT(*) AS transactions", ""
+    else:
+        value, aggregate, having = f"avg_{measure}", f"AVG({measure}) AS avg_{measure}", f" HAVING COUNT({measure}) > 0"
+    inner = (
+        f"SELECT {', '.join(grouped + [aggregate])} FROM sales "
+        f"WHERE {' AND '.join(f'{column} IS NOT NULL' for column in grouped)} GROUP BY {', '.join(grouped)}{having}"
+    )
+    columns = [f"dim_{key}.label AS {key}" if key in STORE_DIMENSIONS else f"grouped.{key}" for key in keys]
+    columns.append(f"grouped.{value}")
+    if "sale_month" in keys:
+        columns.append("printf('%04d-%02d', grouped.sale_year, grouped.sale_month) AS year_month")
+    joins = "".join(f" JOIN dim_{key} ON dim_{key}.id = grouped.{key}_id" for key in keys if key in STORE_DIMENSIONS)
+    order = f"{value} DESC, {keys[0]}" if len(keys) == 1 and keys[0] not in TIME_KEYS else ", ".join(keys)
+    return (
+        f"CREATE TABLE {name} AS SELECT {', '.join(columns)} "
+        f"FROM ({inner}) AS grouped{joins} ORDER BY {order}"
+    )
+
+
+def refresh_store_rollups(conn: sqlite3.Connection) -> None:
+    with stage("store_rollups"):
+        for name, (keys, measure) in OLAP_ROLLUPS.items():
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute(store_rollup_sql(name, keys, measure))
+
+
+def store_dimension_ids(conn: sqlite3.Connection, name: str, values: pd.Series) -> list:
+    values = values.astype("category").cat.remove_unused_categories()
+    labels = values.cat.categories.astype(str).tolist()
+    conn.executemany(f"INSERT OR IGNORE INTO dim_{name} (label) VALUES (?)", [(label,) for label in labels])
+    ids = dict(conn.execute(f"SELECT label, id FROM dim_{name}"))
+    lookup = pd.array([ids[label] for label in labels], dtype="Int64")
+    return json_ready(pd.Series(lookup.take(values.cat.codes.to_numpy(), allow_fill=True)))
+
+
+def store_sale_dates(df: pd.DataFrame) -> tuple[list, list]:
+    # UTC timestamp and local sale date as ISO text; numpy formats them without a per-row strftime
+    days = sale_days(df["saledate"].astype("category").cat.remove_unused_categories())
+    valid = (df["sale_datetime"].notna() & days.notna()).to_numpy()
+    utc = df["sale_datetime"].dt.tz_convert(None).to_numpy("datetime64[s]")
+    local = np.where(valid, days.to_numpy("float64", na_value=0), 0).astype("int64").astype("datetime64[D]")
+    return [
+        np.where(valid, np.datetime_as_string(values).astype(object), None).tolist() for values in (utc, local)
+    ]
+
+
+def store_columns(conn: sqlite3.Connection, df: pd.DataFrame) -> dict[str, list]:
+    columns = {f"{name}_id": store_dimension_ids(conn, name, df[name]) for name in STORE_DIMENSIONS}
+    sale_datetime, sale_date = store_sale_dates(df)
+    for name, kind in STORE_COLUMNS.items():
+        if name in columns:
+            continue
+        if name == "sale_datetime":
+            columns[name] = sale_datetime
+        elif name == "sale_date":
+            columns[name] = sale_date
+        elif kind == "INTEGER":
+            columns[name] = json_ready(df[name].astype("Int64"))
+        elif kind == "REAL":
+            # float32 values are widened and rounded so a condition of 2.2 reads back as 2.2
+            columns[name] = json_ready(df[name].astype("float64").round(4))
+        else:
+            columns[name] = json_ready(df[name])
+    return columns
+
+
+def insert_store_rows(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    names = list(STORE_COLUMNS)
+    statement = f"INSERT INTO sales ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+    # Python values are built one batch at a time, so memory stays flat however large the frame is
+    for start in range(0, len(df), STORE_INSERT_BATCH_ROWS):
+        columns = store_columns(conn, df.iloc[start : start + STORE_INSERT_BATCH_ROWS])
+        conn.executemany(statement, zip(*(columns[name] for name in names)))
+    return len(df)
+
+
+def build_store(frames: Iterable[pd.DataFrame], source: dict) -> None:
+    STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = STORE_PATH.with_name(STORE_PATH.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # A failed build only loses the temporary file, so the load can skip the rollback journal
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(store_schema())
+        with stage("store_insert") as counts:
+            rows = sum(insert_store_rows(conn, df) for df in frames)
+            counts["rows_out"] = rows
+        # Indexes are built once after the bulk load rather than maintained row by row
+        with stage("store_index", rows_in=rows):
+            for name, columns in STORE_INDEXES.items():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON sales ({', '.join(columns)})")
+            conn.execute("ANALYZE")
+        refresh_store_rollups(conn)
+        conn.executemany(
+            "INSERT INTO store_meta (key, value) VALUES (?, ?)",
+            [
+                ("store_version", STORE_VERSION),
+                ("cleaning", cleaning_key()),
+                ("source_sha256", source["sha256"]),
+                ("source_rows", str(rows)),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, STORE_PATH)
+
+
+def append_store(delta_paths: list[Path], chunksize: int | None = None) -> None:
+    if not STORE_PATH.exists():
+        raise SystemExit(f"No store at {STORE_PATH}; run a full build with --store before appending.")
+    conn = sqlite3.connect(STORE_PATH)
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM store_meta"))
+        if meta.get("store_version") != STORE_VERSION or meta.get("cleaning") != cleaning_key():
+            raise SystemExit(f"Store at {STORE_PATH} was built with a different schema or cleaning rules; run a full build with --store.")
+        applied = {digest for (digest,) in conn.execute("SELECT sha256 FROM store_appended")}
+        # One transaction, so a failed append leaves the store as it was
+        with conn:
+            for delta_path in delta_paths:
+                digest = file_sha256(delta_path)
+                if digest in applied:
+                    continue
+                with stage("store_insert") as counts:
+                    rows = sum(insert_store_rows(conn, df) for df in cleaned_frames(delta_path, chunksize))
+                    counts["rows_out"] = rows
+                conn.execute("INSERT INTO store_appended (sha256, name, rows) VALUES (?, ?, ?)", (digest, delta_path.name, rows))
+                applied.add(digest)
+            refresh_store_rollups(conn)
+    finally:
+        conn.close()
+
+
+def write_dashboard(
+    tables: dict[str, pd.DataFrame], summary: dict, data_quality_notes: list[str], preview: list[str]
+) -> None:
+    kpis = summary["kpis"]
+    tx_by_month = tables["transactions_by_month"]
+    tx_by_make_month = tables["transactions_by_make_month"]
+
+    # With the notes and every table's column dtypes, scripts/wheelwise.py re-renders the reports and
+    # shards from the saved outputs alone
+    saved = {
+        **summary,
+        "data_quality_notes": data_quality_notes,
+        "tables": {name: table.dtypes.astype(str).to_dict() for name, table in tables.items()},
+    }
+    write_output(OUT_DIR / "analysis_summary.json", json.dumps(saved, indent=2))
 
     website_payload = {
         "summary": summary,
         "data_dictionary": DATA_DICTIONARY,
-        "top_makes": to_records(tx_by_make, 15),
-        "top_bodies": to_records(tx_by_body, 12),
-        "top_states": to_records(tx_by_state, 12),
-        "transactions_by_year": to_records(tx_by_year),
-        "transactions_by_month": to_records(tx_by_month[["year_month", "transactions"]]),
-        "transactions_by_make_year": to_records(tx_by_make_year),
-        "transactions_by_make_month": to_records(tx_by_make_month[["make", "sale_year", "year_month", "transactions"]]),
-        "avg_price_by_make": to_records(avg_price_by_make),
-        "avg_price_by_make_year": to_records(avg_price_by_make_year),
-        "avg_price_by_year": to_records(avg_price_by_year),
-        "price_vs_mmr_by_make": to_records(price_vs_mmr_by_make),
-        "price_vs_mmr_by_make_year": to_records(price_vs_mmr_by_make_year),
-        "price_vs_mmr_by_year": to_records(price_vs_mmr_by_year),
+        "top_makes": tables["transactions_by_make"].head(15),
+        "top_bodies": tables["transactions_by_body"].head(12),
+        "top_states": tables["transactions_by_state"].head(12),
+        "transactions_by_year": tables["transactions_by_year"],
+        "transactions_by_month": tx_by_month[["year_month", "transactions"]],
+        "transactions_by_make_year": tables["transactions_by_make_year"],
+        "transactions_by_make_month": tx_by_make_month[["make", "sale_year", "year_month", "transactions"]],
+        "avg_price_by_make": tables["average_sellingprice_by_make"],
+        "avg_price_by_make_year": tables["average_sellingprice_by_make_year"],
+        "avg_price_by_year": tables["average_sellingprice_by_year"],
+        "price_vs_mmr_by_make": tables["average_price_vs_mmr_by_make"],
+        "price_vs_mmr_by_make_year": tables["average_price_vs_mmr_by_make_year"],
+        "price_vs_mmr_by_year": tables["average_price_vs_mmr_by_year"],
         "data_quality_notes": data_quality_notes,
+        "sample_head": preview_head(preview),
+        **{key: tables[key] for key in DASHBOARD_SHARDS["drilldown"] + DASHBOARD_SHARDS["sketches"] if key in tables},
+        "daily_series": dense_series_payload(tables["daily_transactions"], "sale_date", 1, DASHBOARD_SERIES_SCOPES),
         "code_showcase": {
             "cleaning": {
                 "description": "Standardize text columns to uppercase and parse the raw saledate string (which includes timezone abbreviations) into a proper datetime for time-series analysis.",
@@ -432,11 +2668,11 @@ def main() -> None:
             },
             "category_summary": {
                 "description": "Count transactions per manufacturer to identify which makes dominate auction volume. This is a standard OLAP roll-up from individual rows to category totals.",
-                "code": f"# Group by make -> count rows -> sort descending\ntx_by_make = (\n    df.groupby('make')\n    .size()\n    .reset_index(name='transactions')\n    .sort_values('transactions', ascending=False)\n)\n# Top result: {top_make['make']} — {int(top_make['transactions']):,} transactions",
+                "code": f"# Group by make -> count rows -> sort descending\ntx_by_make = (\n    df.groupby('make')\n    .size()\n    .reset_index(name='transactions')\n    .sort_values('transactions', ascending=False)\n)\n# Top result: {kpis['top_make']} — {kpis['top_make_transactions']:,} transactions",
             },
             "time_summary": {
                 "description": "Aggregate transaction counts by year-month to reveal seasonal patterns and volume trends over time.",
-                "code": f"# Group by year + month for time-series granularity\ntx_by_month = (\n    df.groupby(['sale_year', 'sale_month'])\n    .size()\n    .reset_index(name='transactions')\n)\n# Peak row: {monthly_peak['year_month']} | {int(monthly_peak['transactions']):,} transactions",
+                "code": f"# Group by year + month for time-series granularity\ntx_by_month = (\n    df.groupby(['sale_year', 'sale_month'])\n    .size()\n    .reset_index(name='transactions')\n)\n# Peak row: {kpis['peak_month']} | {kpis['peak_month_transactions']:,} transactions",
             },
             "additional_summary": {
                 "description": "Calculate how much each make sells above or below its Manheim Market Report (MMR) value on average. Positive = sellers get more than market estimate.",
@@ -444,205 +2680,235 @@ def main() -> None:
             },
         },
     }
-    (WEBSITE_DATA_DIR / "dashboard_data.json").write_text(json.dumps(website_payload, indent=2))
-
-    data_quality_notes_md = "\n".join(f"- {note}" for note in data_quality_notes)
-    data_quality_notes_html = "".join(f"<li>{note}</li>" for note in data_quality_notes)
-
-    # Report draft (paper output)
-    report_md = f"""# Mini Data Analysis & Reporting Activity
-
-## 1. Title Page
-- Activity Title: Mini Data Analysis & Reporting Activity
-- Dataset: `car_prices.csv`
-- Students: Justin Louis Amper Dampal and Greg Danielle Cabanda Duetes
-
-## 2. Introduction
-The dataset contains used-car sales transactions with fields for vehicle details, seller, condition, odometer reading, market reference value (MMR), final selling price, and sale date. It represents a dealership/auction sales context where each transaction captures a specific sale event.
-
-The data likely originates from an operational automotive sales platform (e.g., dealer auction management or vehicle marketplace transaction system).
-
-This report converts raw operational records into analytical summaries by category, time, and pricing behavior.
-
-## 3. Data Dictionary
-The original dataset contains {original_column_count} columns. Each column is described below:
-
-{data_dictionary_md_table()}
-
-## 4. OLTP Perspective
-One row represents one completed car sale transaction. It stores transactional attributes (what car was sold, by whom, when, and for how much).
-
-This is OLTP data because records are event-level, high-volume, and designed for day-to-day operational recording rather than summarized reporting.
-
-A typical system storing this data is a vehicle sales transaction management system integrated with dealer inventory and auction workflows.
-
-## 5. Data Analysis (OLAP Results)
-### 5.1 Transactions per Category (Make)
-{markdown_table(tx_by_make, 10)}
-
-### 5.2 Transactions per Time Period (Year)
-{markdown_table(tx_by_year, 10)}
-
-### 5.3 Transactions per Time Period (Month)
-{markdown_table(tx_by_month[['year_month', 'transactions']], 20)}
-
-### 5.4 Transactions per Category (Body Type)
-{markdown_table(tx_by_body, 10)}
-
-### 5.5 Transactions per Category (State)
-{markdown_table(tx_by_state, 10)}
+    write_dashboard_shards(website_payload)
 
-### 5.6 Additional Aggregation: Average Selling Price by Make
-{markdown_table(avg_price_by_make, 10)}
 
-### 5.7 Additional Aggregation: Average Price vs MMR by Make
-(Positive values indicate selling above MMR; negative values indicate below MMR.)
+def write_reports(tables: dict[str, pd.DataFrame], summary: dict, data_quality_notes: list[str]) -> None:
+    renders = report_template.report_renders(summary, data_quality_notes, FrameTables(tables), list(tables))
+    for name, render in renders.items():
+        render_output(REPORT_DIR / name, render)
 
-{markdown_table(price_vs_mmr_by_make, 10)}
 
-## 6. Findings and Insights
+def print_profile(profiler: cProfile.Profile) -> None:
+    PROFILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(PROFILE_PATH)
+    print(f"cProfile stats written to {PROFILE_PATH}")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
 
-### 6.1 Volume and Scale
-The dataset contains **{total_transactions:,}** individual sale transactions, representing a substantial operational record suitable for identifying market-wide patterns. The sheer volume confirms that the source system handles high-frequency, day-to-day transactional activity typical of an OLTP environment.
 
-### 6.2 Category Patterns
-**{top_make['make']}** leads all manufacturers with **{int(top_make['transactions']):,}** transactions, followed by Chevrolet and Nissan. This dominance reflects Ford's historically large share of the U.S. vehicle market, its wide model lineup (sedans, trucks, SUVs), and high fleet and rental-channel volume that feeds into auction resale pipelines.
+def aggregate_sources(args: argparse.Namespace) -> tuple[PartialAggregates, list[dict]]:
+    if args.append:
+        state = PartialAggregates.load(STATE_PATH)
+        if args.sketches and state.quantile_sketch is None:
+            raise SystemExit(f"Aggregate state at {STATE_PATH} has no sketches; run a full build with --sketches first.")
+        return append_deltas(state, args.append, args.chunksize, args.workers)
+    if args.workers > 1:
+        return aggregate_csv_parallel(CSV_PATH, args.workers, args.sketches), []
+    if args.chunksize:
+        return aggregate_csv(CSV_PATH, args.chunksize, args.sketches), []
+    df, original_column_count = load_clean_frame(CSV_PATH, use_cache=not args.no_cache)
+    with stage("build_state", rows_in=len(df)):
+        return PartialAggregates.from_frame(df, original_column_count, args.sketches), []
 
-The dominant body type is **{top_body['body']}** at **{int(top_body['transactions']):,}** transactions, accounting for roughly 43% of all sales. SUVs follow at approximately 26%. This split mirrors broader U.S. consumer preferences during the 2014-2015 period, when sedans still held the largest share of the used-car market before the industry-wide shift toward crossovers and trucks.
 
-### 6.3 Geographic Distribution
-**{top_state['state']}** is the most active state with **{int(top_state['transactions']):,}** transactions, followed by CA and PA. Florida's leading position is likely driven by its large population, favorable climate (which reduces vehicle corrosion and preserves condition), and concentration of major auction houses such as Manheim. California follows due to its status as the largest U.S. auto market by population.
-
-### 6.4 Time-Based Trends
-The vast majority of transactions — **{int(yearly_peak['transactions']):,}** — occurred in **{int(yearly_peak['sale_year'])}**, with only **{int(df.dropna(subset=['sale_year']).groupby('sale_year').size().min()):,}** in the prior year. This suggests the dataset captures a system that either ramped up operations or expanded data collection during this period.
-
-The peak month is **{monthly_peak['year_month']}** with **{int(monthly_peak['transactions']):,}** transactions. Monthly data reveals a general upward trend from late 2014 through early 2015, which may reflect seasonal patterns in wholesale auction activity where volumes typically increase in Q1 as dealers replenish inventory after year-end.
-
-### 6.5 Pricing Insights
-The average selling price across all valid records is **${avg_sellingprice:,.2f}**. More notably, vehicles sold at an average of **${avg_price_vs_mmr:,.2f}** relative to MMR (Manheim Market Report), meaning most cars transacted slightly below independent market valuation. This negative gap suggests a buyer-favorable market at scale, which is typical of high-volume wholesale auctions where speed of sale is prioritized over maximizing individual unit profit.
-
-Luxury and specialty brands (Rolls-Royce, Ferrari, Lamborghini) command dramatically higher average prices but represent a very small fraction of total volume. Some niche segments like Airstream and Aston Martin show positive price-vs-MMR gaps, indicating that scarcity and collector demand can push certain vehicles above their reference value.
-
-## 7. Recommendation
-
-1. **Prioritize high-volume inventory.** Ford, Chevrolet, and Nissan collectively account for a large share of all transactions. Dealers and auction operators should ensure adequate supply and competitive pricing for these makes to maintain turnover and buyer engagement.
-
-2. **Tighten pricing for below-MMR segments.** The overall negative price-vs-MMR gap indicates an opportunity to improve pricing discipline. By identifying which specific makes and models consistently sell below market value, sellers can adjust reserve prices or improve vehicle presentation to narrow the gap.
+def report_paths() -> list[Path]:
+    return [
+        REPORT_DIR / f"Mini_Data_Analysis_{name}.{suffix}" for name in ("Report", "Appendix") for suffix in ("md", "html")
+    ]
 
-3. **Leverage seasonal peaks for operational planning.** The strong monthly fluctuations — particularly the surge in early 2015 — suggest that staffing, logistics, and marketing budgets should be aligned with predictable high-volume periods rather than spread evenly across the year.
 
-4. **Monitor niche segments for premium opportunities.** Brands that consistently sell above MMR (such as specialty and luxury makes) represent margin opportunities. Tracking which segments sustain above-market pricing can guide targeted acquisition strategies for higher-margin inventory.
+def dashboard_paths() -> list[Path]:
+    return [OUT_DIR / "analysis_summary.json"] + [
+        DASHBOARD_DIR / f"{shard}.json{suffix}" for shard in DASHBOARD_SHARDS for suffix in ("", ".gz")
+    ]
 
-## 8. Data Quality Notes (Pricing Anomalies)
-{data_quality_notes_md}
 
-## Appendix: Method Notes
-- Missing values in `sellingprice`, `mmr`, and `saledate` were handled with coercion and excluded only where required per metric.
-- Time-series summaries were derived from parsed `saledate` values (`sale_year`, `sale_month`).
-- Full summary tables are available in the `/outputs/tables` folder.
-"""
+# Pipeline DAG: stage -> (upstream stages, entry points). A stage's key hashes the source of every
+# function and class its entry points reach (see stage_code). Module constants a stage reads are
+# passed to StageGraph.run as parameters.
+PIPELINE_STAGES = {
+    "aggregates": ([], [aggregate_sources, PartialAggregates]),
+    "cube": (["aggregates"], [write_cube]),
+    "store": ([], [cleaned_frames, load_clean_frame, build_store, append_store]),
+    "rollups": (["aggregates"], [PartialAggregates]),
+    "quality": (["rollups"], [build_summary]),
+    "preview": ([], [sample_preview, append_preview, write_preview]),
+    "tables": (["rollups"], [write_tables]),
+    "dashboard": (["rollups", "quality", "preview"], [write_dashboard]),
+    "reports": (["rollups", "quality"], [write_reports]),
+    "map_points": ([], [write_map_points]),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    global OUTPUT_GENERATION, RUN_METRICS
+    args = parse_args(argv)
+    TABLES_DIR.mkdir(parents=True, exist_ok=True)
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    WEBSITE_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    if args.trace_memory:
+        tracemalloc.start()
+    profiler = cProfile.Profile() if args.profile is not None else None
+    RUN_METRICS = RunMetrics(args.trace_memory, profiler, args.profile)
+
+    # --no-cache rebuilds every stage; the keys are still recorded for the next run
+    OUTPUT_GENERATION = OutputGeneration()
+    graph = StageGraph(use_cache=not args.no_cache, generation=OUTPUT_GENERATION)
+    # Appends run from the saved state and the delta files alone; car_prices.csv may be gone
+    source = None if args.append else graph.fingerprint(CSV_PATH)
+    states: list[PartialAggregates] = []
+    folded: list[dict] = []
+
+    def aggregate() -> None:
+        state, folded[:] = aggregate_sources(args)
+        states[:] = [state]
+        with stage("save_state"):
+            states[0].save(STATE_PATH)
+
+    def aggregated() -> PartialAggregates:
+        if not states:
+            states.append(PartialAggregates.load(STATE_PATH))
+        return states[0]
+
+    if args.append:
+        # Appending always folds the deltas in; the key chains from the state they were folded into
+        aggregate_params = {
+            "previous": graph.recorded.get("aggregates"),
+            "deltas": [file_sha256(path) for path in args.append],
+        }
+    else:
+        aggregate_params = {
+            "source": source["sha256"],
+            "cleaning": cleaning_key(),
+            "state_version": AGGREGATE_STATE_VERSION,
+            "thresholds": quality_thresholds(),
+            "sketches": args.sketches,
+            "cube": [CUBE_KEYS, CUBE_MEASURES],
+            "sketch_layout": [SKETCH_KEYS, SKETCH_MEASURES, QUANTILE_GAMMA, HLL_KEYS, HLL_PRECISION],
+            "heavy_hitters": [HEAVY_HITTERS, HEAVY_HITTER_CAPACITY],
+            "segments": [SEGMENT_KEYS, SEGMENT_MEASURES, SEGMENT_OUTLIERS],
+            "series": SERIES_KEYS,
+        }
+    graph.run("aggregates", aggregate, aggregate_params, outputs=[STATE_PATH], force=bool(args.append))
+    graph.run("cube", lambda: write_cube(aggregated().cube), outputs=[CUBE_PATH])
+    if args.store and args.append:
+        store_params = {"previous": graph.recorded.get("store"), "deltas": [file_sha256(path) for path in args.append]}
+        graph.run("store", lambda: append_store(args.append, args.chunksize), store_params, [STORE_PATH], force=True)
+    elif args.store:
+        # Chunked runs stream the CSV again; otherwise the cleaned frame comes from the cache
+        def store_frames() -> Iterator[pd.DataFrame]:
+            if args.chunksize:
+                yield from cleaned_frames(CSV_PATH, args.chunksize)
+            else:
+                yield load_clean_frame(CSV_PATH, use_cache=not args.no_cache)[0]
+
+        store_params = {
+            "source": source["sha256"],
+            "cleaning": cleaning_key(),
+            "store_version": STORE_VERSION,
+            "layout": [STORE_DIMENSIONS, STORE_COLUMNS, STORE_INDEXES, OLAP_ROLLUPS],
+        }
+        graph.run("store", lambda: build_store(store_frames(), source), store_params, outputs=[STORE_PATH])
+    tables, stats = graph.run(
+        "rollups",
+        lambda: aggregated().finalize(),
+        [
+            OLAP_ROLLUPS,
+            SKETCH_ROLLUPS,
+            DISTINCT_VIN_ROLLUPS,
+            SKETCH_PERCENTILES,
+            HEAVY_HITTER_TOP,
+            [SEGMENT_MIN_ROWS, MODIFIED_Z_SCALE, MODIFIED_Z_THRESHOLD],
+            [SERIES_TABLES, DAILY_ROLLING_DAYS, WEEKLY_ROLLING_WEEKS, DAILY_YOY_LAG, WEEKLY_YOY_LAG],
+        ],
+        cache=True,
+    )
+    summary, data_quality_notes = graph.run(
+        "quality", lambda: build_summary(tables, stats), quality_thresholds(), cache=True
+    )
 
-    (REPORT_DIR / "Mini_Data_Analysis_Report.md").write_text(report_md)
+    def preview_stage() -> list[str]:
+        if args.append:
+            previous = []
+            if PREVIEW_PATH.exists():
+                with PREVIEW_PATH.open(newline="") as handle:
+                    previous = handle.readlines()
+            paths = {file_sha256(path): path for path in args.append}
+            deltas = [(paths[entry["sha256"]], entry["rows"]) for entry in folded]
+            previous_rows = aggregated().counters["rows"] - sum(count for _, count in deltas)
+            preview = append_preview(previous, deltas, previous_rows)
+        else:
+            preview = sample_preview(CSV_PATH)
+        write_preview(preview)
+        return preview
+
+    if args.append:
+        # Like the aggregates, the appended preview chains from the one the deltas were folded into
+        preview_params = {"previous": graph.recorded.get("preview"), "deltas": [entry["sha256"] for entry in folded]}
+    else:
+        preview_params = [source["sha256"], PREVIEW_ROWS, PREVIEW_SEED, PREVIEW_OVERSAMPLE, PREVIEW_FULL_SCAN_BYTES]
+    preview = graph.run(
+        "preview", preview_stage, preview_params, outputs=[PREVIEW_PATH], cache=True, force=bool(args.append)
+    )
+    graph.run("tables", lambda: write_tables(tables), outputs=[TABLES_DIR / f"{name}.csv" for name in tables])
+    graph.run(
+        "dashboard",
+        lambda: write_dashboard(tables, summary, data_quality_notes, preview),
+        [
+            DASHBOARD_SHARDS,
+            DATA_DICTIONARY,
+            DASHBOARD_DICTIONARY_COLUMNS,
+            DASHBOARD_SERIES_SCOPES,
+            DASHBOARD_MAKE_SORTED,
+            DASHBOARD_MAKE_RANKED,
+            DASHBOARD_RANKING_LIMIT,
+            PREVIEW_HEAD_ROWS,
+            brotli is not None,
+        ],
+        outputs=dashboard_paths(),
+    )
+    graph.run(
+        "reports",
+        lambda: write_reports(tables, summary, data_quality_notes),
+        [DATA_DICTIONARY, REPORT_HTML_STYLE, QUALITY_TABLES, SERIES_TABLES, RENDER_BLOCK_ROWS],
+        outputs=report_paths(),
+    )
+    graph.run(
+        "map_points",
+        write_map_points,
+        [
+            graph.fingerprint(MAP_SOURCE_PATH)["sha256"],
+            MAP_VISIBLE_COUNTRIES,
+            MAP_VIEW,
+            CONTIGUOUS_US_BOUNDS,
+            US_DENSE_SOURCE_RADIUS_DEGREES,
+            MAP_POINT_STEPS,
+            MAP_POINTS_VERSION,
+        ],
+        outputs=[MAP_POINTS_PATH],
+    )
+    with stage("publish", rows_in=len(OUTPUT_GENERATION.jobs)) as counts:
+        manifest = OUTPUT_GENERATION.publish()
+        counts["rows_out"] = len(manifest["written"])
+    graph.commit()
+    if graph.skipped:
+        print(f"Up to date: {', '.join(graph.skipped)}")
+    print(
+        f"Output generation {manifest['generation']}: {len(manifest['written'])} of "
+        f"{len(OUTPUT_GENERATION.jobs)} rendered files changed."
+    )
 
-    report_html = f"""<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8" />
-  <meta name="viewport" content="width=device-width, initial-scale=1" />
-  <title>Mini Data Analysis Report - Car Prices</title>
-  <style>
-    body {{ font-family: Arial, sans-serif; max-width: 960px; margin: 24px auto; line-height: 1.5; color: #111; }}
-    h1, h2, h3 {{ margin-bottom: 0.4rem; }}
-    table {{ border-collapse: collapse; width: 100%; margin: 12px 0 20px; font-size: 0.92rem; }}
-    th, td {{ border: 1px solid #ccc; padding: 6px 8px; text-align: left; }}
-    th {{ background: #f2f2f2; }}
-    code {{ background: #f5f5f5; padding: 2px 4px; }}
-  </style>
-</head>
-<body>
-  <h1>Mini Data Analysis & Reporting Activity</h1>
-  <h2>1. Title Page</h2>
-  <ul>
-    <li>Activity Title: Mini Data Analysis & Reporting Activity</li>
-    <li>Dataset: <code>car_prices.csv</code></li>
-    <li>Students: Justin Louis Amper Dampal and Greg Danielle Cabanda Duetes</li>
-  </ul>
-
-  <h2>2. Introduction</h2>
-  <p>The dataset contains used-car sales transactions with fields for vehicle details, seller, condition, odometer reading, market reference value (MMR), final selling price, and sale date. It represents a dealership/auction sales context where each transaction captures a specific sale event.</p>
-  <p>The data likely originates from an operational automotive sales platform (e.g., dealer auction management or vehicle marketplace transaction system).</p>
-  <p>This report converts raw operational records into analytical summaries by category, time, and pricing behavior.</p>
-
-  <h2>3. Data Dictionary</h2>
-  <p>The original dataset contains {original_column_count} columns. Each column is described below:</p>
-  {data_dictionary_html_table()}
-
-  <h2>4. OLTP Perspective</h2>
-  <p>One row represents one completed car sale transaction. It stores transactional attributes (what car was sold, by whom, when, and for how much).</p>
-  <p>This is OLTP data because records are event-level, high-volume, and designed for day-to-day operational recording rather than summarized reporting.</p>
-  <p>A typical system storing this data is a vehicle sales transaction management system integrated with dealer inventory and auction workflows.</p>
-
-  <h2>5. Data Analysis (OLAP Results)</h2>
-  <h3>5.1 Transactions per Category (Make)</h3>
-  {html_table(tx_by_make, 10)}
-  <h3>5.2 Transactions per Time Period (Year)</h3>
-  {html_table(tx_by_year, 10)}
-  <h3>5.3 Transactions per Time Period (Month)</h3>
-  {html_table(tx_by_month[['year_month', 'transactions']], 20)}
-  <h3>5.4 Transactions per Category (Body Type)</h3>
-  {html_table(tx_by_body, 10)}
-  <h3>5.5 Transactions per Category (State)</h3>
-  {html_table(tx_by_state, 10)}
-  <h3>5.6 Additional Aggregation: Average Selling Price by Make</h3>
-  {html_table(avg_price_by_make, 10)}
-  <h3>5.7 Additional Aggregation: Average Price vs MMR by Make</h3>
-  <p>(Positive values indicate selling above MMR; negative values indicate below MMR.)</p>
-  {html_table(price_vs_mmr_by_make, 10)}
-
-  <h2>6. Findings and Insights</h2>
-
-  <h3>6.1 Volume and Scale</h3>
-  <p>The dataset contains <strong>{total_transactions:,}</strong> individual sale transactions, representing a substantial operational record suitable for identifying market-wide patterns. The sheer volume confirms that the source system handles high-frequency, day-to-day transactional activity typical of an OLTP environment.</p>
-
-  <h3>6.2 Category Patterns</h3>
-  <p><strong>{top_make['make']}</strong> leads all manufacturers with <strong>{int(top_make['transactions']):,}</strong> transactions, followed by Chevrolet and Nissan. This dominance reflects Ford's historically large share of the U.S. vehicle market, its wide model lineup (sedans, trucks, SUVs), and high fleet and rental-channel volume that feeds into auction resale pipelines.</p>
-  <p>The dominant body type is <strong>{top_body['body']}</strong> at <strong>{int(top_body['transactions']):,}</strong> transactions, accounting for roughly 43% of all sales. SUVs follow at approximately 26%. This split mirrors broader U.S. consumer preferences during the 2014-2015 period, when sedans still held the largest share of the used-car market before the industry-wide shift toward crossovers and trucks.</p>
-
-  <h3>6.3 Geographic Distribution</h3>
-  <p><strong>{top_state['state']}</strong> is the most active state with <strong>{int(top_state['transactions']):,}</strong> transactions, followed by CA and PA. Florida's leading position is likely driven by its large population, favorable climate (which reduces vehicle corrosion and preserves condition), and concentration of major auction houses such as Manheim. California follows due to its status as the largest U.S. auto market by population.</p>
-
-  <h3>6.4 Time-Based Trends</h3>
-  <p>The vast majority of transactions &mdash; <strong>{int(yearly_peak['transactions']):,}</strong> &mdash; occurred in <strong>{int(yearly_peak['sale_year'])}</strong>, with only <strong>{int(df.dropna(subset=['sale_year']).groupby('sale_year').size().min()):,}</strong> in the prior year. This suggests the dataset captures a system that either ramped up operations or expanded data collection during this period.</p>
-  <p>The peak month is <strong>{monthly_peak['year_month']}</strong> with <strong>{int(monthly_peak['transactions']):,}</strong> transactions. Monthly data reveals a general upward trend from late 2014 through early 2015, which may reflect seasonal patterns in wholesale auction activity where volumes typically increase in Q1 as dealers replenish inventory after year-end.</p>
-
-  <h3>6.5 Pricing Insights</h3>
-  <p>The average selling price across all valid records is <strong>${avg_sellingprice:,.2f}</strong>. More notably, vehicles sold at an average of <strong>${avg_price_vs_mmr:,.2f}</strong> relative to MMR (Manheim Market Report), meaning most cars transacted slightly below independent market valuation. This negative gap suggests a buyer-favorable market at scale, which is typical of high-volume wholesale auctions where speed of sale is prioritized over maximizing individual unit profit.</p>
-  <p>Luxury and specialty brands (Rolls-Royce, Ferrari, Lamborghini) command dramatically higher average prices but represent a very small fraction of total volume. Some niche segments like Airstream and Aston Martin show positive price-vs-MMR gaps, indicating that scarcity and collector demand can push certain vehicles above their reference value.</p>
-
-  <h2>7. Recommendation</h2>
-  <ol>
-    <li><strong>Prioritize high-volume inventory.</strong> Ford, Chevrolet, and Nissan collectively account for a large share of all transactions. Dealers and auction operators should ensure adequate supply and competitive pricing for these makes to maintain turnover and buyer engagement.</li>
-    <li><strong>Tighten pricing for below-MMR segments.</strong> The overall negative price-vs-MMR gap indicates an opportunity to improve pricing discipline. By identifying which specific makes and models consistently sell below market value, sellers can adjust reserve prices or improve vehicle presentation to narrow the gap.</li>
-    <li><strong>Leverage seasonal peaks for operational planning.</strong> The strong monthly fluctuations &mdash; particularly the surge in early 2015 &mdash; suggest that staffing, logistics, and marketing budgets should be aligned with predictable high-volume periods rather than spread evenly across the year.</li>
-    <li><strong>Monitor niche segments for premium opportunities.</strong> Brands that consistently sell above MMR (such as specialty and luxury makes) represent margin opportunities. Tracking which segments sustain above-market pricing can guide targeted acquisition strategies for higher-margin inventory.</li>
-  </ol>
-
-  <h2>8. Data Quality Notes (Pricing Anomalies)</h2>
-  <ul>
-    {data_quality_notes_html}
-  </ul>
-
-  <h2>Appendix: Method Notes</h2>
-  <ul>
-    <li>Missing values in <code>sellingprice</code>, <code>mmr</code>, and <code>saledate</code> were handled with coercion and excluded only where required per metric.</li>
-    <li>Time-series summaries were derived from parsed <code>saledate</code> values (<code>sale_year</code>, <code>sale_month</code>).</li>
-    <li>Full summary tables are available in the <code>/outputs/tables</code> folder.</li>
-  </ul>
-</body>
-</html>
-"""
-
-    (REPORT_DIR / "Mini_Data_Analysis_Report.html").write_text(report_html)
+    metrics = {
+        "argv": sys.argv[1:] if argv is None else argv,
+        "skipped_stages": graph.skipped,
+        "generation": manifest["generation"],
+        **RUN_METRICS.summary(),
+    }
+    (OUT_DIR / "run_metrics.json").write_text(json.dumps(metrics, indent=2))
+    if args.trace:
+        RUN_METRICS.write_trace(args.trace)
+    if profiler is not None:
+        print_profile(profiler)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import csv
+import html
+import re
+from functools import partial
+from pathlib import Path
+from typing import Callable, Protocol, TextIO
+
+# Standard library only: the report-only entry point (scripts/wheelwise.py report) renders from the
+# saved tables without importing pandas, and generate_analysis renders the same template from frames.
+
+DATA_DICTIONARY = [
+    {"name": "year", "description": "Model year of the vehicle", "type": "int", "example": "2015", "notes": "Ranges from ~1990 to 2015 in this dataset"},
+    {"name": "make", "description": "Manufacturer / brand of the vehicle", "type": "string", "example": "FORD", "notes": "Uppercased during cleaning; 50+ unique makes"},
+    {"name": "model", "description": "Specific model name within the make", "type": "string", "example": "F-150", "notes": "Over 1,000 unique model values"},
+    {"name": "trim", "description": "Trim level or package variant", "type": "string", "example": "SE", "notes": "Indicates feature/equipment tier; may be missing"},
+    {"name": "body", "description": "Body style classification of the vehicle", "type": "string", "example": "SEDAN", "notes": "Uppercased; common values: SEDAN, SUV, CREW CAB"},
+    {"name": "transmission", "description": "Transmission type", "type": "string", "example": "automatic", "notes": "Typically 'automatic' or 'manual'"},
+    {"name": "vin", "description": "Vehicle Identification Number (unique 17-char ID)", "type": "string", "example": "1FAHP3F2...", "notes": "Unique per vehicle; serves as a natural key"},
+    {"name": "state", "description": "U.S. state where the sale occurred", "type": "string", "example": "FL", "notes": "Uppercased two-letter abbreviation"},
+    {"name": "condition", "description": "Numeric condition rating of the vehicle", "type": "float", "example": "3.3", "notes": "Scale approximately 1.0 (poor) to 5.0 (excellent)"},
+    {"name": "odometer", "description": "Mileage reading at time of sale", "type": "float", "example": "36368.0", "notes": "Measured in miles; higher values indicate more use"},
+    {"name": "color", "description": "Exterior color of the vehicle", "type": "string", "example": "black", "notes": "Free-text; some missing values"},
+    {"name": "interior", "description": "Interior color of the vehicle", "type": "string", "example": "gray", "notes": "Free-text; some missing values"},
+    {"name": "seller", "description": "Name of the selling entity", "type": "string", "example": "hertz auto sales", "notes": "Dealer or auction house name"},
+    {"name": "mmr", "description": "Manheim Market Report value (independent market estimate)", "type": "float", "example": "14525.0", "notes": "Benchmark price used to evaluate deal quality"},
+    {"name": "sellingprice", "description": "Actual transaction price the vehicle sold for", "type": "float", "example": "13500.0", "notes": "Primary metric for pricing analysis"},
+    {"name": "saledate", "description": "Full timestamp of the sale event", "type": "string", "example": "Tue Dec 16 2014 12:30:00 GMT-0800", "notes": "Parsed into sale_year, sale_month during cleaning"},
+]
+
+REPORT_HTML_STYLE = """  <style>
+    body { font-family: Arial, sans-serif; max-width: 960px; margin: 24px auto; line-height: 1.5; color: #111; }
+    h1, h2, h3 { margin-bottom: 0.4rem; }
+    table { border-collapse: collapse; width: 100%; margin: 12px 0 20px; font-size: 0.92rem; }
+    th, td { border: 1px solid #ccc; padding: 6px 8px; text-align: left; }
+    th { background: #f2f2f2; }
+    code { background: #f5f5f5; padding: 2px 4px; }
+  </style>"""
+
+# Row-level quality listings and the dense daily/weekly series stay out of the report appendix
+QUALITY_TABLES = ["duplicate_vins", "relabeled_labels", "segment_price_stats", "flagged_anomalies"]
+SERIES_TABLES = ["daily_transactions", "weekly_transactions"]
+
+REPORT_NAME = "Mini_Data_Analysis_Report"
+APPENDIX_NAME = "Mini_Data_Analysis_Appendix"
+
+
+class ReportTables(Protocol):
+    """The OLAP tables a report quotes, however they are held (data frames or the saved CSVs)."""
+
+    def values(self, name: str, column: str) -> list: ...
+
+    def write_markdown(self, handle: TextIO, name: str, columns: list[str] | None, n: int | None) -> None: ...
+
+    def write_html(self, handle: TextIO, name: str, columns: list[str] | None, n: int | None) -> None: ...
+
+
+def format_cell(text: str, is_float: bool) -> str:
+    # Same cells as generate_analysis.format_cells: floats to 2 decimals, missing values blank
+    if not text:
+        return ""
+    return "%.2f" % float(text) if is_float else text
+
+
+class CsvTables:
+    """Saved tables read back from outputs/tables/<name>.csv and formatted like the data frames they came from.
+
+    ``dtypes`` maps each table to its columns' pandas dtypes, as saved in analysis_summary.json.
+    """
+
+    def __init__(self, directory: Path, dtypes: dict[str, dict[str, str]]) -> None:
+        self.directory = directory
+        self.dtypes = dtypes
+        self.loaded: dict[str, tuple[list[str], list[list[str]]]] = {}
+
+    def table(self, name: str) -> tuple[list[str], list[list[str]]]:
+        if name not in self.loaded:
+            with (self.directory / f"{name}.csv").open(newline="", encoding="utf-8") as handle:
+                reader = csv.reader(handle)
+                columns = next(reader)
+                self.loaded[name] = (columns, list(reader))
+        return self.loaded[name]
+
+    def values(self, name: str, column: str) -> list[str]:
+        columns, rows = self.table(name)
+        at = columns.index(column)
+        return [row[at] for row in rows]
+
+    def cells(self, name: str, columns: list[str] | None, n: int | None) -> tuple[list[str], list[list[str]]]:
+        header, rows = self.table(name)
+        columns = header if columns is None else columns
+        positions = [header.index(column) for column in columns]
+        floats = [self.dtypes[name][column].startswith("float") for column in columns]
+        rows = rows if n is None else rows[:n]
+        return columns, [[format_cell(row[at], is_float) for at, is_float in zip(positions, floats)] for row in rows]
+
+    def write_markdown(self, handle: TextIO, name: str, columns: list[str] | None = None, n: int | None = 10) -> None:
+        columns, rows = self.cells(name, columns, n)
+        handle.write("| " + " | ".join(columns) + " |\n")
+        handle.write("| " + " | ".join(["---"] * len(columns)) + " |")
+        for row in rows:
+            handle.write("\n| " + " | ".join(row) + " |")
+
+    def write_html(self, handle: TextIO, name: str, columns: list[str] | None = None, n: int | None = 10) -> None:
+        columns, rows = self.cells(name, columns, n)
+        head = "".join(f"<th>{html.escape(column)}</th>" for column in columns)
+        handle.write("<table><thead><tr>" + head + "</tr></thead><tbody>")
+        for row in rows:
+            handle.write("<tr><td>" + "</td><td>".join(html.escape(cell) for cell in row) + "</td></tr>")
+        handle.write("</tbody></table>")
+
+
+def report_sections(summary: dict, data_quality_notes: list[str], tables: ReportTables) -> list[tuple]:
+    # One template for both formats. Blocks are (kind, ...) tuples; text uses **bold**, `code`
+    # and em dashes, which the HTML renderer turns into tags and entities.
+    kpis = summary["kpis"]
+    total_transactions = summary["dataset"]["rows"]
+    prior_year_transactions = min(int(float(value)) for value in tables.values("transactions_by_year", "transactions"))
+    return [
+        ("heading", 1, "Mini Data Analysis & Reporting Activity"),
+        ("heading", 2, "1. Title Page"),
+        (
+            "bullets",
+            [
+                "Activity Title: Mini Data Analysis & Reporting Activity",
+                "Dataset: `car_prices.csv`",
+                "Students: Justin Louis Amper Dampal and Greg Danielle Cabanda Duetes",
+            ],
+        ),
+        ("heading", 2, "2. Introduction"),
+        ("paragraph", "The dataset contains used-car sales transactions with fields for vehicle details, seller, condition, odometer reading, market reference value (MMR), final selling price, and sale date. It represents a dealership/auction sales context where each transaction captures a specific sale event."),
+        ("paragraph", "The data likely originates from an operational automotive sales platform (e.g., dealer auction management or vehicle marketplace transaction system)."),
+        ("paragraph", "This report converts raw operational records into analytical summaries by category, time, and pricing behavior."),
+        ("heading", 2, "3. Data Dictionary"),
+        ("paragraph", f"The original dataset contains {summary['dataset']['columns']} columns. Each column is described below:"),
+        ("dictionary",),
+        ("heading", 2, "4. OLTP Perspective"),
+        ("paragraph", "One row represents one completed car sale transaction. It stores transactional attributes (what car was sold, by whom, when, and for how much)."),
+        ("paragraph", "This is OLTP data because records are event-level, high-volume, and designed for day-to-day operational recording rather than summarized reporting."),
+        ("paragraph", "A typical system storing this data is a vehicle sales transaction management system integrated with dealer inventory and auction workflows."),
+        ("heading", 2, "5. Data Analysis (OLAP Results)"),
+        ("heading", 3, "5.1 Transactions per Category (Make)"),
+        ("table", "transactions_by_make", None, 10),
+        ("heading", 3, "5.2 Transactions per Time Period (Year)"),
+        ("table", "transactions_by_year", None, 10),
+        ("heading", 3, "5.3 Transactions per Time Period (Month)"),
+        ("table", "transactions_by_month", ["year_month", "transactions"], 20),
+        ("heading", 3, "5.4 Transactions per Category (Body Type)"),
+        ("table", "transactions_by_body", None, 10),
+        ("heading", 3, "5.5 Transactions per Category (State)"),
+        ("table", "transactions_by_state", None, 10),
+        ("heading", 3, "5.6 Additional Aggregation: Average Selling Price by Make"),
+        ("table", "average_sellingprice_by_make", None, 10),
+        ("heading", 3, "5.7 Additional Aggregation: Average Price vs MMR by Make"),
+        ("paragraph", "(Positive values indicate selling above MMR; negative values indicate below MMR.)"),
+        ("table", "average_price_vs_mmr_by_make", None, 10),
+        ("heading", 2, "6. Findings and Insights"),
+        ("heading", 3, "6.1 Volume and Scale"),
+        ("paragraph", f"The dataset contains **{total_transactions:,}** individual sale transactions, representing a substantial operational record suitable for identifying market-wide patterns. The sheer volume confirms that the source system handles high-frequency, day-to-day transactional activity typical of an OLTP environment."),
+        ("heading", 3, "6.2 Category Patterns"),
+        ("paragraph", f"**{kpis['top_make']}** leads all manufacturers with **{kpis['top_make_transactions']:,}** transactions, followed by Chevrolet and Nissan. This dominance reflects Ford's historically large share of the U.S. vehicle market, its wide model lineup (sedans, trucks, SUVs), and high fleet and rental-channel volume that feeds into auction resale pipelines."),
+        ("paragraph", f"The dominant body type is **{kpis['top_body']}** at **{kpis['top_body_transactions']:,}** transactions, accounting for roughly 43% of all sales. SUVs follow at approximately 26%. This split mirrors broader U.S. consumer preferences during the 2014-2015 period, when sedans still held the largest share of the used-car market before the industry-wide shift toward crossovers and trucks."),
+        ("heading", 3, "6.3 Geographic Distribution"),
+        ("paragraph", f"**{kpis['top_state']}** is the most active state with **{kpis['top_state_transactions']:,}** transactions, followed by CA and PA. Florida's leading position is likely driven by its large population, favorable climate (which reduces vehicle corrosion and preserves condition), and concentration of major auction houses such as Manheim. California follows due to its status as the largest U.S. auto market by population."),
+        ("heading", 3, "6.4 Time-Based Trends"),
+        ("paragraph", f"The vast majority of transactions — **{kpis['peak_year_transactions']:,}** — occurred in **{kpis['peak_year']}**, with only **{prior_year_transactions:,}** in the prior year. This suggests the dataset captures a system that either ramped up operations or expanded data collection during this period."),
+        ("paragraph", f"The peak month is **{kpis['peak_month']}** with **{kpis['peak_month_transactions']:,}** transactions. Monthly data reveals a general upward trend from late 2014 through early 2015, which may reflect seasonal patterns in wholesale auction activity where volumes typically increase in Q1 as dealers replenish inventory after year-end."),
+        ("heading", 3, "6.5 Pricing Insights"),
+        ("paragraph", f"The average selling price across all valid records is **${kpis['average_sellingprice']:,.2f}**. More notably, vehicles sold at an average of **${kpis['average_price_vs_mmr']:,.2f}** relative to MMR (Manheim Market Report), meaning most cars transacted slightly below independent market valuation. This negative gap suggests a buyer-favorable market at scale, which is typical of high-volume wholesale auctions where speed of sale is prioritized over maximizing individual unit profit."),
+        ("paragraph", "Luxury and specialty brands (Rolls-Royce, Ferrari, Lamborghini) command dramatically higher average prices but represent a very small fraction of total volume. Some niche segments like Airstream and Aston Martin show positive price-vs-MMR gaps, indicating that scarcity and collector demand can push certain vehicles above their reference value."),
+        ("heading", 2, "7. Recommendation"),
+        (
+            "numbered",
+            [
+                "**Prioritize high-volume inventory.** Ford, Chevrolet, and Nissan collectively account for a large share of all transactions. Dealers and auction operators should ensure adequate supply and competitive pricing for these makes to maintain turnover and buyer engagement.",
+                "**Tighten pricing for below-MMR segments.** The overall negative price-vs-MMR gap indicates an opportunity to improve pricing discipline. By identifying which specific makes and models consistently sell below market value, sellers can adjust reserve prices or improve vehicle presentation to narrow the gap.",
+                "**Leverage seasonal peaks for operational planning.** The strong monthly fluctuations — particularly the surge in early 2015 — suggest that staffing, logistics, and marketing budgets should be aligned with predictable high-volume periods rather than spread evenly across the year.",
+                "**Monitor niche segments for premium opportunities.** Brands that consistently sell above MMR (such as specialty and luxury makes) represent margin opportunities. Tracking which segments sustain above-market pricing can guide targeted acquisition strategies for higher-margin inventory.",
+            ],
+        ),
+        ("heading", 2, "8. Data Quality Notes (Pricing Anomalies)"),
+        ("bullets", data_quality_notes),
+        ("heading", 2, "Appendix: Method Notes"),
+        (
+            "bullets",
+            [
+                "Missing values in `sellingprice`, `mmr`, and `saledate` were handled with coercion and excluded only where required per metric.",
+                "Time-series summaries were derived from parsed `saledate` values (`sale_year`, `sale_month`); daily and ISO-week series with rolling means and year-over-year deltas are in `daily_transactions.csv` and `weekly_transactions.csv`.",
+                "Full summary tables are available in the `/outputs/tables` folder.",
+            ],
+        ),
+    ]
+
+
+def data_dictionary_md_table() -> str:
+    header = "| Column | Description | Type | Example | Notes |"
+    sep = "| --- | --- | --- | --- | --- |"
+    rows = []
+    for col in DATA_DICTIONARY:
+        rows.append(
+            f"| `{col['name']}` | {col['description']} | {col['type']} | `{col['example']}` | {col['notes']} |"
+        )
+    return "\n".join([header, sep] + rows)
+
+
+def data_dictionary_html_table() -> str:
+    head = "<th>Column</th><th>Description</th><th>Type</th><th>Example</th><th>Notes</th>"
+    rows = []
+    for col in DATA_DICTIONARY:
+        cells = [col[key] for key in ("name", "description", "type", "example", "notes")]
+        name, description, kind, example, notes = (html.escape(cell, quote=False) for cell in cells)
+        rows.append(
+            f"<tr><td><code>{name}</code></td><td>{description}</td>"
+            f"<td>{kind}</td><td><code>{example}</code></td><td>{notes}</td></tr>"
+        )
+    return "<table><thead><tr>" + head + "</tr></thead><tbody>" + "".join(rows) + "</tbody></table>"
+
+
+def inline_html(text: str) -> str:
+    text = html.escape(text, quote=False).replace("—", "&mdash;")
+    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    return re.sub(r"`([^`]+)`", r"<code>\1</code>", text)
+
+
+def write_markdown_report(handle: TextIO, sections: list[tuple], tables: ReportTables) -> None:
+    # A section heading is followed directly by its first block; every other block ends with a blank line
+    for at, (kind, *body) in enumerate(sections):
+        if at:
+            previous = sections[at - 1]
+            handle.write("\n" if previous[0] == "heading" and previous[1] > 1 else "\n\n")
+        if kind == "heading":
+            level, text = body
+            handle.write("#" * level + " " + text)
+        elif kind == "paragraph":
+            handle.write(body[0])
+        elif kind == "bullets":
+            handle.write("\n".join(f"- {item}" for item in body[0]))
+        elif kind == "numbered":
+            handle.write("\n".join(f"{number}. {item}" for number, item in enumerate(body[0], start=1)))
+        elif kind == "table":
+            tables.write_markdown(handle, *body)
+        elif kind == "dictionary":
+            handle.write(data_dictionary_md_table())
+    handle.write("\n")
+
+
+def write_html_report(handle: TextIO, sections: list[tuple], tables: ReportTables) -> None:
+    handle.write(
+        '<!doctype html>\n<html lang="en">\n<head>\n  <meta charset="utf-8" />\n'
+        '  <meta name="viewport" content="width=device-width, initial-scale=1" />\n'
+        f"  <title>Mini Data Analysis Report - Car Prices</title>\n{REPORT_HTML_STYLE}\n</head>\n<body>\n"
+    )
+    for at, (kind, *body) in enumerate(sections):
+        if kind == "heading":
+            level, text = body
+            # Blank line between top-level sections
+            if level == 2 and sections[at - 1][0] != "heading":
+                handle.write("\n")
+            handle.write(f"  <h{level}>{inline_html(text)}</h{level}>\n")
+        elif kind == "paragraph":
+            handle.write(f"  <p>{inline_html(body[0])}</p>\n")
+        elif kind in ("bullets", "numbered"):
+            tag = "ul" if kind == "bullets" else "ol"
+            items = "".join(f"    <li>{inline_html(item)}</li>\n" for item in body[0])
+            handle.write(f"  <{tag}>\n{items}  </{tag}>\n")
+        elif kind == "table":
+            handle.write("  ")
+            tables.write_html(handle, *body)
+            handle.write("\n")
+        elif kind == "dictionary":
+            handle.write(f"  {data_dictionary_html_table()}\n")
+    handle.write("</body>\n</html>\n")
+
+
+def write_markdown_appendix(handle: TextIO, names: list[str], tables: ReportTables) -> None:
+    # Full OLAP tables, streamed straight to disk so large make x year/month tables stay cheap
+    handle.write("# Appendix: Full OLAP Tables\n")
+    for name in names:
+        handle.write(f"\n## {name}\n")
+        tables.write_markdown(handle, name, None, None)
+        handle.write("\n")
+
+
+def write_html_appendix(handle: TextIO, names: list[str], tables: ReportTables) -> None:
+    handle.write(
+        '<!doctype html>\n<html lang="en">\n<head>\n  <meta charset="utf-8" />\n'
+        "  <title>Mini Data Analysis Report - Full OLAP Tables</title>\n"
+        f"{REPORT_HTML_STYLE}\n</head>\n<body>\n  <h1>Appendix: Full OLAP Tables</h1>\n"
+    )
+    for name in names:
+        handle.write(f"  <h2>{html.escape(name)}</h2>\n  ")
+        tables.write_html(handle, name, None, None)
+        handle.write("\n")
+    handle.write("</body>\n</html>\n")
+
+
+def appendix_tables(names: list[str]) -> list[str]:
+    excluded = QUALITY_TABLES + SERIES_TABLES
+    return [name for name in names if name not in excluded]
+
+
+def report_renders(
+    summary: dict, data_quality_notes: list[str], tables: ReportTables, names: list[str]
+) -> dict[str, Callable[[TextIO], None]]:
+    """Map each report file name to a function writing it; ``names`` lists every table, in output order."""
+    sections = report_sections(summary, data_quality_notes, tables)
+    appendix = appendix_tables(names)
+    return {
+        f"{REPORT_NAME}.md": partial(write_markdown_report, sections=sections, tables=tables),
+        f"{REPORT_NAME}.html": partial(write_html_report, sections=sections, tables=tables),
+        f"{APPENDIX_NAME}.md": partial(write_markdown_appendix, names=appendix, tables=tables),
+        f"{APPENDIX_NAME}.html": partial(write_html_appendix, names=appendix, tables=tables),
+    }
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+# Same locations as in generate_analysis; importing it would pull pandas and numpy into the server
+BASE = Path(__file__).resolve().parent.parent
+OUT_DIR = BASE / "outputs"
+TABLES_DIR = OUT_DIR / "tables"
+WEBSITE_DIR = BASE / "website"
+SUMMARY_PATH = OUT_DIR / "analysis_summary.json"
+API_PREFIX = "/api/"
+ALL = "All"
+TOP_MAKES_LIMIT = 15
+RANKING_METRICS = ["transactions", "avg_sellingprice", "avg_price_vs_mmr"]
+# Responses smaller than this are sent uncompressed; gzip framing would outweigh the savings
+GZIP_MIN_BYTES = 512
+# Encoded responses kept per aggregate generation; query strings are client-controlled, so cap it
+RESPONSE_CACHE_LIMIT = 4096
+SOURCE_TABLES = [
+    "transactions_by_month",
+    "transactions_by_make_month",
+    "average_sellingprice_by_make",
+    "average_sellingprice_by_make_year",
+    "average_sellingprice_by_year",
+    "average_price_vs_mmr_by_make",
+    "average_price_vs_mmr_by_make_year",
+    "average_price_vs_mmr_by_year",
+]
+
+
+def read_table(name: str) -> list[dict[str, str]]:
+    with (TABLES_DIR / f"{name}.csv").open(newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def as_year(value: str) -> int:
+    return int(float(value))
+
+
+def ranked(values: dict[str, float], limit: int | None) -> list[tuple[str, float]]:
+    # Stable sort over make-ordered input keeps ties in alphabetical order, like the dashboard
+    return sorted(values.items(), key=lambda item: -item[1])[:limit]
+
+
+class AggregateIndex:
+    """Dashboard aggregates keyed by (make, sale_year) scope, with ``ALL`` for either side.
+
+    Every scope's KPIs, month series and make rankings are rolled up once from the
+    (make, sale_year, sale_month) cells, so a request is a dictionary lookup.
+    """
+
+    def __init__(self, summary: dict, tables: dict[str, list[dict[str, str]]]) -> None:
+        cells = {
+            (row["make"], as_year(row["sale_year"]), row["year_month"]): int(row["transactions"])
+            for row in tables["transactions_by_make_month"]
+        }
+        self.makes = sorted({make for make, _, _ in cells})
+        self.years = sorted({year for _, year, _ in cells})
+
+        self.transactions: dict[tuple, int] = defaultdict(int)
+        months: dict[tuple, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for (make, year, year_month), count in cells.items():
+            for scope in ((make, year), (make, ALL), (ALL, year)):
+                self.transactions[scope] += count
+                months[scope][year_month] += count
+        self.transactions[(ALL, ALL)] = int(summary["dataset"]["rows"])
+        months[(ALL, ALL)] = {row["year_month"]: int(row["transactions"]) for row in tables["transactions_by_month"]}
+        self.monthly = {
+            scope: [{"year_month": key, "transactions": value} for key, value in sorted(series.items())]
+            for scope, series in months.items()
+        }
+
+        self.averages: dict[str, dict[tuple, float]] = {}
+        for metric, table, kpi in [
+            ("avg_sellingprice", "average_sellingprice", "average_sellingprice"),
+            ("avg_price_vs_mmr", "average_price_vs_mmr", "average_price_vs_mmr"),
+        ]:
+            values = {(ALL, ALL): float(summary["kpis"][kpi])}
+            values.update({(row["make"], ALL): float(row[metric]) for row in tables[f"{table}_by_make"]})
+            values.update({(ALL, as_year(row["sale_year"])): float(row[metric]) for row in tables[f"{table}_by_year"]})
+            values.update(
+                {(row["make"], as_year(row["sale_year"])): float(row[metric]) for row in tables[f"{table}_by_make_year"]}
+            )
+            self.averages[metric] = values
+
+    @classmethod
+    def load(cls) -> AggregateIndex:
+        summary = json.loads(SUMMARY_PATH.read_text())
+        return cls(summary, {name: read_table(name) for name in SOURCE_TABLES})
+
+    def scope(self, params: dict[str, str]) -> tuple[str, int | str]:
+        make = params.get("make", ALL)
+        year = params.get("year", ALL)
+        if year != ALL:
+            try:
+                year = int(year)
+            except ValueError:
+                raise ValueError(f"year must be {ALL!r} or an integer, got {year!r}") from None
+        return make, year
+
+    def kpis(self, params: dict[str, str]) -> dict:
+        make, year = self.scope(params)
+        return {
+            "make": make,
+            "year": year,
+            "transactions": self.transactions.get((make, year), 0),
+            **{
+                metric: values.get((make, year), values[(ALL, ALL)])
+                for metric, values in self.averages.items()
+            },
+        }
+
+    def monthly_series(self, params: dict[str, str]) -> dict:
+        make, year = self.scope(params)
+        return {"make": make, "year": year, "rows": self.monthly.get((make, year), [])}
+
+    def top_makes(self, params: dict[str, str]) -> dict:
+        make, year = self.scope(params)
+        metric = params.get("metric", "transactions")
+        if metric not in RANKING_METRICS:
+            raise ValueError(f"metric must be one of {', '.join(RANKING_METRICS)}, got {metric!r}")
+        try:
+            limit = int(params.get("n", TOP_MAKES_LIMIT))
+        except ValueError:
+            raise ValueError(f"n must be an integer, got {params['n']!r}") from None
+        if limit <= 0:
+            raise ValueError(f"n must be a positive integer, got {limit}")
+
+        source = self.transactions if metric == "transactions" else self.averages[metric]
+        if make != ALL:
+            rows = [(make, source[(make, year)])] if (make, year) in source else []
+        else:
+            rows = ranked({name: source[(name, year)] for name in self.makes if (name, year) in source}, limit)
+        return {"metric": metric, "year": year, "rows": [{"make": name, metric: value} for name, value in rows]}
+
+
+API_ROUTES = {
+    "kpis": AggregateIndex.kpis,
+    "monthly": AggregateIndex.monthly_series,
+    "top-makes": AggregateIndex.top_makes,
+}
+
+
+class AggregateStore:
+    """Holds the current AggregateIndex and encoded responses, reloading when the outputs change."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.fingerprint: tuple | None = None
+        self.index: AggregateIndex | None = None
+        self.responses: dict[tuple, tuple[str, bytes, bytes | None]] = {}
+
+    def source_fingerprint(self) -> tuple:
+        paths = [SUMMARY_PATH] + [TABLES_DIR / f"{name}.csv" for name in SOURCE_TABLES]
+        return tuple((stat.st_mtime_ns, stat.st_size) for stat in (path.stat() for path in paths))
+
+    def current(self) -> tuple[AggregateIndex, dict[tuple, tuple[str, bytes, bytes | None]]]:
+        # The index and its response cache are read together, so a reload never mixes generations
+        fingerprint = self.source_fingerprint()
+        with self.lock:
+            if fingerprint != self.fingerprint:
+                self.index = AggregateIndex.load()
+                self.responses = {}
+                self.fingerprint = fingerprint
+            return self.index, self.responses
+
+    def response(self, route: str, params: dict[str, str]) -> tuple[str, bytes, bytes | None]:
+        index, responses = self.current()
+        key = (route, tuple(sorted(params.items())))
+        cached = responses.get(key)
+        if cached is None:
+            body = json.dumps(API_ROUTES[route](index, params), separators=(",", ":")).encode("utf-8")
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            compressed = gzip.compress(body, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+            cached = (etag, body, compressed)
+            with self.lock:
+                # Dropped if the outputs were reloaded while this response was encoded
+                if responses is self.responses:
+                    if len(responses) >= RESPONSE_CACHE_LIMIT:
+                        self.responses = responses = {}
+                    responses[key] = cached
+        return cached
+
+
+class AggregateRequestHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, store: AggregateStore, **kwargs) -> None:
+        self.store = store
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path.startswith(API_PREFIX):
+            self.send_api_response(url.path[len(API_PREFIX):], parse_qs(url.query))
+        else:
+            super().do_GET()
+
+    def send_api_response(self, route: str, query: dict[str, list[str]]) -> None:
+        if route not in API_ROUTES:
+            self.send_json_error(HTTPStatus.NOT_FOUND, f"Unknown endpoint {route!r}; expected one of {', '.join(API_ROUTES)}")
+            return
+        try:
+            etag, body, compressed = self.store.response(route, {key: values[-1] for key, values in query.items()})
+        except ValueError as error:
+            self.send_json_error(HTTPStatus.BAD_REQUEST, str(error))
+            return
+
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+
+        accepts_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        payload = compressed if compressed is not None and accepts_gzip else body
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", etag)
+        # Clients may cache but must revalidate, so a rebuilt aggregate shows up on the next request
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if payload is compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_json_error(self, status: HTTPStatus, message: str) -> None:
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the website plus scoped dashboard aggregates under /api/.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    store = AggregateStore()
+    store.current()
+    handler = partial(AggregateRequestHandler, store=store, directory=str(WEBSITE_DIR))
+    with ThreadingHTTPServer((args.host, args.port), handler) as server:
+        print(f"Serving {WEBSITE_DIR} and {API_PREFIX} on http://{args.host}:{args.port}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Same file as generate_analysis.STORE_PATH; importing that module would pull in pandas for nothing
+STORE_PATH = Path(__file__).resolve().parent.parent / "outputs" / "car_prices.sqlite"
+
+
+def connect(path: Path = STORE_PATH) -> sqlite3.Connection:
+    if not path.exists():
+        raise SystemExit(f"No store at {path}; run scripts/generate_analysis.py --store first.")
+    # Read-only, so an ad-hoc query can never modify the store
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def describe(conn: sqlite3.Connection) -> tuple[list[str], list[tuple]]:
+    objects = conn.execute(
+        "SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' ORDER BY type, name"
+    ).fetchall()
+    rows = [(name, kind, conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]) for name, kind in objects]
+    return ["name", "type", "rows"], rows
+
+
+def print_table(columns: list[str], rows: list[tuple]) -> None:
+    cells = [columns] + [["" if value is None else str(value) for value in row] for row in rows]
+    widths = [max(len(row[at]) for row in cells) for at in range(len(columns))]
+    for row in cells:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run SQL against the SQLite store written by generate_analysis.py --store.")
+    parser.add_argument("sql", nargs="?", help="Query to run; without one, list the store's tables and views.")
+    parser.add_argument("--params", nargs="*", default=[], help="Values bound to ? placeholders in the query.")
+    parser.add_argument("--csv", action="store_true", help="Print CSV instead of an aligned table.")
+    args = parser.parse_args()
+
+    conn = connect()
+    started = time.perf_counter()
+    if args.sql is None:
+        columns, rows = describe(conn)
+    else:
+        cursor = conn.execute(args.sql, args.params)
+        columns = [column[0] for column in cursor.description or []]
+        rows = cursor.fetchall()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns)
+        writer.writerows(rows)
+    else:
+        print_table(columns, rows)
+    print(f"{len(rows):,} row(s) in {elapsed_ms:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
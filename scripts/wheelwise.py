@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, TextIO
+
+import report_template
+
+# Same locations as in generate_analysis; importing it would pull in pandas and numpy
+BASE = Path(__file__).resolve().parent.parent
+OUT_DIR = BASE / "outputs"
+TABLES_DIR = OUT_DIR / "tables"
+SUMMARY_PATH = OUT_DIR / "analysis_summary.json"
+REPORT_DIR = BASE / "report"
+
+
+def load_saved() -> dict:
+    if not SUMMARY_PATH.exists():
+        raise SystemExit(f"No saved aggregates at {SUMMARY_PATH}; run `scripts/wheelwise.py build` first.")
+    saved = json.loads(SUMMARY_PATH.read_text())
+    if "tables" not in saved:
+        raise SystemExit(f"{SUMMARY_PATH} was written by an older build; run `scripts/wheelwise.py build` once.")
+    return saved
+
+
+def write_rendered(path: Path, render: Callable[[TextIO], None]) -> bool:
+    # Like the pipeline's output generations: temporary sibling, then a rename, skipped if unchanged
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        render(handle)
+    if path.exists() and path.read_bytes() == tmp_path.read_bytes():
+        tmp_path.unlink()
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def build(args: argparse.Namespace) -> None:
+    import generate_analysis
+
+    generate_analysis.main(args.options)
+
+
+def report(args: argparse.Namespace) -> None:
+    saved = load_saved()
+    tables = report_template.CsvTables(TABLES_DIR, saved["tables"])
+    renders = report_template.report_renders(saved, saved["data_quality_notes"], tables, list(saved["tables"]))
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    written = [name for name, render in renders.items() if write_rendered(REPORT_DIR / name, render)]
+    print(f"Reports: {len(written)} of {len(renders)} files changed.")
+
+
+def dashboard(args: argparse.Namespace) -> None:
+    # The shards are encoded with pandas/numpy, so only this subcommand pays for importing them
+    import pandas as pd
+
+    import generate_analysis
+
+    saved = load_saved()
+    summary = {key: value for key, value in saved.items() if key not in ("data_quality_notes", "tables")}
+    # Saved dtypes and exact float parsing give back the frames the build encoded. Only empty cells
+    # are missing values; labels such as "NA" stay labels.
+    tables = {
+        name: pd.read_csv(
+            TABLES_DIR / f"{name}.csv", dtype=dtypes, keep_default_na=False, na_values=[""], float_precision="round_trip"
+        )
+        for name, dtypes in saved["tables"].items()
+    }
+    with generate_analysis.PREVIEW_PATH.open(newline="") as handle:
+        preview = handle.readlines()
+    generate_analysis.write_dashboard(tables, summary, saved["data_quality_notes"], preview)
+    print(f"Dashboard shards written to {generate_analysis.DASHBOARD_DIR}.")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the WheelWise outputs, or re-render reports/dashboard from saved ones.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    # add_help=False hands --help to generate_analysis as well
+    commands.add_parser(
+        "build",
+        help="Run the full pipeline (scripts/generate_analysis.py); every option is passed through.",
+        add_help=False,
+    ).set_defaults(run=build)
+    commands.add_parser(
+        "report",
+        help="Re-render report/ from outputs/tables and analysis_summary.json (standard library only).",
+    ).set_defaults(run=report)
+    commands.add_parser(
+        "dashboard",
+        help="Re-encode the dashboard shards from outputs/tables, analysis_summary.json and the preview CSV.",
+    ).set_defaults(run=dashboard)
+    args, options = parser.parse_known_args(argv)
+    if options and args.command != "build":
+        parser.error(f"unrecognized arguments: {' '.join(options)}")
+    args.options = options
+    return args
+
+
+def main() -> None:
+    started = time.perf_counter()
+    args = parse_args()
+    args.run(args)
+    if args.command != "build":
+        print(f"Done in {time.perf_counter() - started:.2f}s.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,14 @@ const MAP_COUNTRY_COLORS = {
   AE: "#f59e0b",
 };
 
+const DASHBOARD_SHARD_URL = "./data/dashboard";
+// Served by scripts/serve_aggregates.py; static hosts fall back to filtering the shards in the browser.
+const AGGREGATE_API_URL = "./api";
+
+// Pre-projected dots written by write_map_points() in scripts/generate_analysis.py, which keeps only
+// MAP_VISIBLE_COUNTRIES and densifies the U.S. grid; its MAP_VIEW must match US_MAP_VIEW below.
+const MAP_POINTS_URL = "./data/map_points.bin";
+const MAP_POINTS_MAGIC = "WWMP";
 const MAP_VISIBLE_COUNTRIES = new Set(["US"]);
 const US_MAP_VIEW = {
   centerLon: -96,
@@ -178,9 +186,6 @@ const FALLBACK_STATE_COLORS = [
   "#84cc16",
   "#8b5cf6",
 ];
-const US_DENSE_SOURCE_RADIUS_DEGREES = 2.15;
-const US_DENSE_SOURCE_RADIUS_SQ =
-  US_DENSE_SOURCE_RADIUS_DEGREES * US_DENSE_SOURCE_RADIUS_DEGREES;
 const TOP_STATE_COLOR_RADIUS_DEGREES = 3.2;
 const TOP_STATE_COLOR_RADIUS_SQ =
   TOP_STATE_COLOR_RADIUS_DEGREES * TOP_STATE_COLOR_RADIUS_DEGREES;
@@ -395,6 +400,58 @@ function parsePreviewCsv(csvText, rowLimit = 240) {
   return { columns, rows };
 }
 
+function decodeColumnarTable(table, dictionaries) {
+  const names = Object.keys(table.columns || {});
+  const rows = new Array(table.length);
+  for (let index = 0; index < table.length; index += 1) {
+    const row = {};
+    names.forEach((name) => {
+      const value = table.columns[name][index];
+      const dictionary = dictionaries[name];
+      row[name] = dictionary && value !== null ? dictionary[value] : value;
+    });
+    rows[index] = row;
+  }
+  return rows;
+}
+
+const dashboardShardRequests = new Map();
+
+function loadDashboardShard(name) {
+  if (!dashboardShardRequests.has(name)) {
+    const request = fetch(`${DASHBOARD_SHARD_URL}/${name}.json`).then(async (response) => {
+      if (!response.ok) {
+        throw new Error(`Failed to load dashboard shard "${name}".`);
+      }
+      const shard = await response.json();
+      const decoded = { ...shard.data };
+      Object.entries(shard.tables || {}).forEach(([key, table]) => {
+        decoded[key] = decodeColumnarTable(table, shard.dictionaries || {});
+      });
+      return decoded;
+    });
+    dashboardShardRequests.set(name, request);
+  }
+  return dashboardShardRequests.get(name);
+}
+
+async function fetchAggregate(endpoint, params = {}) {
+  const response = await fetch(`${AGGREGATE_API_URL}/${endpoint}?${new URLSearchParams(params)}`);
+  if (!response.ok) {
+    throw new Error(`Aggregate API request "${endpoint}" failed with ${response.status}.`);
+  }
+  return response.json();
+}
+
+async function isAggregateApiAvailable() {
+  try {
+    await fetchAggregate("kpis", { make: "All", year: "All" });
+    return true;
+  } catch (error) {
+    return false;
+  }
+}
+
 function formatNumber(value) {
   return numberFormatter.format(Math.round(Number(value) || 0));
 }
@@ -645,7 +702,7 @@ function renderDatasetPreview(sampleHead) {
     `;
 
     if (note) {
-      note.textContent = `First ${safeRowCount} rows with all original column headers.`;
+      note.textContent = `${safeRowCount} sampled rows with all original column headers.`;
     }
   };
 
@@ -950,66 +1007,6 @@ function isContiguousUsCoordinate(lon, lat) {
   );
 }
 
-function buildDenseAxis(values) {
-  const sorted = [...new Set((values || []).map((value) => Number(value.toFixed(5))))]
-    .filter((value) => Number.isFinite(value))
-    .sort((a, b) => a - b);
-
-  const dense = [];
-
-  sorted.forEach((current, index) => {
-    dense.push(current);
-    if (index >= sorted.length - 1) return;
-
-    const next = sorted[index + 1];
-    const gap = next - current;
-    if (gap > 0.8 && gap <= 5) {
-      dense.push(Number((current + gap / 3).toFixed(5)));
-      dense.push(Number((current + (gap * 2) / 3).toFixed(5)));
-    }
-  });
-
-  return dense;
-}
-
-function buildDenseUsCities(cities) {
-  const source = (cities || []).filter((city) =>
-    isContiguousUsCoordinate(city.lon, city.lat)
-  );
-  if (source.length === 0) return [];
-
-  const denseLons = buildDenseAxis(source.map((city) => city.lon));
-  const denseLats = buildDenseAxis(source.map((city) => city.lat));
-  const denseCities = [];
-
-  denseLats.forEach((lat) => {
-    denseLons.forEach((lon) => {
-      if (!isContiguousUsCoordinate(lon, lat)) return;
-
-      let nearestSourceDistanceSq = Number.POSITIVE_INFINITY;
-
-      source.forEach((city) => {
-        const lonDiff = lon - city.lon;
-        const latDiff = lat - city.lat;
-        const distanceSq = lonDiff * lonDiff + latDiff * latDiff;
-        if (distanceSq < nearestSourceDistanceSq) {
-          nearestSourceDistanceSq = distanceSq;
-        }
-      });
-
-      if (nearestSourceDistanceSq <= US_DENSE_SOURCE_RADIUS_SQ) {
-        denseCities.push({
-          lon,
-          lat,
-          cityDistanceRank: denseCities.length,
-        });
-      }
-    });
-  });
-
-  return denseCities;
-}
-
 function projectMercator(lon, lat, width, height) {
   const centerLon = US_MAP_VIEW.centerLon;
   const centerLat = US_MAP_VIEW.centerLat;
@@ -1030,6 +1027,50 @@ function projectMercator(lon, lat, width, height) {
   return [x, y];
 }
 
+function unprojectMercator(x, y, width, height) {
+  const scale = width * US_MAP_VIEW.scaleFactor;
+  const phi0 = toRadians(US_MAP_VIEW.centerLat);
+  const lon = US_MAP_VIEW.centerLon + ((x - width / 2) / scale) * (180 / Math.PI);
+  const mercatorY =
+    Math.log(Math.tan(Math.PI / 4 + phi0 / 2)) - (y - height / 2) / scale;
+  const lat = (2 * Math.atan(Math.exp(mercatorY)) - Math.PI / 2) * (180 / Math.PI);
+  return [lon, lat];
+}
+
+function decodeMapPoints(buffer) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== MAP_POINTS_MAGIC) {
+    throw new Error("Unrecognized map point file.");
+  }
+  const steps = view.getUint16(6, true);
+  const countryCount = view.getUint16(12, true);
+  const countries = {};
+  let offset = 16 + countryCount * 8;
+
+  for (let index = 0; index < countryCount; index += 1) {
+    const record = 16 + index * 8;
+    const code = String.fromCharCode(view.getUint8(record), view.getUint8(record + 1));
+    const count = view.getUint32(record + 4, true);
+    // x, y and rank are consecutive little-endian uint16 arrays
+    const values = new Uint16Array(buffer, offset, count * 3);
+    countries[code] = {
+      count,
+      steps,
+      x: values.subarray(0, count),
+      y: values.subarray(count, count * 2),
+      rank: values.subarray(count * 2, count * 3),
+    };
+    offset += count * 6;
+  }
+
+  return {
+    width: view.getUint16(8, true),
+    height: view.getUint16(10, true),
+    countries,
+  };
+}
+
 function getDotsToShow(countryCode) {
   if (countryCode === "US") return 5000;
 
@@ -1074,7 +1115,7 @@ function getNearestRegionMatch(lon, lat, regionMarkers) {
   };
 }
 
-function renderDottedMap(dottedMapData, regionMarkers) {
+function renderDottedMap(mapPoints, regionMarkers) {
   const svg = document.querySelector("#map-svg");
   if (!svg) return;
 
@@ -1092,21 +1133,16 @@ function renderDottedMap(dottedMapData, regionMarkers) {
   const staticFragment = document.createDocumentFragment();
   const activeFragment = document.createDocumentFragment();
 
-  Object.entries(dottedMapData || {})
+  Object.entries(mapPoints?.countries || {})
     .filter(([countryCode]) => MAP_VISIBLE_COUNTRIES.has(countryCode))
-    .forEach(([countryCode, cities]) => {
+    .forEach(([countryCode, points]) => {
       const visibleDots = getDotsToShow(countryCode);
       const color = MAP_COUNTRY_COLORS[countryCode] || "#666";
-      const mapCities = countryCode === "US" ? buildDenseUsCities(cities) : cities || [];
-
-      mapCities.forEach((city) => {
-        if (!isContiguousUsCoordinate(city.lon, city.lat)) return;
-
-        const projected = projectMercator(city.lon, city.lat, width, height);
-        if (!projected) return;
 
-        const [x, y] = projected;
-        if (x < 0 || x > width || y < 0 || y > height) return;
+      for (let index = 0; index < points.count; index += 1) {
+        const x = points.x[index] / points.steps;
+        const y = points.y[index] / points.steps;
+        const rank = points.rank[index];
 
         const pixel = document.createElementNS(ns, "rect");
         pixel.setAttribute("x", x.toFixed(2));
@@ -1114,12 +1150,9 @@ function renderDottedMap(dottedMapData, regionMarkers) {
         pixel.setAttribute("width", "3");
         pixel.setAttribute("height", "3");
 
-        if (city.cityDistanceRank < visibleDots) {
-          const nearestMatch = getNearestRegionMatch(
-            city.lon,
-            city.lat,
-            regionMarkers
-          );
+        if (rank < visibleDots) {
+          const [lon, lat] = unprojectMercator(x, y, width, height);
+          const nearestMatch = getNearestRegionMatch(lon, lat, regionMarkers);
           const isTopStateCoverage =
             nearestMatch && nearestMatch.distanceSq <= TOP_STATE_COLOR_RADIUS_SQ;
 
@@ -1138,7 +1171,7 @@ function renderDottedMap(dottedMapData, regionMarkers) {
               pixel.classList.add("pulse-soft");
             }
 
-            pixel.style.animationDelay = `${(city.cityDistanceRank % 8) * 0.17}s`;
+            pixel.style.animationDelay = `${(rank % 8) * 0.17}s`;
             pixel.style.animationDuration = `${2.5 - shareStrength * 0.8}s`;
             activeFragment.appendChild(pixel);
           } else {
@@ -1147,7 +1180,7 @@ function renderDottedMap(dottedMapData, regionMarkers) {
         } else {
           staticFragment.appendChild(pixel);
         }
-      });
+      }
     });
 
   staticLayer.replaceChildren(staticFragment);
@@ -1195,22 +1228,12 @@ function renderDottedMap(dottedMapData, regionMarkers) {
   });
 }
 
-function uniqueSorted(arr) {
-  return [...new Set(arr)].sort((a, b) => a - b);
-}
-
 function buildFilters(data) {
   const makeFilter = document.querySelector("#make-filter");
   const yearFilter = document.querySelector("#year-filter");
 
-  const makes = [
-    "All",
-    ...[...new Set((data.transactions_by_make_year || []).map((row) => row.make))].sort(),
-  ];
-  const years = [
-    "All",
-    ...uniqueSorted((data.transactions_by_year || []).map((row) => Number(row.sale_year))),
-  ];
+  const makes = ["All", ...data.lookup.makes];
+  const years = ["All", ...data.lookup.years];
 
   makeFilter.innerHTML = makes
     .map(
@@ -1224,73 +1247,95 @@ function buildFilters(data) {
   return { makeFilter, yearFilter };
 }
 
-function getMakeYearTransactions(data, selectedMake, selectedYear) {
-  return (data.transactions_by_make_year || []).filter((row) => {
-    const makeOk = selectedMake === "All" || row.make === selectedMake;
-    const yearOk = selectedYear === "All" || Number(row.sale_year) === Number(selectedYear);
-    return makeOk && yearOk;
-  });
+// The trends shard ships a lookup index (see dashboard_lookup in generate_analysis.py), so a
+// filter change reads a make's row range or a precomputed ranking instead of scanning tables.
+function getMakeId(data, make) {
+  if (!data.makeIds) {
+    data.makeIds = new Map(data.lookup.makes.map((name, id) => [name, id]));
+  }
+  return data.makeIds.get(make);
 }
 
-function groupAndSortTransactions(rows, keyName) {
-  const grouped = rows.reduce((acc, row) => {
-    const key = row[keyName];
-    acc[key] = (acc[key] || 0) + Number(row.transactions || 0);
-    return acc;
-  }, {});
+function getMakeRows(data, key, make) {
+  const id = getMakeId(data, make);
+  if (id === undefined || !data[key]) return [];
+  const offsets = data.lookup.make_offsets[key];
+  return data[key].slice(offsets[id], offsets[id + 1]);
+}
+
+function getMakeRow(data, key, make) {
+  const id = getMakeId(data, make);
+  const row = id === undefined ? -1 : data.lookup.make_rows[key][id];
+  return row >= 0 ? data[key][row] : undefined;
+}
 
-  return Object.entries(grouped)
-    .map(([key, transactions]) => ({ [keyName]: key, transactions }))
-    .sort((a, b) => b.transactions - a.transactions);
+function findYearRow(rows, selectedYear) {
+  // At most one row per sale year
+  return rows.find((row) => Number(row.sale_year) === Number(selectedYear));
+}
+
+function getRankedMakes(data, metricKey, selectedYear) {
+  const ranking = data.lookup.rankings[metricKey][selectedYear];
+  if (!ranking) return [];
+  return ranking.make.map((id, index) => ({
+    make: data.lookup.makes[id],
+    [metricKey]: ranking[metricKey][index],
+  }));
+}
+
+function getScopedTransactions(data, selectedMake, selectedYear) {
+  if (selectedMake === "All") {
+    return selectedYear === "All"
+      ? data.summary.dataset.rows
+      : data.lookup.year_transactions[selectedYear] || 0;
+  }
+  const rows = getMakeRows(data, "transactions_by_make_year", selectedMake);
+  if (selectedYear !== "All") {
+    return Number(findYearRow(rows, selectedYear)?.transactions || 0);
+  }
+  return rows.reduce((sum, row) => sum + Number(row.transactions || 0), 0);
 }
 
 function getScopedMakeTransactions(data, selectedMake, selectedYear) {
-  const filtered = getMakeYearTransactions(data, selectedMake, selectedYear);
-  if (selectedMake !== "All") {
-    return groupAndSortTransactions(filtered, "make");
+  if (selectedMake === "All") {
+    return getRankedMakes(data, "transactions", selectedYear);
   }
-  return groupAndSortTransactions(filtered, "make").slice(0, 15);
+  const rows = getMakeRows(data, "transactions_by_make_year", selectedMake);
+  const scoped = selectedYear === "All" ? rows : [findYearRow(rows, selectedYear)].filter(Boolean);
+  if (scoped.length === 0) return [];
+  const transactions = scoped.reduce((sum, row) => sum + Number(row.transactions || 0), 0);
+  return [{ make: selectedMake, transactions }];
 }
 
 function getScopedMonthlyTransactions(data, selectedMake, selectedYear) {
-  if (selectedMake === "All" && selectedYear === "All") {
-    return data.transactions_by_month || [];
+  if (selectedMake === "All") {
+    if (selectedYear === "All") {
+      return data.transactions_by_month || [];
+    }
+    const series = data.lookup.year_monthly[selectedYear];
+    return series
+      ? series.year_month.map((yearMonth, index) => ({
+          year_month: yearMonth,
+          transactions: series.transactions[index],
+        }))
+      : [];
   }
 
-  const filtered = (data.transactions_by_make_month || []).filter((row) => {
-    const makeOk = selectedMake === "All" || row.make === selectedMake;
-    const yearOk = selectedYear === "All" || Number(row.sale_year) === Number(selectedYear);
-    return makeOk && yearOk;
-  });
-
-  return groupAndSortTransactions(filtered, "year_month").sort((a, b) =>
-    a.year_month.localeCompare(b.year_month)
-  );
+  // A make's rows are stored in (sale_year, sale_month) order
+  return getMakeRows(data, "transactions_by_make_month", selectedMake)
+    .filter((row) => selectedYear === "All" || Number(row.sale_year) === Number(selectedYear))
+    .map((row) => ({ year_month: row.year_month, transactions: Number(row.transactions || 0) }));
 }
 
-function getScopedMetricByMake(
-  data,
-  selectedMake,
-  selectedYear,
-  metricKey,
-  allYearsRows,
-  byYearRows
-) {
-  let rows =
-    selectedYear === "All"
-      ? allYearsRows
-      : byYearRows.filter((row) => Number(row.sale_year) === Number(selectedYear));
-
-  if (selectedMake !== "All") {
-    rows = rows.filter((row) => row.make === selectedMake);
-  } else {
-    rows = rows
-      .slice()
-      .sort((a, b) => Number(b[metricKey]) - Number(a[metricKey]))
-      .slice(0, 15);
+function getScopedMetricByMake(data, selectedMake, selectedYear, metricKey, byMakeKey, byMakeYearKey) {
+  if (selectedMake === "All") {
+    return getRankedMakes(data, metricKey, selectedYear);
   }
-
-  return rows;
+  const row =
+    selectedYear === "All"
+      ? getMakeRow(data, byMakeKey, selectedMake)
+      : findYearRow(getMakeRows(data, byMakeYearKey, selectedMake), selectedYear);
+  return row ? [row] : [];
 }
 
 function getKpiMetric(
@@ -1298,74 +1343,127 @@ function getKpiMetric(
   selectedMake,
   selectedYear,
   metricKey,
-  allYearsByMake,
-  byYearByMake,
-  byYearOverall,
+  byMakeKey,
+  byMakeYearKey,
+  byYearKey,
   fallback
 ) {
   if (selectedMake === "All" && selectedYear === "All") {
     return fallback;
   }
 
-  if (selectedMake === "All" && selectedYear !== "All") {
-    const row = byYearOverall.find((r) => Number(r.sale_year) === Number(selectedYear));
-    return row ? Number(row[metricKey]) : fallback;
-  }
-
-  if (selectedMake !== "All" && selectedYear === "All") {
-    const row = allYearsByMake.find((r) => r.make === selectedMake);
-    return row ? Number(row[metricKey]) : fallback;
+  let row;
+  if (selectedMake === "All") {
+    row = findYearRow(data[byYearKey] || [], selectedYear);
+  } else if (selectedYear === "All") {
+    row = getMakeRow(data, byMakeKey, selectedMake);
+  } else {
+    row = findYearRow(getMakeRows(data, byMakeYearKey, selectedMake), selectedYear);
   }
-
-  const row = byYearByMake.find(
-    (r) => r.make === selectedMake && Number(r.sale_year) === Number(selectedYear)
-  );
   return row ? Number(row[metricKey]) : fallback;
 }
 
-function renderDashboardKpis(data, selectedMake, selectedYear) {
-  const scoped = getMakeYearTransactions(data, selectedMake, selectedYear);
-  const scopedTransactions = scoped.reduce(
-    (sum, row) => sum + Number(row.transactions || 0),
-    0
-  );
+function getScopedPercentile(data, selectedMake, selectedYear, measure, percentile) {
+  // Sketch tables only exist when the pipeline ran with --sketches
+  if (selectedMake === "All" && selectedYear === "All") {
+    return data.summary.approximate?.percentiles?.[measure]?.[percentile] ?? null;
+  }
 
-  const averagePrice = getKpiMetric(
-    data,
-    selectedMake,
-    selectedYear,
-    "avg_sellingprice",
-    data.avg_price_by_make || [],
-    data.avg_price_by_make_year || [],
-    data.avg_price_by_year || [],
-    data.summary.kpis.average_sellingprice
-  );
+  let rows;
+  if (selectedMake === "All") {
+    rows = (data.percentiles_by_year || []).filter((row) => Number(row.sale_year) === Number(selectedYear));
+  } else if (selectedYear === "All") {
+    rows = (data.percentiles_by_make || []).filter((row) => row.make === selectedMake);
+  } else {
+    rows = (data.percentiles_by_make_year || []).filter(
+      (row) => row.make === selectedMake && Number(row.sale_year) === Number(selectedYear)
+    );
+  }
+  const row = rows.find((item) => item.measure === measure);
+  return row ? Number(row[percentile]) : null;
+}
 
-  const averageVsMmr = getKpiMetric(
-    data,
-    selectedMake,
-    selectedYear,
-    "avg_price_vs_mmr",
-    data.price_vs_mmr_by_make || [],
-    data.price_vs_mmr_by_make_year || [],
-    data.price_vs_mmr_by_year || [],
-    data.summary.kpis.average_price_vs_mmr
-  );
+function buildLocalDashboardView(data, selectedMake, selectedYear) {
+  return {
+    volume: getScopedTransactions(data, selectedMake, selectedYear),
+    averagePrice: getKpiMetric(
+      data,
+      selectedMake,
+      selectedYear,
+      "avg_sellingprice",
+      "avg_price_by_make",
+      "avg_price_by_make_year",
+      "avg_price_by_year",
+      data.summary.kpis.average_sellingprice
+    ),
+    averageVsMmr: getKpiMetric(
+      data,
+      selectedMake,
+      selectedYear,
+      "avg_price_vs_mmr",
+      "price_vs_mmr_by_make",
+      "price_vs_mmr_by_make_year",
+      "price_vs_mmr_by_year",
+      data.summary.kpis.average_price_vs_mmr
+    ),
+    topMakes: getScopedMakeTransactions(data, selectedMake, selectedYear),
+    monthly: getScopedMonthlyTransactions(data, selectedMake, selectedYear),
+    prices: getScopedMetricByMake(
+      data,
+      selectedMake,
+      selectedYear,
+      "avg_sellingprice",
+      "avg_price_by_make",
+      "avg_price_by_make_year"
+    ),
+    rawVsMmr: getScopedMetricByMake(
+      data,
+      selectedMake,
+      selectedYear,
+      "avg_price_vs_mmr",
+      "price_vs_mmr_by_make",
+      "price_vs_mmr_by_make_year"
+    ),
+  };
+}
 
-  const volume =
-    selectedMake === "All" && selectedYear === "All"
-      ? data.summary.dataset.rows
-      : scopedTransactions;
+async function fetchDashboardView(selectedMake, selectedYear) {
+  const scope = { make: selectedMake, year: selectedYear };
+  const [kpis, topMakes, monthly, prices, rawVsMmr] = await Promise.all([
+    fetchAggregate("kpis", scope),
+    fetchAggregate("top-makes", { ...scope, metric: "transactions" }),
+    fetchAggregate("monthly", scope),
+    fetchAggregate("top-makes", { ...scope, metric: "avg_sellingprice" }),
+    fetchAggregate("top-makes", { ...scope, metric: "avg_price_vs_mmr" }),
+  ]);
+  return {
+    volume: kpis.transactions,
+    averagePrice: kpis.avg_sellingprice,
+    averageVsMmr: kpis.avg_price_vs_mmr,
+    topMakes: topMakes.rows,
+    monthly: monthly.rows,
+    prices: prices.rows,
+    rawVsMmr: rawVsMmr.rows,
+  };
+}
 
-  document.querySelector("#dashboard-kpis").innerHTML = [
-    createKpi("Filtered transactions", formatNumber(volume)),
-    createKpi("Average selling price", formatMoney(averagePrice)),
-    createKpi("Average price vs MMR", formatSignedMoney(averageVsMmr)),
+function renderDashboardKpis(data, view) {
+  const kpis = [
+    createKpi("Filtered transactions", formatNumber(view.volume)),
+    createKpi("Average selling price", formatMoney(view.averagePrice)),
+    createKpi("Average price vs MMR", formatSignedMoney(view.averageVsMmr)),
     createKpi(
       "Average car age",
       `${(Number(data.summary.kpis.average_car_age_at_sale) || 0).toFixed(1)} years`
     ),
-  ].join("");
+  ];
+  if (Number.isFinite(view.medianPrice)) {
+    kpis.push(createKpi("Median selling price (approx.)", formatMoney(view.medianPrice)));
+  }
+  if (Number.isFinite(view.medianVsMmr)) {
+    kpis.push(createKpi("Median price vs MMR (approx.)", formatSignedMoney(view.medianVsMmr)));
+  }
+  document.querySelector("#dashboard-kpis").innerHTML = kpis.join("");
 }
 
 function baseChartLayout(overrides = {}) {
@@ -1388,27 +1486,8 @@ function baseChartLayout(overrides = {}) {
   };
 }
 
-function renderCharts(data, selectedMake, selectedYear) {
-  const topMakes = getScopedMakeTransactions(data, selectedMake, selectedYear);
-  const monthly = getScopedMonthlyTransactions(data, selectedMake, selectedYear);
-
-  const prices = getScopedMetricByMake(
-    data,
-    selectedMake,
-    selectedYear,
-    "avg_sellingprice",
-    data.avg_price_by_make || [],
-    data.avg_price_by_make_year || []
-  );
-
-  const rawVsMmr = getScopedMetricByMake(
-    data,
-    selectedMake,
-    selectedYear,
-    "avg_price_vs_mmr",
-    data.price_vs_mmr_by_make || [],
-    data.price_vs_mmr_by_make_year || []
-  );
+function renderCharts(view, selectedMake) {
+  const { topMakes, monthly, prices, rawVsMmr } = view;
 
   const absValues = rawVsMmr
     .map((row) => Math.abs(Number(row.avg_price_vs_mmr || 0)))
@@ -1537,6 +1616,119 @@ function renderCharts(data, selectedMake, selectedYear) {
   );
 }
 
+function renderModelDrilldown(data, selectedMake) {
+  const note = document.querySelector("#models-note");
+  const models = selectedMake === "All" ? [] : getMakeRows(data, "top_models_by_make", selectedMake);
+  if (models.length === 0) {
+    Plotly.purge("chart-models");
+    note.textContent =
+      selectedMake === "All" ? "Select a make to see its best-selling models and trims." : "";
+    return;
+  }
+
+  // Horizontal bars read top-down, so the largest model goes last
+  const ordered = [...models].reverse();
+  Plotly.newPlot(
+    "chart-models",
+    [
+      {
+        type: "bar",
+        orientation: "h",
+        x: ordered.map((row) => row.transactions),
+        y: ordered.map((row) => row.model),
+        customdata: ordered.map((row) => formatMoney(row.avg_sellingprice)),
+        hovertemplate: "%{y}: %{x:,} sales, avg %{customdata}<extra></extra>",
+        marker: { color: "#2563eb" },
+      },
+    ],
+    baseChartLayout({
+      margin: { t: 16, r: 16, b: 48, l: 140 },
+      xaxis: { ...baseChartLayout().xaxis, title: "Transactions" },
+    }),
+    { displayModeBar: false, responsive: true }
+  );
+
+  const trims = getMakeRows(data, "top_trims_by_make", selectedMake).slice(0, 3);
+  note.textContent = trims.length
+    ? `Top trims: ${trims
+        .map((row) => `${row.model} ${row.trim} (${formatNumber(row.transactions)})`)
+        .join(", ")}`
+    : "";
+}
+
+function getDailySeries(series, selectedMake, selectedYear) {
+  const scope = selectedMake === "All" ? series.scopes.All : series.scopes.make;
+  const row = scope ? scope.keys.indexOf(selectedMake === "All" ? "All" : selectedMake) : -1;
+  if (row < 0) return null;
+
+  // The arrays are dense from series.start, so each position is a fixed number of days in
+  const startTime = Date.parse(`${series.start}T00:00:00Z`);
+  const dates = Array.from({ length: series.length }, (_, index) =>
+    new Date(startTime + index * series.step_days * 86400000).toISOString().slice(0, 10)
+  );
+  const positions = dates
+    .map((date, index) => index)
+    .filter((index) => selectedYear === "All" || dates[index].startsWith(`${selectedYear}-`));
+  const pick = (values) => positions.map((index) => values[index]);
+  return {
+    dates: pick(dates),
+    transactions: pick(scope.transactions[row]),
+    rolling7: pick(scope.rolling_7d[row]),
+    rolling28: pick(scope.rolling_28d[row]),
+    yoy: pick(scope.yoy_delta[row]),
+  };
+}
+
+function renderDailyVolume(data, selectedMake, selectedYear) {
+  const note = document.querySelector("#daily-note");
+  const daily = data.daily_series ? getDailySeries(data.daily_series, selectedMake, selectedYear) : null;
+  if (!daily || daily.dates.length === 0) {
+    Plotly.purge("chart-daily");
+    note.textContent = "";
+    return;
+  }
+
+  Plotly.newPlot(
+    "chart-daily",
+    [
+      {
+        type: "bar",
+        name: "Daily",
+        x: daily.dates,
+        y: daily.transactions,
+        marker: { color: "rgba(37,99,235,0.45)" },
+      },
+      {
+        type: "scatter",
+        mode: "lines",
+        name: "7-day mean",
+        x: daily.dates,
+        y: daily.rolling7,
+        line: { color: "#f59e0b", width: 2 },
+      },
+      {
+        type: "scatter",
+        mode: "lines",
+        name: "28-day mean",
+        x: daily.dates,
+        y: daily.rolling28,
+        line: { color: "#22c55e", width: 2 },
+      },
+    ],
+    baseChartLayout({
+      yaxis: { ...baseChartLayout().yaxis, title: "Transactions" },
+      legend: { orientation: "h", y: 1.12, font: { color: "#a6a6af" } },
+    }),
+    { displayModeBar: false, responsive: true }
+  );
+
+  const last = daily.dates.length - 1;
+  const yoy = daily.yoy[last];
+  note.textContent =
+    `${daily.dates[last]}: 7-day mean ${formatNumber(daily.rolling7[last])}` +
+    (yoy === null || yoy === undefined ? "" : `, ${yoy >= 0 ? "+" : ""}${formatNumber(yoy)} vs the same weekday a year earlier`);
+}
+
 function renderNarrative(data) {
   const summary = data.summary || {};
   const kpis = summary.kpis || {};
@@ -1593,44 +1785,94 @@ function renderDataQualityNotes(data) {
 
 async function init() {
   try {
-    const [dashboardRes, mapRes, previewRes] = await Promise.all([
-      fetch("./data/dashboard_data.json"),
-      fetch("./data/dotted_map_data.json"),
+    // Start every shard request up front; the make x month shard is only fetched once a filter needs it.
+    const trendsRequest = loadDashboardShard("trends");
+    const pricingRequest = loadDashboardShard("pricing");
+    const sketchesRequest = loadDashboardShard("sketches").catch(() => ({}));
+    const aggregateApiRequest = isAggregateApiAvailable();
+    const [coreData, mapRes, previewRes] = await Promise.all([
+      loadDashboardShard("core"),
+      fetch(MAP_POINTS_URL),
       fetch("./data/car_prices_preview.csv"),
     ]);
 
-    if (!dashboardRes.ok || !mapRes.ok) {
+    if (!mapRes.ok) {
       throw new Error("Failed to load dashboard assets.");
     }
 
-    const dashboardData = await dashboardRes.json();
-    const mapData = await mapRes.json();
+    const mapPoints = decodeMapPoints(await mapRes.arrayBuffer());
     const previewCsv = previewRes.ok ? await previewRes.text() : "";
     const parsedPreview = parsePreviewCsv(previewCsv, 240);
-    const previewData = parsedPreview || dashboardData.sample_head;
+    const sampleHead = coreData.sample_head;
+    const previewData =
+      parsedPreview ||
+      (sampleHead && {
+        columns: Object.keys(sampleHead.columns || {}),
+        rows: decodeColumnarTable(sampleHead, {}),
+      });
 
-    renderOverview(dashboardData.summary);
-    renderDataDictionary(dashboardData.data_dictionary);
+    renderOverview(coreData.summary);
+    renderDataDictionary(coreData.data_dictionary);
     renderDatasetPreview(previewData);
-    setCodeShowcase(dashboardData.code_showcase);
-    const regionMarkers = renderLiveBoard(dashboardData);
-    renderDottedMap(mapData, regionMarkers);
-    renderNarrative(dashboardData);
-    renderDataQualityNotes(dashboardData);
+    setCodeShowcase(coreData.code_showcase);
+    const regionMarkers = renderLiveBoard(coreData);
+    renderDottedMap(mapPoints, regionMarkers);
+    renderNarrative(coreData);
+    renderDataQualityNotes(coreData);
+
+    const [trendsData, pricingData, sketchesData] = await Promise.all([
+      trendsRequest,
+      pricingRequest,
+      sketchesRequest,
+    ]);
+    const dashboardData = { ...coreData, ...trendsData, ...pricingData, ...sketchesData };
 
     const { makeFilter, yearFilter } = buildFilters(dashboardData);
+    let timeseriesRequest = null;
 
-    const redraw = () => {
+    const redraw = async () => {
       const selectedMake = makeFilter.value;
       const selectedYear = yearFilter.value;
-      renderDashboardKpis(dashboardData, selectedMake, selectedYear);
-      renderCharts(dashboardData, selectedMake, selectedYear);
+      let view;
+      if (await aggregateApiRequest) {
+        view = await fetchDashboardView(selectedMake, selectedYear);
+      } else {
+        if (selectedMake !== "All" && !dashboardData.transactions_by_make_month) {
+          Object.assign(dashboardData, await loadDashboardShard("make_month"));
+        }
+        view = buildLocalDashboardView(dashboardData, selectedMake, selectedYear);
+      }
+      // The per-make drill-down shard is only fetched once a make is selected
+      if (selectedMake !== "All" && !dashboardData.top_models_by_make) {
+        Object.assign(dashboardData, await loadDashboardShard("drilldown").catch(() => ({})));
+      }
+      // Drop responses for a filter the user has already moved away from
+      const isStale = () => makeFilter.value !== selectedMake || yearFilter.value !== selectedYear;
+      if (isStale()) return;
+      view.medianPrice = getScopedPercentile(dashboardData, selectedMake, selectedYear, "sellingprice", "p50");
+      view.medianVsMmr = getScopedPercentile(dashboardData, selectedMake, selectedYear, "price_vs_mmr", "p50");
+      renderDashboardKpis(dashboardData, view);
+      renderCharts(view, selectedMake);
+      renderModelDrilldown(dashboardData, selectedMake);
+      // The daily series shard is the largest, so it is only requested once everything else is drawn
+      if (!dashboardData.daily_series) {
+        timeseriesRequest =
+          timeseriesRequest ||
+          loadDashboardShard("timeseries").catch(() => {
+            timeseriesRequest = null;
+            return {};
+          });
+        Object.assign(dashboardData, await timeseriesRequest);
+        if (isStale()) return;
+      }
+      renderDailyVolume(dashboardData, selectedMake, selectedYear);
     };
 
-    makeFilter.addEventListener("change", redraw);
-    yearFilter.addEventListener("change", redraw);
+    const redrawSafely = () => redraw().catch((error) => console.error(error));
+    makeFilter.addEventListener("change", redrawSafely);
+    yearFilter.addEventListener("change", redrawSafely);
 
-    redraw();
+    await redraw();
   } catch (error) {
     console.error(error);
   }